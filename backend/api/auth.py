@@ -10,6 +10,7 @@ from flask import Blueprint, jsonify, request
 from werkzeug.security import generate_password_hash, check_password_hash
 from backend.database.db import get_db
 from backend.models.player_model import Player
+from backend.utils.cache_helper import response_cache, PLAYERS_TAG
 import jwt
 import datetime
 from backend.config import Config
@@ -80,6 +81,7 @@ def register():
     db.add(new_player)
     db.commit()
     db.refresh(new_player)
+    response_cache.invalidate(PLAYERS_TAG)
 
     token = generate_token(new_player.id)
 
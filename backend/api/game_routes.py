@@ -8,11 +8,18 @@
 # ============================================================
 
 from flask import Blueprint, jsonify, request
-from backend.database.db import get_db
+from backend.database.db import get_db, get_read_db
 from backend.models.game_model import Game
 from backend.models.player_model import Player
-from backend.models.score_model import Score
+from backend.database.write_behind import (
+    record_match_result, update_rankings, result_writer, points_error, GameAlreadyEnded
+)
+from backend.game_logic.levels import level_exists
+from backend.config import Config
+from backend.utils.serializer import serialize_model, serialize_list, parse_fields
+from backend.utils.batch_helper import parse_ids, order_by_ids
 from datetime import datetime
+from collections import Counter
 
 # ============================================================
 # 1. BLUEPRINT SETUP
@@ -28,6 +35,7 @@ game_bp = Blueprint("game", __name__, url_prefix="/api/game")
 # ------------------------------------------------------------
 # Endpoint: POST /api/game/start
 # Purpose : Creates a new game session between players.
+#           player1 plays Tom and player2 plays Jerry.
 # Example Payload:
 # {
 #   "player1_id": 1,
@@ -42,11 +50,14 @@ def start_game():
 
     player1_id = data.get("player1_id")
     player2_id = data.get("player2_id")
-    map_name = data.get("map", "default")
+    map_name = data.get("map", Config.DEFAULT_MAP)
 
     if not player1_id or not player2_id:
         return jsonify({"error": "Both player1_id and player2_id are required"}), 400
 
+    if not level_exists(map_name):
+        return jsonify({"error": f"Unknown map '{map_name}'"}), 400
+
     # Ensure both players exist
     player1 = db.query(Player).filter_by(id=player1_id).first()
     player2 = db.query(Player).filter_by(id=player2_id).first()
@@ -57,6 +68,8 @@ def start_game():
     new_game = Game(
         player1_id=player1_id,
         player2_id=player2_id,
+        tom_id=player1_id,
+        jerry_id=player2_id,
         map_name=map_name,
         start_time=datetime.utcnow(),
         status="active"
@@ -113,6 +126,9 @@ def player_move():
 # ------------------------------------------------------------
 # Endpoint: POST /api/game/end
 # Purpose : Ends a game session and records scores.
+#           Returns 202 instead of 200 when the result is
+#           written behind (Config.WRITE_BEHIND_ENABLED), and 409
+#           when the game is not active (already ended).
 # Example Payload:
 # {
 #   "game_id": 1,
@@ -129,24 +145,44 @@ def end_game():
     winner_id = data.get("winner_id")
     points = data.get("points", 0)
 
+    if not game_id or not winner_id:
+        return jsonify({"error": "game_id and winner_id are required"}), 400
+    error = points_error(points)
+    if error:
+        return jsonify({"error": error}), 400
+
     game = db.query(Game).filter_by(id=game_id).first()
     if not game:
         return jsonify({"error": "Game not found"}), 404
+    if game.status != "active":
+        return jsonify({"error": "Game has already ended"}), 409
 
-    # Mark game as finished
-    game.status = "finished"
-    game.end_time = datetime.utcnow()
+    # Write-behind: spool + queue the result and acknowledge now;
+    # the background writer commits it in a batch. Falls through to
+    # the synchronous write when the queue is full.
+    if Config.WRITE_BEHIND_ENABLED:
+        result_id = result_writer.submit(game_id, winner_id, points)
+        if result_id is not None:
+            return jsonify({
+                "message": "Game result queued",
+                "winner_id": winner_id,
+                "result_id": result_id
+            }), 202
 
-    # Record winner’s score
-    score = Score(
-        player_id=winner_id,
-        game_id=game_id,
-        points=points
-    )
-    db.add(score)
+    # Mark the game finished and record the winner’s score and
+    # both players' leaderboard aggregates in the same transaction
+    try:
+        score, stats_rows = record_match_result(db, game_id, winner_id, points)
+    except GameAlreadyEnded as e:
+        db.rollback()  # another request ended it meanwhile
+        return jsonify({"error": str(e)}), 409
     db.commit()
     db.refresh(score)
 
+    # Move the players in the in-memory ranking (after the commit,
+    # so it never shows a total the database rolled back)
+    update_rankings(db, stats_rows)
+
     return jsonify({
         "message": "Game ended successfully",
         "winner_id": winner_id,
@@ -155,7 +191,78 @@ def end_game():
 
 
 # ============================================================
-# 5. ROUTE: FETCH ALL ACTIVE GAMES
+# 5. ROUTE: END GAMES (BATCH)
+# ------------------------------------------------------------
+# Endpoint: POST /api/game/end/batch
+# Purpose : Records up to Config.BATCH_MAX_IDS match results in
+#           one transaction: all of them or none. 409 if any of
+#           the games is not active (already ended).
+# Example Payload:
+# {
+#   "results": [
+#     {"game_id": 1, "winner_id": 2, "points": 100},
+#     {"game_id": 2, "winner_id": 5, "points": 80}
+#   ]
+# }
+# ============================================================
+@game_bp.route("/end/batch", methods=["POST"])
+def end_games_batch():
+    db = get_db()
+    data = request.get_json() or {}
+    results = data.get("results")
+
+    if not isinstance(results, list) or not results:
+        return jsonify({"error": "results must be a non-empty list"}), 400
+    if len(results) > Config.BATCH_MAX_IDS:
+        return jsonify({"error": f"At most {Config.BATCH_MAX_IDS} results per request"}), 400
+    for i, r in enumerate(results):
+        if not isinstance(r, dict):
+            return jsonify({"error": f"results[{i}]: must be an object"}), 400
+        for key in ("game_id", "winner_id"):
+            value = r.get(key)
+            # bool is an int subclass, but true/false are not ids
+            if not isinstance(value, int) or isinstance(value, bool):
+                return jsonify({"error": f"results[{i}]: {key} must be an integer"}), 400
+        error = points_error(r.get("points", 0))
+        if error:
+            return jsonify({"error": f"results[{i}]: {error}"}), 400
+
+    # A game can only be ended once per batch
+    counts = Counter(r["game_id"] for r in results)
+    duplicates = sorted(gid for gid, n in counts.items() if n > 1)
+    if duplicates:
+        return jsonify({"error": "Duplicate game_id in results", "duplicates": duplicates}), 400
+
+    # Load every game up front with one IN (...) query;
+    # record_match_result then finds them in the session
+    game_ids = list(counts)
+    games = db.query(Game).filter(Game.id.in_(game_ids)).all()
+    missing = sorted(set(game_ids) - {g.id for g in games})
+    if missing:
+        return jsonify({"error": "Games not found", "missing": missing}), 404
+    ended = sorted(g.id for g in games if g.status != "active")
+    if ended:
+        return jsonify({"error": "Games have already ended", "ended": ended}), 409
+
+    try:
+        recorded = [
+            record_match_result(db, r["game_id"], r["winner_id"], r.get("points", 0))
+            for r in results
+        ]
+    except GameAlreadyEnded as e:
+        db.rollback()  # another request ended one of them meanwhile
+        return jsonify({"error": str(e)}), 409
+    db.commit()
+    update_rankings(db, [stats for _, stats_rows in recorded for stats in stats_rows])
+
+    return jsonify({
+        "message": f"{len(recorded)} games ended successfully",
+        "scores": [serialize_model(score) for score, _ in recorded]
+    }), 200
+
+
+# ============================================================
+# 6. ROUTE: FETCH ALL ACTIVE GAMES
 # ------------------------------------------------------------
 # Endpoint: GET /api/game/active
 # Purpose : Retrieves all ongoing game sessions.
@@ -168,7 +275,7 @@ def get_active_games():
 
 
 # ============================================================
-# 6. ROUTE: FETCH GAME BY ID
+# 7. ROUTE: FETCH GAME BY ID
 # ------------------------------------------------------------
 # Endpoint: GET /api/game/<int:game_id>
 # Purpose : Retrieves detailed info for one specific game.
@@ -180,3 +287,32 @@ def get_game(game_id):
     if not game:
         return jsonify({"error": "Game not found"}), 404
     return jsonify(game.to_dict())
+
+
+# ============================================================
+# 8. ROUTE: FETCH GAMES BY ID (BATCH)
+# ------------------------------------------------------------
+# Endpoint: GET /api/game/batch?ids=1,2,3[&fields=id,status]
+# Purpose : Fetch up to Config.BATCH_MAX_IDS games with a single
+#           IN (...) query (match lists, lobbies).
+# ------------------------------------------------------------
+# Example Response:
+# {
+#   "games": [{"id": 1, ...}, {"id": 3, ...}],   (request order)
+#   "missing": [2]
+# }
+# ============================================================
+@game_bp.route("/batch", methods=["GET"])
+def get_games_batch():
+    ids, error = parse_ids(request.args.get("ids"))
+    if not error:
+        fields, error = parse_fields(Game, request.args.get("fields"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = get_read_db()
+    games, missing = order_by_ids(ids, db.query(Game).filter(Game.id.in_(ids)).all())
+    return jsonify({
+        "games": serialize_list(games, fields),
+        "missing": missing
+    })
@@ -4,12 +4,20 @@
 #     Provides endpoints to manage and retrieve leaderboard
 #     data such as top player rankings, recent scores, and
 #     game performance statistics.
+#     All reads go through the read-only connection pool
+#     (get_read_db), so they keep flowing while matches write.
+#     /top, /summary and /player/<id> are served from the
+#     response cache (with ETags) until a match result or player
+#     change invalidates them.
 # ============================================================
 
-from flask import Blueprint, jsonify
-from backend.database.db import get_db
+from flask import Blueprint, jsonify, request
+from backend.database.db import get_read_db
 from backend.models.score_model import Score
 from backend.models.player_model import Player
+from backend.models.player_stats_model import PlayerStats
+from backend.utils.ranking import ranked_leaderboard
+from backend.utils.cache_helper import cached_response, player_tag, LEADERBOARD_TAG, PLAYERS_TAG
 from sqlalchemy import func, desc
 
 # ============================================================
@@ -20,53 +28,123 @@ from sqlalchemy import func, desc
 # ============================================================
 leaderboard_bp = Blueprint("leaderboard", __name__, url_prefix="/api/leaderboard")
 
+# Upper bounds for ?limit= and ?radius= on the ranking routes
+MAX_TOP_LIMIT = 100
+MAX_AROUND_RADIUS = 50
+
+
+def _int_arg(name, default, maximum):
+    try:
+        value = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(1, min(value, maximum))
+
 
 # ============================================================
 # 2. ROUTE: GET TOP PLAYERS
 # ------------------------------------------------------------
-# Endpoint: GET /api/leaderboard/top
-# Purpose : Retrieves top 10 players ranked by total points.
+# Endpoint: GET /api/leaderboard/top?limit=10
+# Purpose : Retrieves the top players ranked by total points
+#           (default 10, at most MAX_TOP_LIMIT).
 # ------------------------------------------------------------
 # Example Response:
 # [
-#   {"player_id": 1, "username": "TomHero", "total_points": 350},
-#   {"player_id": 2, "username": "JerryKing", "total_points": 270},
+#   {"rank": 1, "player_id": 1, "username": "TomHero", "total_points": 350},
+#   {"rank": 2, "player_id": 2, "username": "JerryKing", "total_points": 270},
 #   ...
 # ]
 # ============================================================
 @leaderboard_bp.route("/top", methods=["GET"])
+@cached_response([LEADERBOARD_TAG])
 def get_top_players():
-    db = get_db()
+    limit = _int_arg("limit", 10, MAX_TOP_LIMIT)
+
+    # Served from the in-memory ranking once it is loaded
+    if ranked_leaderboard.loaded:
+        return jsonify(ranked_leaderboard.top(limit)), 200
 
-    # Aggregate total points for each player and sort descending
+    db = get_read_db()
+
+    # Read the pre-aggregated totals (player_stats), walking the
+    # total_points index instead of summing the scores table
     top_players = (
         db.query(
             Player.id.label("player_id"),
             Player.username,
-            func.sum(Score.points).label("total_points")
+            PlayerStats.total_points
         )
-        .join(Score, Player.id == Score.player_id)
-        .group_by(Player.id)
-        .order_by(desc("total_points"))
-        .limit(10)
+        .join(PlayerStats, Player.id == PlayerStats.player_id)
+        .order_by(desc(PlayerStats.total_points), desc(PlayerStats.player_id))
+        .limit(limit)
         .all()
     )
 
     # Convert query result into dictionary format for JSON
     result = [
         {
+            "rank": i + 1,
             "player_id": p.player_id,
             "username": p.username,
             "total_points": int(p.total_points or 0)
         }
-        for p in top_players
+        for i, p in enumerate(top_players)
     ]
 
     return jsonify(result), 200
 
 
 # ============================================================
-# 3. ROUTE: GET PLAYER HISTORY
+# 3. ROUTE: GET PLAYER RANK
+# ------------------------------------------------------------
+# Endpoint: GET /api/leaderboard/rank/<int:player_id>
+# Purpose : Returns one player's rank, O(log n) in the number
+#           of ranked players.
+# ------------------------------------------------------------
+# Example Response:
+# {"rank": 42, "player_id": 7, "username": "TomHero",
+#  "total_points": 350, "total_players": 1200}
+# ============================================================
+@leaderboard_bp.route("/rank/<int:player_id>", methods=["GET"])
+def get_player_rank(player_id):
+    entry = ranked_leaderboard.rank(player_id)
+    if entry is None:
+        return jsonify({"error": "Player is not ranked"}), 404
+
+    entry["total_players"] = len(ranked_leaderboard)
+    return jsonify(entry), 200
+
+
+# ============================================================
+# 4. ROUTE: PLAYERS AROUND A PLAYER
+# ------------------------------------------------------------
+# Endpoint: GET /api/leaderboard/around/<int:player_id>?radius=5
+# Purpose : Returns the player plus up to `radius` players
+#           ranked directly above and below them.
+# ------------------------------------------------------------
+# Example Response:
+# {
+#   "player_id": 7,
+#   "players": [
+#       {"rank": 37, "player_id": 12, "username": "...", "total_points": 380},
+#       ...
+#       {"rank": 47, "player_id": 3, "username": "...", "total_points": 330}
+#   ]
+# }
+# ============================================================
+@leaderboard_bp.route("/around/<int:player_id>", methods=["GET"])
+def get_players_around(player_id):
+    radius = _int_arg("radius", 5, MAX_AROUND_RADIUS)
+
+    players = ranked_leaderboard.around(player_id, radius)
+    if players is None:
+        return jsonify({"error": "Player is not ranked"}), 404
+
+    return jsonify({"player_id": player_id, "players": players}), 200
+
+
+# ============================================================
+# 5. ROUTE: GET PLAYER HISTORY
 # ------------------------------------------------------------
 # Endpoint: GET /api/leaderboard/player/<int:player_id>
 # Purpose : Retrieves recent scores and ranking for one player.
@@ -76,6 +154,9 @@ def get_top_players():
 #   "player_id": 1,
 #   "username": "TomHero",
 #   "total_points": 350,
+#   "games_played": 2,
+#   "wins": 2,
+#   "best_score": 250,
 #   "recent_scores": [
 #       {"game_id": 1, "points": 100, "date": "2025-10-23"},
 #       {"game_id": 2, "points": 250, "date": "2025-10-24"}
@@ -83,14 +164,15 @@ def get_top_players():
 # }
 # ============================================================
 @leaderboard_bp.route("/player/<int:player_id>", methods=["GET"])
+@cached_response(lambda player_id: [player_tag(player_id)])
 def get_player_history(player_id):
-    db = get_db()
+    db = get_read_db()
 
     player = db.query(Player).filter_by(id=player_id).first()
     if not player:
         return jsonify({"error": "Player not found"}), 404
 
-    # Fetch all scores for this player
+    # Fetch the 10 most recent scores (player_id, created_at index)
     scores = (
         db.query(Score)
         .filter_by(player_id=player_id)
@@ -99,12 +181,16 @@ def get_player_history(player_id):
         .all()
     )
 
-    total_points = db.query(func.sum(Score.points)).filter_by(player_id=player_id).scalar() or 0
+    # Totals come from the aggregate row (primary key lookup)
+    stats = db.get(PlayerStats, player_id)
 
     player_data = {
         "player_id": player.id,
         "username": player.username,
-        "total_points": int(total_points),
+        "total_points": stats.total_points if stats else 0,
+        "games_played": stats.games_played if stats else 0,
+        "wins": stats.wins if stats else 0,
+        "best_score": stats.best_score if stats else 0,
         "recent_scores": [
             {
                 "game_id": s.game_id,
@@ -119,7 +205,7 @@ def get_player_history(player_id):
 
 
 # ============================================================
-# 4. ROUTE: GLOBAL LEADERBOARD SUMMARY
+# 6. ROUTE: GLOBAL LEADERBOARD SUMMARY
 # ------------------------------------------------------------
 # Endpoint: GET /api/leaderboard/summary
 # Purpose : Provides quick stats for dashboard or homepage view.
@@ -132,12 +218,13 @@ def get_player_history(player_id):
 # }
 # ============================================================
 @leaderboard_bp.route("/summary", methods=["GET"])
+@cached_response([LEADERBOARD_TAG, PLAYERS_TAG])
 def leaderboard_summary():
-    db = get_db()
+    db = get_read_db()
 
     total_players = db.query(func.count(Player.id)).scalar()
     total_games = db.query(func.count(Score.game_id.distinct())).scalar()
-    highest_score = db.query(func.max(Score.points)).scalar() or 0
+    highest_score = db.query(func.max(PlayerStats.best_score)).scalar() or 0
 
     summary = {
         "total_players": total_players,
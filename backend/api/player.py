@@ -5,9 +5,20 @@
 #              and updates via RESTful endpoints.
 # ============================================================
 
-from flask import Blueprint, jsonify, request
-from backend.database.db import get_db
+import base64
+import json
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import desc, tuple_
+from backend.config import Config
+from backend.database.db import get_db, get_read_db
 from backend.models.player_model import Player
+from backend.models.player_stats_model import PlayerStats
+from backend.models.score_model import Score
+from backend.utils.serializer import serialize_list, parse_fields
+from backend.utils.batch_helper import parse_ids, order_by_ids
+from backend.utils.cache_helper import response_cache, player_tag, LEADERBOARD_TAG, PLAYERS_TAG
+from backend.utils.ranking import ranked_leaderboard
 
 # ============================================================
 # 1. BLUEPRINT SETUP
@@ -50,6 +61,7 @@ def register_player():
     db.add(new_player)
     db.commit()
     db.refresh(new_player)
+    response_cache.invalidate(PLAYERS_TAG)
 
     return jsonify({
         "message": "Player registered successfully",
@@ -58,20 +70,150 @@ def register_player():
 
 
 # ============================================================
-# 3. ROUTE: GET ALL PLAYERS
+# 3. ROUTE: LIST PLAYERS
+# ------------------------------------------------------------
+# Endpoint: GET /api/players/?order=id|score&limit=50&cursor=...
+# Purpose : List players one page at a time using keyset
+#           (cursor) pagination, so every page is an index range
+#           read no matter how deep it is.
+#   - order=id    : ascending player id (default)
+#   - order=score : highest accumulated score (total points, kept
+#                   by record_score) first, ties by id
+#   - limit       : page size, capped at Config.PLAYER_PAGE_MAX
+#   - cursor      : "next_cursor" from the previous page
+#   - stream=1    : send every player (from the cursor on) as
+#                   NDJSON, one row per line, fetched in chunks
+#   - fields      : optional column projection, e.g. fields=id,username
 # ------------------------------------------------------------
-# Endpoint: GET /api/players
-# Purpose : Retrieve all players currently in the database.
+# Example Response:
+# {
+#   "players": [{"id": 1, "username": "Tom", ...}, ...],
+#   "next_cursor": "eyJpZCI6IDUwfQ"    (null on the last page)
+# }
 # ============================================================
+PAGE_ORDERS = ("id", "score")
+
+
+def encode_cursor(player, order):
+    key = {"id": player.id} if order == "id" else {"score": player.score, "id": player.id}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, order):
+    """
+    Decode a next_cursor value. Cursors come back from clients, so
+    anything that is not a key encode_cursor() could have produced
+    raises ValueError.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    names = ("id",) if order == "id" else ("score", "id")
+    if not isinstance(key, dict) or any(
+        type(key.get(name)) is not int for name in names
+    ):
+        raise ValueError("Invalid cursor")
+    return {name: key[name] for name in names}
+
+
+def player_page_query(db, order, after, limit):
+    """
+    Keyset page query: rows strictly after the `after` key.
+
+    :param order: "id" or "score".
+    :param after: Decoded cursor dict, or None for the first page.
+    :param limit: Rows to fetch.
+    """
+    query = db.query(Player)
+    if order == "score":
+        if after is not None:
+            query = query.filter(tuple_(Player.score, Player.id) < (after["score"], after["id"]))
+        query = query.order_by(desc(Player.score), desc(Player.id))
+    else:
+        if after is not None:
+            query = query.filter(Player.id > after["id"])
+        query = query.order_by(Player.id)
+    return query.limit(limit)
+
+
 @player_bp.route("/", methods=["GET"])
 def get_players():
-    db = get_db()
-    players = db.query(Player).all()
-    return jsonify([p.to_dict() for p in players])
+    order = request.args.get("order", "id")
+    if order not in PAGE_ORDERS:
+        return jsonify({"error": f"order must be one of {', '.join(PAGE_ORDERS)}"}), 400
+
+    try:
+        limit = int(request.args.get("limit", Config.PLAYER_PAGE_SIZE))
+        after = decode_cursor(request.args["cursor"], order) if request.args.get("cursor") else None
+    except (TypeError, ValueError, KeyError):
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+    limit = max(1, min(limit, Config.PLAYER_PAGE_MAX))
+    fields, error = parse_fields(Player, request.args.get("fields"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    if request.args.get("stream") == "1":
+        return Response(stream_with_context(_stream_players(order, after, fields)),
+                        mimetype="application/x-ndjson")
+
+    db = get_read_db()
+    # Fetch one extra row to know whether another page follows
+    players = player_page_query(db, order, after, limit + 1).all()
+    next_cursor = encode_cursor(players[limit - 1], order) if len(players) > limit else None
+
+    return jsonify({
+        "players": serialize_list(players[:limit], fields),
+        "next_cursor": next_cursor
+    })
+
+
+def _stream_players(order, after, fields=None):
+    # Each chunk is its own keyset query, so only one chunk of rows
+    # is ever held in memory and no cursor stays open between them
+    db = get_read_db()
+    dumps = current_app.json.dumps
+    while True:
+        players = player_page_query(db, order, after, Config.PLAYER_STREAM_CHUNK).all()
+        yield "".join(dumps(row) + "\n" for row in serialize_list(players, fields))
+        if len(players) < Config.PLAYER_STREAM_CHUNK:
+            return
+        after = {"id": players[-1].id, "score": players[-1].score}
+        # End the read transaction between chunks: the connection goes
+        # back to the pool while the client drains the response
+        db.expunge_all()
+        db.rollback()
+
+
+# ============================================================
+# 4. ROUTE: GET PLAYERS BY ID (BATCH)
+# ------------------------------------------------------------
+# Endpoint: GET /api/players/batch?ids=1,2,3[&fields=id,username]
+# Purpose : Fetch up to Config.BATCH_MAX_IDS players with a
+#           single IN (...) query instead of one request each.
+# ------------------------------------------------------------
+# Example Response:
+# {
+#   "players": [{"id": 1, ...}, {"id": 3, ...}],   (request order)
+#   "missing": [2]
+# }
+# ============================================================
+@player_bp.route("/batch", methods=["GET"])
+def get_players_batch():
+    ids, error = parse_ids(request.args.get("ids"))
+    if not error:
+        fields, error = parse_fields(Player, request.args.get("fields"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    db = get_read_db()
+    players, missing = order_by_ids(ids, db.query(Player).filter(Player.id.in_(ids)).all())
+    return jsonify({
+        "players": serialize_list(players, fields),
+        "missing": missing
+    })
 
 
 # ============================================================
-# 4. ROUTE: GET SINGLE PLAYER BY ID
+# 5. ROUTE: GET SINGLE PLAYER BY ID
 # ------------------------------------------------------------
 # Endpoint: GET /api/players/<int:player_id>
 # Purpose : Retrieve details for a specific player by ID.
@@ -86,7 +228,7 @@ def get_player(player_id):
 
 
 # ============================================================
-# 5. ROUTE: UPDATE PLAYER
+# 6. ROUTE: UPDATE PLAYER
 # ------------------------------------------------------------
 # Endpoint: PUT /api/players/<int:player_id>
 # Purpose : Update an existing player's details such as avatar.
@@ -110,6 +252,7 @@ def update_player(player_id):
 
     db.commit()
     db.refresh(player)
+    response_cache.invalidate(player_tag(player_id))
     return jsonify({
         "message": "Player updated successfully",
         "player": player.to_dict()
@@ -117,10 +260,11 @@ def update_player(player_id):
 
 
 # ============================================================
-# 6. ROUTE: DELETE PLAYER
+# 7. ROUTE: DELETE PLAYER
 # ------------------------------------------------------------
 # Endpoint: DELETE /api/players/<int:player_id>
-# Purpose : Remove a player from the database (optional use).
+# Purpose : Remove a player from the database (optional use),
+#           together with their scores and leaderboard aggregate.
 # ============================================================
 @player_bp.route("/<int:player_id>", methods=["DELETE"])
 def delete_player(player_id):
@@ -129,7 +273,14 @@ def delete_player(player_id):
     if not player:
         return jsonify({"error": "Player not found"}), 404
 
+    # One transaction: the aggregate never outlives the player
+    db.query(Score).filter_by(player_id=player_id).delete(synchronize_session=False)
+    db.query(PlayerStats).filter_by(player_id=player_id).delete(synchronize_session=False)
     db.delete(player)
     db.commit()
 
+    # Take the player off the ranking and out of cached responses
+    ranked_leaderboard.remove(player_id)
+    response_cache.invalidate(LEADERBOARD_TAG, PLAYERS_TAG, player_tag(player_id))
+
     return jsonify({"message": f"Player {player_id} deleted successfully"}), 200
@@ -5,7 +5,9 @@
 # and integrates Socket.IO for real-time game communication.
 # ============================================================
 
-from flask import Flask, jsonify
+import os
+
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from backend.sockets.socket_manager import init_socket
 from backend.config import Config
@@ -14,8 +16,10 @@ from backend.config import Config
 # Function: create_app()
 # Purpose: Factory function to create and configure the Flask app.
 # Using a factory allows flexibility for testing and scaling later.
+# handoff=False skips claiming checkpoints and the SIGTERM drain
+# (processes that never serve requests, e.g. the reloader parent).
 # ============================================================
-def create_app():
+def create_app(handoff=True):
     app = Flask(__name__, template_folder='templates', static_folder='static')
 
     # Load configuration from config.py
@@ -24,16 +28,10 @@ def create_app():
     # Enable Cross-Origin Resource Sharing (CORS)
     CORS(app, supports_credentials=True)
 
-    # ============================================================
-    # SECTION: In-Memory Game State
-    # ------------------------------------------------------------
-    # This holds temporary data for the current game.
-    # In production, this could be replaced with Redis or a database.
-    # ============================================================
-    GAME_STATE = {
-        'players': {},   # Player list with their states
-        'moves': []      # Recent moves or actions in the game
-    }
+    # Encode JSON responses with orjson when it is installed
+    # (see utils/json_provider.py)
+    from backend.utils.json_provider import install_json_provider
+    install_json_provider(app)
 
     # ============================================================
     # SECTION: Register API Blueprints
@@ -65,10 +63,14 @@ def create_app():
     # ------------------------------------------------------------
     # Quick endpoint to retrieve current game state (for debugging
     # or client sync). In real use, Socket.IO manages live updates.
+    # Each room's state is owned by its actor; this only reads the
+    # latest published (immutable) snapshot, so it never races
+    # with the socket handlers. Defaults to the free-roam lobby.
     # ============================================================
     @app.route('/api/game-state', methods=['GET'])
     def get_game_state():
-        return jsonify(GAME_STATE)
+        from backend.game_logic.actors import room_actors, LOBBY_ROOM
+        return jsonify(room_actors.snapshot(request.args.get('room_id', LOBBY_ROOM)))
 
     # ============================================================
     # SECTION: Initialize Socket.IO
@@ -76,7 +78,86 @@ def create_app():
     # WebSocket setup for real-time player movement, game events,
     # and communication between Tom and Jerry clients.
     # ============================================================
-    socketio = init_socket(app, GAME_STATE)
+    socketio = init_socket(app)
+
+    # ============================================================
+    # SECTION: Database Migrations
+    # ------------------------------------------------------------
+    # Create missing tables and apply pending schema migrations
+    # (columns, indexes) before anything queries the database.
+    # ============================================================
+    from backend.models import init_db
+    init_db()
+
+    # ============================================================
+    # SECTION: Request-Scoped Database Sessions
+    # ------------------------------------------------------------
+    # get_db() returns one session per request; it is rolled back
+    # if uncommitted and closed when the app context tears down.
+    # ============================================================
+    from backend.database.db import init_app as init_db_sessions, pool_status
+    init_db_sessions(app)
+
+    @app.route('/api/metrics/db', methods=['GET'])
+    def get_db_metrics():
+        return jsonify(pool_status())
+
+    # Hit/miss counters of the leaderboard response cache
+    from backend.utils.cache_helper import response_cache
+
+    @app.route('/api/metrics/cache', methods=['GET'])
+    def get_cache_metrics():
+        return jsonify(response_cache.stats())
+
+    # ============================================================
+    # SECTION: Ranked Leaderboard
+    # ------------------------------------------------------------
+    # Load player totals into the in-memory ranking used by the
+    # /api/leaderboard rank and around-me routes, and reload them
+    # periodically to pick up other workers' results.
+    # ============================================================
+    from backend.utils.ranking import ranked_leaderboard
+    ranked_leaderboard.load()
+    ranked_leaderboard.start_reloading()
+
+    # ============================================================
+    # SECTION: Match Result Writer
+    # ------------------------------------------------------------
+    # Replays results spooled by the previous run, then starts the
+    # batched write-behind writer (see database/write_behind.py).
+    # ============================================================
+    from backend.database.write_behind import result_writer
+    result_writer.start()
+
+    # ============================================================
+    # SECTION: Match Tick Scheduler
+    # ------------------------------------------------------------
+    # Background thread ticking every running match at an
+    # adaptive rate (see game_logic/tick_scheduler.py).
+    # ============================================================
+    from backend.game_logic.tick_scheduler import tick_scheduler
+    tick_scheduler.start()
+
+    # ============================================================
+    # SECTION: AI Scheduler
+    # ------------------------------------------------------------
+    # Plans every solo-room AI in one budgeted pass per tick, at a
+    # lower rate for far-away or idle agents
+    # (see game_logic/ai_scheduler.py).
+    # ============================================================
+    from backend.game_logic.ai_scheduler import ai_scheduler
+    ai_scheduler.start()
+
+    # ============================================================
+    # SECTION: Match Handoff
+    # ------------------------------------------------------------
+    # Resume matches checkpointed by a worker that was drained
+    # during a deploy, and hand ours off the same way on SIGTERM.
+    # ============================================================
+    if handoff:
+        from backend.game_logic.checkpoint import resume_handoff, install_drain_handler
+        resume_handoff()
+        install_drain_handler()
 
     return app, socketio
 
@@ -88,5 +169,10 @@ def create_app():
 # The host '0.0.0.0' allows external access in LAN/dev mode.
 # ============================================================
 if __name__ == '__main__':
-    app, socketio = create_app()
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    # In debug mode the reloader runs the app in a child process
+    # (WERKZEUG_RUN_MAIN=true); the parent only watches files, so
+    # it must not claim checkpoints the child should resume.
+    debug = True
+    serving = not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    app, socketio = create_app(handoff=serving)
+    socketio.run(app, host='0.0.0.0', port=5000, debug=debug)
@@ -12,6 +12,20 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 # Path to the database file
 DATABASE_PATH = os.path.join(BASE_DIR, "database", "tomjerry.db")
 
+# Directory where recorded match replays are written
+REPLAY_DIR = os.environ.get("REPLAY_DIR", os.path.join(BASE_DIR, "replays"))
+
+# Room checkpoints handed from a draining worker to its replacement
+HANDOFF_DIR = os.environ.get("HANDOFF_DIR", os.path.join(BASE_DIR, "handoff"))
+
+# Map sources (shared with the frontend) and compiled level files
+MAPS_DIR = os.path.join(os.path.dirname(BASE_DIR), "frontend", "src", "assets", "maps")
+LEVELS_DIR = os.environ.get("LEVELS_DIR", os.path.join(BASE_DIR, "levels"))
+
+# Append-only spools of match results not yet committed by the
+# write-behind writer, one file per worker process
+WRITE_BEHIND_SPOOL_DIR = os.environ.get("WRITE_BEHIND_SPOOL_DIR", os.path.join(BASE_DIR, "database", "spool"))
+
 
 class Config:
     """General Flask application configuration."""
@@ -20,4 +34,98 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = True
 
+    # AI scheduling (per worker)
+    AI_TICK_BUDGET_MS = float(os.environ.get("AI_TICK_BUDGET_MS", "2.0"))
+    AI_NEAR_DISTANCE = float(os.environ.get("AI_NEAR_DISTANCE", "150"))
+    AI_FAR_DISTANCE = float(os.environ.get("AI_FAR_DISTANCE", "400"))
+    AI_IDLE_SECONDS = float(os.environ.get("AI_IDLE_SECONDS", "10"))
+    AI_LOOKAHEAD_BUDGET_MS = float(os.environ.get("AI_LOOKAHEAD_BUDGET_MS", "1.5"))
+
+    # Match simulation
+    SIM_TICK_RATE = int(os.environ.get("SIM_TICK_RATE", "20"))
+    MATCH_DURATION_SECONDS = int(os.environ.get("MATCH_DURATION_SECONDS", "30"))
+    DEFAULT_MAP = os.environ.get("DEFAULT_MAP", "house")
+
+    # Room lifecycle (seconds) and chat history cap
+    ROOM_IDLE_SECONDS = float(os.environ.get("ROOM_IDLE_SECONDS", "120"))
+    ROOM_ABANDON_SECONDS = float(os.environ.get("ROOM_ABANDON_SECONDS", "600"))
+    ROOM_FINISHED_TTL_SECONDS = float(os.environ.get("ROOM_FINISHED_TTL_SECONDS", "300"))
+    ROOM_CHAT_HISTORY = int(os.environ.get("ROOM_CHAT_HISTORY", "100"))
+    ROOM_MOVE_HISTORY = int(os.environ.get("ROOM_MOVE_HISTORY", "100"))
+
+    # Adaptive tick rates: slowest rate for a running match, share of
+    # one core ticks may use before rooms are refused, and where
+    # refused players are sent ("" = just ask them to retry).
+    # Tom-Jerry distances (px) for full / half rate, and seconds
+    # without input before a room drops to the slowest rate.
+    TICK_MIN_RATE = int(os.environ.get("TICK_MIN_RATE", "5"))
+    TICK_NEAR_DISTANCE = float(os.environ.get("TICK_NEAR_DISTANCE", "150"))
+    TICK_FAR_DISTANCE = float(os.environ.get("TICK_FAR_DISTANCE", "400"))
+    TICK_IDLE_SECONDS = float(os.environ.get("TICK_IDLE_SECONDS", "10"))
+    TICK_CPU_BUDGET = float(os.environ.get("TICK_CPU_BUDGET", "0.6"))
+    OVERFLOW_SERVER_URL = os.environ.get("OVERFLOW_SERVER_URL", "")
+
+    # Dead reckoning: extrapolation error (px) and longest silence (s)
+    # before an entity update is sent
+    DR_POSITION_THRESHOLD = float(os.environ.get("DR_POSITION_THRESHOLD", "4.0"))
+    DR_MAX_SILENCE_SECONDS = float(os.environ.get("DR_MAX_SILENCE_SECONDS", "1.0"))
+
+    # Lobby subscriptions: room list changes are batched this often (ms)
+    LOBBY_BATCH_MS = int(os.environ.get("LOBBY_BATCH_MS", "250"))
+
+    # Threads shared by all room actors (see game_logic/actors.py)
+    ACTOR_THREADS = int(os.environ.get("ACTOR_THREADS", "4"))
+
+    # SQLite storage profile (see database/db.py): journal mode,
+    # sync level, mmap size (bytes), page cache (KiB) and how long a
+    # writer waits for the lock (ms)
+    DB_JOURNAL_MODE = os.environ.get("DB_JOURNAL_MODE", "WAL")
+    DB_SYNCHRONOUS = os.environ.get("DB_SYNCHRONOUS", "NORMAL")
+    DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+    DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", "65536"))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+
+    # Connection pools: read-write, and read-only (leaderboard/history)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "4"))
+    DB_READ_POOL_SIZE = int(os.environ.get("DB_READ_POOL_SIZE", "8"))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+    # Player listing: default and largest page, and rows fetched per
+    # query while streaming NDJSON
+    PLAYER_PAGE_SIZE = int(os.environ.get("PLAYER_PAGE_SIZE", "50"))
+    PLAYER_PAGE_MAX = int(os.environ.get("PLAYER_PAGE_MAX", "200"))
+    PLAYER_STREAM_CHUNK = int(os.environ.get("PLAYER_STREAM_CHUNK", "500"))
+
+    # Most ids (or results) a single batch request may carry
+    BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", "100"))
+
+    # A pooled connection held longer than this (s) is reported as leaked
+    DB_LEAK_SECONDS = float(os.environ.get("DB_LEAK_SECONDS", "30"))
+
+    # Write-behind match results (database/write_behind.py): queue
+    # bound, results per transaction, longest wait before a partial
+    # batch is written (ms), and whether each spool append is fsynced
+    WRITE_BEHIND_ENABLED = os.environ.get("WRITE_BEHIND_ENABLED", "0") == "1"
+    WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+    WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "200"))
+    WRITE_BEHIND_FLUSH_MS = int(os.environ.get("WRITE_BEHIND_FLUSH_MS", "50"))
+    WRITE_BEHIND_FSYNC = os.environ.get("WRITE_BEHIND_FSYNC", "0") == "1"
+    # Wait (ms) before retrying results whose write hit a transient
+    # database error (locked, busy timeout)
+    WRITE_BEHIND_RETRY_MS = int(os.environ.get("WRITE_BEHIND_RETRY_MS", "500"))
+
+    # Cached GET responses (utils/cache_helper.py): on/off and the
+    # most entries kept (least recently used ones are evicted)
+    RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    # Cached responses and the in-memory ranking belong to one worker
+    # process, so writes committed by other workers only reach them
+    # when entries expire / the ranking is reloaded from player_stats.
+    # 0 disables either timer. A single worker sees all its writes, so
+    # response entries never expire by default; set a TTL (e.g. 5)
+    # when running several workers.
+    RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "0"))
+    RANKING_RELOAD_SECONDS = float(os.environ.get("RANKING_RELOAD_SECONDS", "30"))
+
 SECRET_KEY = Config.SECRET_KEY
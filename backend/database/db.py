@@ -4,9 +4,17 @@
 #              and session for handling all database operations
 # ============================================================
 
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+
+from flask import g, has_app_context, jsonify
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, scoped_session
-from backend.config import DATABASE_PATH
+from backend.config import DATABASE_PATH, Config
+from backend.database.pool_metrics import (
+    instrumented_pool_class, track_engine,
+    write_pool_metrics, read_pool_metrics, session_metrics
+)
 
 # ============================================================
 # 1. DATABASE CONNECTION STRING
@@ -19,24 +27,75 @@ from backend.config import DATABASE_PATH
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 # ============================================================
-# 2. ENGINE CREATION
+# 2. CONNECTION PRAGMAS
+# ------------------------------------------------------------
+# Applied to every new pooled connection (see Config.DB_*):
+#   - WAL: readers never block the writer and vice versa, so
+#     leaderboard reads keep going while matches record scores
+#   - synchronous=NORMAL: safe with WAL, fsync only at checkpoints
+#   - mmap_size / cache_size: serve hot pages from memory
+#   - busy_timeout: wait for the write lock instead of failing
+# Read-only connections also set query_only, so a stray write
+# through them fails loudly.
+# ============================================================
+def _apply_pragmas(dbapi_connection, read_only=False):
+    cursor = dbapi_connection.cursor()
+    try:
+        if not read_only:
+            # Journal mode is stored in the database file; the
+            # writer sets it once, readers just follow it
+            cursor.execute(f"PRAGMA journal_mode={Config.DB_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={Config.DB_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={Config.DB_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{Config.DB_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA busy_timeout={Config.DB_BUSY_TIMEOUT_MS}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+# ============================================================
+# 3. ENGINE CREATION
 # ------------------------------------------------------------
 # The engine acts as the core interface to the database.
 # It manages connections, executes SQL commands, and handles
 # communication between SQLAlchemy and the actual DB file.
+# Connections are pooled (QueuePool) and reused across requests,
+# so setup and the pragmas above are paid once per connection.
+# `read_engine` is a separate pool of read-only connections for
+# leaderboard and history reads. Both pools are instrumented
+# (see pool_metrics.py).
 # ============================================================
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite specific
-    echo=False  # Set to True for debugging SQL queries
-)
+def _create_engine(pool_size, max_overflow, metrics, read_only=False):
+    new_engine = create_engine(
+        DATABASE_URL,
+        connect_args={
+            "check_same_thread": False,  # SQLite specific
+            "timeout": Config.DB_BUSY_TIMEOUT_MS / 1000.0
+        },
+        poolclass=instrumented_pool_class(metrics),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        echo=False  # Set to True for debugging SQL queries
+    )
+    event.listen(new_engine, "connect",
+                 lambda dbapi_connection, _: _apply_pragmas(dbapi_connection, read_only))
+    track_engine(new_engine, metrics)
+    return new_engine
+
+
+engine = _create_engine(Config.DB_POOL_SIZE, Config.DB_MAX_OVERFLOW, write_pool_metrics)
+read_engine = _create_engine(Config.DB_READ_POOL_SIZE, 0, read_pool_metrics, read_only=True)
 
 # ============================================================
-# 3. SESSION FACTORY
+# 4. SESSION FACTORIES
 # ------------------------------------------------------------
 # Session objects handle transactions and ORM operations.
 # We use scoped_session so each Flask request gets its own
-# isolated session (thread-safe).
+# isolated session (thread-safe). ReadSessionLocal sessions use
+# the read-only pool.
 # ============================================================
 SessionLocal = scoped_session(
     sessionmaker(
@@ -46,26 +105,120 @@ SessionLocal = scoped_session(
     )
 )
 
+ReadSessionLocal = scoped_session(
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine
+    )
+)
+
 # ============================================================
-# 4. HELPER FUNCTION
+# 5. REQUEST-SCOPED SESSIONS
 # ------------------------------------------------------------
-# This function returns a database session. Use it inside your
-# API routes or game logic to query or modify data.
-# Always close the session after using it!
+# Inside a request (or any Flask app context), get_db() returns
+# the same session every time it is called, and the app-context
+# teardown registered by init_app() rolls back anything left
+# uncommitted and closes it, even when the route raised. Routes
+# never close sessions themselves.
 # Example usage:
 #   db = get_db()
 #   players = db.query(PlayerModel).all()
-#   db.close()
+#
+# Outside an app context (background threads, CLI tools) use
+# session_scope() instead, which closes the session on exit.
 # ============================================================
+_REGISTRIES = {"write": SessionLocal, "read": ReadSessionLocal}
+
+
+# Remember flushed-but-uncommitted writes, so teardown can count
+# requests that returned without committing their changes
+@event.listens_for(SessionLocal.session_factory, "after_flush")
+def _mark_pending_writes(session, flush_context):
+    session.info["pending_writes"] = True
+
+
+@event.listens_for(SessionLocal.session_factory, "after_commit")
+@event.listens_for(SessionLocal.session_factory, "after_rollback")
+def _clear_pending_writes(session):
+    session.info.pop("pending_writes", None)
+
+
+def _request_session(kind):
+    if not has_app_context():
+        raise RuntimeError("get_db() needs an app context; use session_scope() outside requests")
+    sessions = g.setdefault("_db_sessions", set())
+    if kind not in sessions:
+        sessions.add(kind)
+        session_metrics.record_open()
+    return _REGISTRIES[kind]()
+
+
 def get_db():
-    db = SessionLocal()
+    return _request_session("write")
+
+
+# Same as get_db, but on a read-only connection: use it for
+# leaderboard and history reads so they never queue behind writes.
+def get_read_db():
+    return _request_session("read")
+
+
+def _teardown_sessions(exc=None):
+    for kind in g.pop("_db_sessions", ()):
+        registry = _REGISTRIES[kind]
+        session = registry()
+        discarded = bool(session.new or session.dirty or session.deleted
+                         or session.info.get("pending_writes"))
+        try:
+            session.rollback()
+        finally:
+            registry.remove()
+            session_metrics.record_close(rolled_back=discarded)
+
+
+@contextmanager
+def session_scope(read_only=False):
+    """
+    Session for code running outside a request; rolled back on
+    error and always closed on exit. It is a fresh session, never
+    the thread's request session.
+    """
+    registry = ReadSessionLocal if read_only else SessionLocal
+    session = registry.session_factory()
     try:
-        yield db
+        yield session
+    except Exception:
+        session.rollback()
+        raise
     finally:
-        db.close()
+        session.close()
+
+
+def init_app(app):
+    """
+    Tie sessions to the app context and answer pool exhaustion
+    with 503 instead of a hung request.
+    """
+    app.teardown_appcontext(_teardown_sessions)
+
+    @app.errorhandler(PoolTimeoutError)
+    def _pool_exhausted(error):
+        return jsonify({"error": "Database busy, try again"}), 503
+
+
+def pool_status():
+    """Metrics for GET /api/metrics/db."""
+    return {
+        "pools": {
+            "write": write_pool_metrics.snapshot(engine.pool),
+            "read": read_pool_metrics.snapshot(read_engine.pool)
+        },
+        "sessions": session_metrics.snapshot()
+    }
 
 # ============================================================
-# 5. INITIALIZATION CHECK
+# 6. INITIALIZATION CHECK
 # ------------------------------------------------------------
 # When this file runs, it prints a confirmation message.
 # Useful during debugging or server startup.
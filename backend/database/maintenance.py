@@ -0,0 +1,67 @@
+# ============================================================
+# File: backend/database/maintenance.py
+# Description: Offline maintenance commands for the game database.
+#              Currently: rebuilding the player_stats leaderboard
+#              aggregate from the scores and games tables (backfill after
+#              upgrading, or repair after manual score edits).
+#
+# Usage:
+#   python -m backend.database.maintenance rebuild-stats
+# ============================================================
+
+import argparse
+
+from sqlalchemy import func
+
+from backend.database.db import SessionLocal
+from backend.database.migrations import migrate, backfill_player_stats
+from backend.models.player_stats_model import PlayerStats
+
+
+# ============================================================
+# 1. REBUILD PLAYER STATS
+# ------------------------------------------------------------
+# Recomputes every aggregate row from the scores and games tables
+# (migrations.backfill_player_stats) and replaces the table
+# contents in a single transaction, so readers see either the old
+# or the new totals.
+# ============================================================
+def rebuild_player_stats(db=None):
+    """
+    Rebuild the player_stats table from the scores and games tables.
+
+    :param db: Optional session; a new one is opened (and closed) if omitted.
+    :return: Number of players with a stats row.
+    """
+    migrate()
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        backfill_player_stats(db)
+        count = db.query(func.count(PlayerStats.player_id)).scalar()
+        db.commit()
+        return count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+# ============================================================
+# 2. COMMAND LINE ENTRY POINT
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tom & Jerry database maintenance")
+    parser.add_argument("command", choices=["rebuild-stats"], help="Maintenance task to run")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-stats":
+        count = rebuild_player_stats()
+        print(f"✅ Rebuilt leaderboard stats for {count} players.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# ============================================================
+# File: backend/database/migrations.py
+# Description: Lightweight versioned schema migrations.
+#              `Base.metadata.create_all` only creates missing
+#              tables, so columns and indexes added to a model
+#              never reach an existing database. Each migration
+#              here runs once, is recorded in `schema_migrations`,
+#              and is written to be safe to re-run.
+#
+#              Also provides a query plan check: every query shape
+#              the API issues is run through EXPLAIN QUERY PLAN and
+#              the check fails on a full-table scan.
+#
+# Usage:
+#   python -m backend.database.migrations upgrade
+#   python -m backend.database.migrations status
+#   python -m backend.database.migrations check-plans [--live]
+# ============================================================
+
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, desc, func, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.database.db import engine as default_engine
+
+
+# ============================================================
+# 1. IDEMPOTENT DDL HELPERS
+# ------------------------------------------------------------
+# SQLite has no "ADD COLUMN IF NOT EXISTS", so columns are
+# checked through PRAGMA table_info first.
+# ============================================================
+def column_exists(conn, table, column):
+    rows = conn.execute(text(f"PRAGMA table_info({table})")).all()
+    return any(row[1] == column for row in rows)
+
+
+def add_column(conn, table, column, ddl):
+    """
+    Add a column unless it already exists.
+
+    :param conn: Connection inside the migration's transaction.
+    :param table: Table name.
+    :param column: Column name.
+    :param ddl: Column type and constraints, e.g. "VARCHAR(20)".
+    """
+    if not column_exists(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def add_index(conn, name, table, columns, unique=False):
+    """
+    Create an index unless one with this name already exists.
+
+    :param columns: Column names in index order.
+    """
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+# ============================================================
+# 2. MIGRATIONS
+# ------------------------------------------------------------
+# Append new migrations at the end; never edit or renumber one
+# that has shipped. Index names match the models' __table_args__
+# so fresh databases (create_all) and migrated ones agree.
+# ============================================================
+def _create_tables(conn):
+    # Creates any missing table (with its model indexes)
+    from backend.models import Base
+    Base.metadata.create_all(bind=conn)
+
+
+def _add_game_session_columns(conn):
+    # Columns the /api/game routes read and write
+    add_column(conn, "games", "player1_id", "INTEGER REFERENCES players(id)")
+    add_column(conn, "games", "player2_id", "INTEGER REFERENCES players(id)")
+    add_column(conn, "games", "map_name", "VARCHAR(50)")
+    add_column(conn, "games", "status", "VARCHAR(20)")
+    add_column(conn, "games", "start_time", "DATETIME")
+    add_column(conn, "games", "end_time", "DATETIME")
+
+
+def _add_query_indexes(conn):
+    add_index(conn, "ix_scores_player_created", "scores", ["player_id", "created_at"])
+    add_index(conn, "ix_scores_game_id", "scores", ["game_id"])
+    add_index(conn, "ix_games_status", "games", ["status"])
+    add_index(conn, "ix_games_player1_id", "games", ["player1_id"])
+    add_index(conn, "ix_games_player2_id", "games", ["player2_id"])
+    add_index(conn, "ix_games_tom_id", "games", ["tom_id"])
+    add_index(conn, "ix_games_jerry_id", "games", ["jerry_id"])
+    add_index(conn, "ix_player_stats_total_points", "player_stats", ["total_points", "player_id"])
+    add_index(conn, "ix_player_stats_best_score", "player_stats", ["best_score"])
+
+
+def _add_score_result_id(conn):
+    add_column(conn, "scores", "result_id", "VARCHAR(36)")
+    add_index(conn, "ix_scores_result_id", "scores", ["result_id"], unique=True)
+
+
+def _add_player_score_index(conn):
+    # Keyset pagination compares (score, id); NULL scores would
+    # drop out of every page after the first
+    conn.execute(text("UPDATE players SET score = 0 WHERE score IS NULL"))
+    add_index(conn, "ix_players_score_id", "players", ["score", "id"])
+
+
+def backfill_player_stats(conn):
+    """
+    Replace player_stats with aggregates computed from the scores
+    and games tables (also used by maintenance rebuild-stats).
+    Every score is one game played and won. A player also played
+    (and lost) each finished game they took part in without
+    scoring in it. Points stored before they were validated may
+    not be integers, hence the CASTs. Deleted players get no row.
+    players.score is then synced to the new totals.
+
+    :param conn: Connection or session inside a transaction.
+    """
+    conn.execute(text("DELETE FROM player_stats"))
+    conn.execute(text(
+        "INSERT INTO player_stats (player_id, total_points, games_played, wins, best_score, updated_at) "
+        "SELECT player_id, CAST(SUM(points) AS INTEGER), SUM(played), SUM(won), "
+        "CAST(MAX(points) AS INTEGER), :now FROM ("
+        "  SELECT player_id, COALESCE(points, 0) AS points, 1 AS played, 1 AS won FROM scores"
+        "  UNION ALL"
+        "  SELECT p.player_id, 0, 1, 0 FROM ("
+        "    SELECT id AS game_id, tom_id AS player_id FROM games WHERE status = 'finished'"
+        "    UNION SELECT id, jerry_id FROM games WHERE status = 'finished'"
+        "    UNION SELECT id, player1_id FROM games WHERE status = 'finished'"
+        "    UNION SELECT id, player2_id FROM games WHERE status = 'finished'"
+        "  ) AS p"
+        "  WHERE p.player_id IS NOT NULL AND NOT EXISTS ("
+        "    SELECT 1 FROM scores s WHERE s.game_id = p.game_id AND s.player_id = p.player_id)"
+        ") WHERE player_id IN (SELECT id FROM players) GROUP BY player_id"
+    ), {"now": datetime.utcnow()})
+    sync_player_scores(conn)
+
+
+def sync_player_scores(conn):
+    """Set players.score (the accumulated score) to each player's total_points."""
+    conn.execute(text(
+        "UPDATE players SET score = COALESCE("
+        "(SELECT total_points FROM player_stats WHERE player_stats.player_id = players.id), 0)"
+    ))
+
+
+def _backfill_player_stats(conn):
+    # player_stats starts empty on a database that already has
+    # scores; rebuild it so the leaderboard and the in-memory
+    # ranking show historical points on first boot.
+    backfill_player_stats(conn)
+
+
+def _recount_games_played(conn):
+    # Migration 6 counted every score as the only game played, so
+    # losses were missing; recompute with the losers' games.
+    backfill_player_stats(conn)
+
+
+def _sync_player_scores(conn):
+    # Nothing wrote players.score before record_score kept it equal
+    # to total_points; copy the existing totals over.
+    sync_player_scores(conn)
+
+
+MIGRATIONS = [
+    (1, "create tables", _create_tables),
+    (2, "game session columns", _add_game_session_columns),
+    (3, "query indexes", _add_query_indexes),
+    (4, "score result ids", _add_score_result_id),
+    (5, "player score index", _add_player_score_index),
+    (6, "backfill player stats", _backfill_player_stats),
+    (7, "recount games played", _recount_games_played),
+    (8, "sync player scores", _sync_player_scores),
+]
+
+
+# ============================================================
+# 3. MIGRATION RUNNER
+# ------------------------------------------------------------
+# Each pending migration runs in its own transaction together
+# with its schema_migrations row.
+# ============================================================
+def applied_versions(bind=None):
+    bind = bind or default_engine
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def migrate(bind=None):
+    """
+    Apply all pending migrations.
+
+    :param bind: Engine to migrate (defaults to the app database).
+    :return: List of versions applied by this call.
+    """
+    bind = bind or default_engine
+    done = applied_versions(bind)
+    applied = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.utcnow()}
+            )
+        applied.append(version)
+        print(f"[Migrations] ✅ Applied {version}: {name}")
+    return applied
+
+
+# ============================================================
+# 4. QUERY PLAN CHECK
+# ------------------------------------------------------------
+# One entry per query the API issues, built the same way the
+# route builds it. Index scans (ordered walks with LIMIT,
+# covering-index counts) are allowed; a plain "SCAN <table>"
+# means every row is read and fails the check, unless the query
+# has a LIMIT and needs no sort step (a rowid walk in ORDER BY
+# order stops after LIMIT rows).
+# ============================================================
+def _query_shapes():
+    from backend.models.player_model import Player
+    from backend.models.game_model import Game
+    from backend.models.score_model import Score
+    from backend.models.player_stats_model import PlayerStats
+    from backend.api.player import player_page_query
+
+    return [
+        ("auth/player: player by username", lambda db: db.query(Player).filter_by(username="tom")),
+        ("player: player by id", lambda db: db.query(Player).filter_by(id=1)),
+        ("player: first page by id", lambda db: player_page_query(db, "id", None, 50)),
+        ("player: page by id", lambda db: player_page_query(db, "id", {"id": 10}, 50)),
+        ("player: first page by score", lambda db: player_page_query(db, "score", None, 50)),
+        ("player: page by score", lambda db: player_page_query(db, "score", {"score": 5, "id": 10}, 50)),
+        ("player: batch by id", lambda db: db.query(Player).filter(Player.id.in_([1, 2, 3]))),
+        ("game: game by id", lambda db: db.query(Game).filter_by(id=1)),
+        ("game: batch by id", lambda db: db.query(Game).filter(Game.id.in_([1, 2, 3]))),
+        ("game: active games", lambda db: db.query(Game).filter_by(status="active")),
+        ("game: stats row by player", lambda db: db.query(PlayerStats).filter_by(player_id=1)),
+        ("leaderboard: top players", lambda db: (
+            db.query(Player.id, Player.username, PlayerStats.total_points)
+            .join(PlayerStats, Player.id == PlayerStats.player_id)
+            .order_by(desc(PlayerStats.total_points), desc(PlayerStats.player_id))
+            .limit(10)
+        )),
+        ("leaderboard: recent scores", lambda db: (
+            db.query(Score).filter_by(player_id=1).order_by(desc(Score.created_at)).limit(10)
+        )),
+        ("write-behind: applied results", lambda db: (
+            db.query(Score.result_id).filter(Score.result_id.in_(["a", "b"]))
+        )),
+        ("leaderboard: summary players", lambda db: db.query(func.count(Player.id))),
+        ("leaderboard: summary games", lambda db: db.query(func.count(Score.game_id.distinct()))),
+        ("leaderboard: summary best", lambda db: db.query(func.max(PlayerStats.best_score))),
+    ]
+
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def check_query_plans(bind=None):
+    """
+    EXPLAIN QUERY PLAN every API query shape.
+
+    :param bind: Migrated engine to check; defaults to a fresh
+                 in-memory database built by the migrations.
+    :return: List of (name, plan_detail) for full-table scans.
+    """
+    if bind is None:
+        bind = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                             poolclass=StaticPool)
+        migrate(bind)
+
+    failures = []
+    with Session(bind=bind) as db:
+        for name, build in _query_shapes():
+            statement = build(db).statement
+            sql = str(statement.compile(bind, compile_kwargs={"literal_binds": True}))
+            plan = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+            bounded = re.search(r"\bLIMIT\b", sql) and not any("TEMP B-TREE" in row[-1] for row in plan)
+            for row in plan:
+                detail = row[-1]
+                if FULL_SCAN.match(detail) and not bounded:
+                    failures.append((name, detail))
+            print(f"[Migrations] {name}: " + "; ".join(row[-1] for row in plan))
+    return failures
+
+
+# ============================================================
+# 5. COMMAND LINE ENTRY POINT
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tom & Jerry schema migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "check-plans"])
+    parser.add_argument("--live", action="store_true",
+                        help="check-plans against the app database instead of a fresh one")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        applied = migrate()
+        print(f"✅ Database up to date ({len(applied)} migrations applied).")
+    elif args.command == "status":
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"{'applied' if version in done else 'pending'}  {version}: {name}")
+    else:
+        failures = check_query_plans(default_engine if args.live else None)
+        for name, detail in failures:
+            print(f"❌ Full-table scan in '{name}': {detail}")
+        if failures:
+            sys.exit(1)
+        print("✅ No full-table scans in API queries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# ============================================================
+# File: backend/database/pool_metrics.py
+# Description:
+#     Connection pool instrumentation for database/db.py.
+#     For each engine ("write", "read") it tracks:
+#       - checkouts and how long callers waited for a connection
+#       - pool timeouts (the pool was exhausted)
+#       - connections held longer than Config.DB_LEAK_SECONDS,
+#         reported as suspected leaks with the thread and request
+#         that checked them out
+#     plus request-scoped session counters updated by db.py.
+#     Served by GET /api/metrics/db.
+# ============================================================
+
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from backend.config import Config
+
+
+# ============================================================
+# SECTION 1: Per-Pool Metrics
+# ============================================================
+class PoolMetrics:
+    def __init__(self, name):
+        """
+        :param name: Label of the pool in the metrics output.
+        """
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.leaks_reported = 0
+        self._held = {}             # id(connection record) -> (since, thread, path, reported)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        path = request.path if has_request_context() else None
+        with self._lock:
+            self._held[id(connection_record)] = (time.monotonic(), threading.current_thread().name, path, False)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._held.pop(id(connection_record), None)
+
+    def suspected_leaks(self, now=None):
+        """Connections checked out for longer than Config.DB_LEAK_SECONDS."""
+        now = now if now is not None else time.monotonic()
+        leaks = []
+        with self._lock:
+            for key, (since, thread, path, reported) in self._held.items():
+                age = now - since
+                if age < Config.DB_LEAK_SECONDS:
+                    continue
+                if not reported:
+                    # Log each leak once
+                    self._held[key] = (since, thread, path, True)
+                    self.leaks_reported += 1
+                    print(f"[PoolMetrics] ⚠️ {self.name}: connection held {age:.0f}s "
+                          f"by thread '{thread}' (request {path})")
+                leaks.append({"age_seconds": round(age, 1), "thread": thread, "path": path})
+        return leaks
+
+    def snapshot(self, pool):
+        leaks = self.suspected_leaks()
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "leaks_reported": self.leaks_reported,
+                "suspected_leaks": leaks
+            }
+
+
+# ============================================================
+# SECTION 2: Instrumented Pool
+# ------------------------------------------------------------
+# QueuePool that times every checkout, including the wait for a
+# free connection. db.py builds one subclass per engine with its
+# PoolMetrics as a class attribute, so it survives pool.recreate().
+# ============================================================
+class InstrumentedQueuePool(QueuePool):
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def instrumented_pool_class(metrics):
+    """Pool class for create_engine(poolclass=...) reporting into `metrics`."""
+    return type(f"{metrics.name.title()}QueuePool", (InstrumentedQueuePool,), {"metrics": metrics})
+
+
+def track_engine(engine, metrics):
+    """Record checkouts/checkins of an engine's pool for leak detection."""
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+
+
+# ============================================================
+# SECTION 3: Session Counters
+# ------------------------------------------------------------
+# Request-scoped sessions opened/closed by db.get_db and the
+# app-context teardown.
+# ============================================================
+class SessionMetrics:
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.rolled_back = 0        # uncommitted changes discarded at teardown
+        self._lock = threading.Lock()
+
+    def record_open(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_close(self, rolled_back=False):
+        with self._lock:
+            self.closed += 1
+            self.rolled_back += 1 if rolled_back else 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open": self.opened - self.closed,
+                "opened": self.opened,
+                "closed": self.closed,
+                "rolled_back_at_teardown": self.rolled_back
+            }
+
+
+# ============================================================
+# SECTION 4: Global Metrics Instances
+# ============================================================
+write_pool_metrics = PoolMetrics("write")
+read_pool_metrics = PoolMetrics("read")
+session_metrics = SessionMetrics()
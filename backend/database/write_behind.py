@@ -0,0 +1,407 @@
+# ============================================================
+# File: backend/database/write_behind.py
+# Description:
+#     Match results (game finished + winner's score + leaderboard
+#     aggregate) and an optional write-behind pipeline for them.
+#
+#     record_match_result() applies one result inside a session;
+#     both the synchronous end_game path and the background
+#     writer use it, so the two can never drift apart.
+#
+#     With Config.WRITE_BEHIND_ENABLED, end_game only appends the
+#     result to a spool file and a bounded queue, and answers
+#     202 at once. A background thread drains the queue and
+#     commits up to WRITE_BEHIND_BATCH_SIZE results per
+#     transaction, so an end-of-match burst costs one commit per
+#     batch instead of one per result.
+#
+#     Durability: each worker process appends to its own spool
+#     (results-<pid>.spool), so no worker ever truncates records
+#     another one has not committed. On startup a worker claims
+#     the spools of processes that are gone (by renaming them, as
+#     checkpoint.resume_handoff does) and replays them. Every result
+#     carries a result_id stored on its Score row (unique), so a
+#     result that was committed just before a crash is skipped
+#     rather than applied twice. A result is only dropped when it
+#     can never be written (invalid, or rejected by a constraint);
+#     transient errors such as "database is locked" are retried,
+#     and the spool is kept until every result is committed.
+# ============================================================
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from backend.config import Config, WRITE_BEHIND_SPOOL_DIR
+from backend.database.db import session_scope
+from backend.models.game_model import Game
+from backend.models.player_model import Player
+from backend.models.score_model import Score
+from backend.models.player_stats_model import record_score
+from backend.utils.ranking import ranked_leaderboard
+from backend.utils.cache_helper import response_cache, player_tag, LEADERBOARD_TAG
+
+
+# ============================================================
+# 1. APPLYING ONE MATCH RESULT
+# ------------------------------------------------------------
+# A game is ended at most once: it is marked finished with a
+# conditional UPDATE, which SQLite evaluates under its write lock,
+# so two concurrent results for one game cannot both be credited.
+# ============================================================
+class GameAlreadyEnded(ValueError):
+    """The game was finished by an earlier result."""
+
+
+def points_error(points):
+    """Error message if `points` is not a valid score, else None."""
+    # bool is an int subclass, but true/false are not points
+    if not isinstance(points, int) or isinstance(points, bool):
+        return "points must be an integer"
+    return None
+
+
+def record_match_result(db, game_id, winner_id, points, ended_at=None, result_id=None):
+    """
+    Mark a game finished and record the winner's score and the
+    players' aggregates, without committing (the caller owns the
+    transaction). The game's other participants are counted as
+    having played (and lost) it.
+
+    :param db: Active SQLAlchemy session.
+    :param game_id: Finished game (may be None for ad-hoc scores).
+    :param winner_id: Player credited with the points.
+    :param points: Points scored.
+    :param ended_at: When the match ended (defaults to now).
+    :param result_id: Unique ID of a write-behind result.
+    :return: Tuple (score, stats rows), the winner's stats first.
+    :raises ValueError: If points is not an integer.
+    :raises GameAlreadyEnded: If the game is already finished.
+    """
+    error = points_error(points)
+    if error:
+        raise ValueError(error)
+    ended_at = ended_at or datetime.utcnow()
+    game = db.get(Game, game_id) if game_id is not None else None
+    if game is not None:
+        claimed = db.execute(
+            update(Game)
+            .where(Game.id == game_id, or_(Game.status.is_(None), Game.status != "finished"))
+            .values(status="finished", end_time=ended_at)
+        ).rowcount
+        if not claimed:
+            raise GameAlreadyEnded(f"Game {game_id} has already ended")
+
+    score = Score(player_id=winner_id, game_id=game_id, points=points, result_id=result_id)
+    db.add(score)
+    stats_rows = [record_score(db, winner_id, points, won=True)]
+    if game is not None:
+        participants = {game.tom_id, game.jerry_id, game.player1_id, game.player2_id}
+        for loser_id in sorted(participants - {winner_id, None}):
+            stats_rows.append(record_score(db, loser_id, 0, won=False))
+    return score, stats_rows
+
+
+def update_rankings(db, stats_rows):
+    """
+    Push committed totals into the in-memory ranking and drop the
+    cached leaderboard responses they change.
+    """
+    totals = {stats.player_id: stats.total_points for stats in stats_rows}
+    if not totals:
+        return
+    usernames = dict(db.query(Player.id, Player.username).filter(Player.id.in_(list(totals))).all())
+    for player_id, total in totals.items():
+        ranked_leaderboard.set_total(player_id, total, usernames.get(player_id))
+    response_cache.invalidate(LEADERBOARD_TAG, *(player_tag(player_id) for player_id in totals))
+
+
+# ============================================================
+# 2. WRITE-BEHIND RESULT WRITER
+# ------------------------------------------------------------
+# submit() appends to the spool and the queue under one lock, so
+# the spool always holds at least every result that has not been
+# committed. Once the writer has committed everything it took,
+# nothing is waiting for a retry and the queue is empty, the
+# spool is truncated.
+# ============================================================
+
+SPOOL_PREFIX = "results-"
+SPOOL_EXTENSION = ".spool"
+CLAIMED_SUFFIX = ".claimed"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True     # exists, owned by another user
+    return True
+
+
+def _spool_owner(name):
+    """
+    PID of the process a spool file belongs to, or None if `name`
+    is not a spool. "results-<pid>.spool" belongs to <pid>;
+    "results-<pid>.spool.<claimer>.claimed" to the claimer.
+    """
+    try:
+        if name.endswith(CLAIMED_SUFFIX):
+            return int(name[:-len(CLAIMED_SUFFIX)].rsplit(".", 1)[1])
+        if name.startswith(SPOOL_PREFIX) and name.endswith(SPOOL_EXTENSION):
+            return int(name[len(SPOOL_PREFIX):-len(SPOOL_EXTENSION)])
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def _read_spool(path):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break       # torn last line from a crash mid-append
+    return records
+
+
+# Errors that retrying cannot fix: the record itself is bad
+# (ValueError/KeyError/TypeError from a malformed or invalid
+# record) or the database rejects it (constraint violations).
+# Anything else, notably OperationalError, is treated as
+# transient and retried.
+PERMANENT_ERRORS = (ValueError, KeyError, TypeError, IntegrityError, DataError)
+
+
+class ResultWriter:
+    def __init__(self, spool_dir=WRITE_BEHIND_SPOOL_DIR, max_pending=None,
+                 batch_size=None, flush_ms=None, fsync=None, retry_ms=None):
+        """
+        Initialize the writer. Unset values fall back to Config.
+        :param spool_dir: Directory of the per-process spool files.
+        :param max_pending: Queue bound; submit() refuses when full.
+        :param batch_size: Most results committed per transaction.
+        :param flush_ms: Longest wait for a batch to fill up.
+        :param fsync: fsync every spool append (survives power loss,
+                      not just a process crash).
+        :param retry_ms: Wait before retrying after a transient error.
+        """
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size or Config.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = (flush_ms if flush_ms is not None else Config.WRITE_BEHIND_FLUSH_MS) / 1000.0
+        self.retry_interval = (retry_ms if retry_ms is not None else Config.WRITE_BEHIND_RETRY_MS) / 1000.0
+        self.fsync = fsync if fsync is not None else Config.WRITE_BEHIND_FSYNC
+        self._queue = queue.Queue(maxsize=max_pending or Config.WRITE_BEHIND_QUEUE_SIZE)
+        self._lock = threading.Lock()       # spool appends / truncation
+        self._in_flight = 0                 # taken from the queue, not yet committed or dropped
+        self._retry = []                    # in flight, failed with a transient error
+        self._spool = None
+        self._thread = None
+        self.committed = 0
+        self.dropped = 0
+        self.retried = 0
+
+    # ------------------------------------------------------------
+    # PRODUCER SIDE
+    # ------------------------------------------------------------
+    def submit(self, game_id, winner_id, points):
+        """
+        Queue a match result.
+        :return: The result_id, or None if the queue is full (the
+                 caller should write synchronously instead).
+        """
+        record = {
+            "result_id": uuid.uuid4().hex,
+            "game_id": game_id,
+            "winner_id": winner_id,
+            "points": points,
+            "ended_at": datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            if self._queue.full():
+                return None
+            self._append_spool(record)
+            self._queue.put_nowait(record)
+        return record["result_id"]
+
+    @property
+    def spool_path(self):
+        # Looked up on use, so a worker forked after import gets its own
+        return os.path.join(self.spool_dir, f"{SPOOL_PREFIX}{os.getpid()}{SPOOL_EXTENSION}")
+
+    def _append_spool(self, record):
+        if self._spool is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._spool = open(self.spool_path, "a", encoding="utf-8")
+        self._spool.write(json.dumps(record) + "\n")
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def pending(self):
+        return self._queue.qsize() + self._in_flight
+
+    # ------------------------------------------------------------
+    # WRITER SIDE
+    # ------------------------------------------------------------
+    def start(self):
+        """Replay the spool from a previous run, then start the writer thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.replay_spool()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def replay_spool(self):
+        """
+        Claim and commit the spools left by processes that are gone
+        (including an earlier process with our PID). Results already
+        committed before a crash are skipped; ones that hit a
+        transient error are moved to our own spool and retried by
+        the writer thread.
+        :return: Number of results replayed.
+        """
+        if not os.path.isdir(self.spool_dir):
+            return 0
+
+        replayed = 0
+        for name in sorted(os.listdir(self.spool_dir)):
+            owner = _spool_owner(name)
+            if owner is None or (owner != os.getpid() and _pid_alive(owner)):
+                continue    # not a spool, or its worker is still running
+            path = os.path.join(self.spool_dir, name)
+            base = path[:-len(CLAIMED_SUFFIX)].rsplit(".", 1)[0] if name.endswith(CLAIMED_SUFFIX) else path
+            claimed = f"{base}.{os.getpid()}{CLAIMED_SUFFIX}"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue    # Another worker got it first
+
+            records = _read_spool(claimed)
+            failed = []
+            for i in range(0, len(records), self.batch_size):
+                failed.extend(self._write_safely(records[i:i + self.batch_size]))
+            with self._lock:
+                # Into our own spool before the claimed file goes away
+                for record in failed:
+                    self._append_spool(record)
+                self._retry.extend(failed)
+                self._in_flight += len(failed)
+            os.remove(claimed)
+
+            replayed += len(records)
+            if records:
+                print(f"[ResultWriter] ♻️ Replayed {len(records)} spooled results from {name} "
+                      f"({len(failed)} to retry).")
+        return replayed
+
+    def _next_batch(self):
+        if self._retry:
+            # Back off, then retry together with whatever has queued up
+            time.sleep(self.retry_interval)
+            with self._lock:
+                batch, self._retry = self._retry[:self.batch_size], self._retry[self.batch_size:]
+            timeout = 0
+        else:
+            batch = [self._queue.get()]
+            with self._lock:
+                self._in_flight += 1
+            timeout = self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+            with self._lock:
+                self._in_flight += 1
+            timeout = 0     # after the first wait, only take what is already queued
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            failed = []
+            try:
+                failed = self._write_safely(batch)
+            finally:
+                with self._lock:
+                    self._retry.extend(failed)
+                    self._in_flight -= len(batch) - len(failed)
+                    if not self._retry and self._in_flight == 0 and self._queue.empty():
+                        self._truncate_spool()
+
+    def _write_safely(self, batch):
+        """
+        Write a batch, isolating bad records.
+        :return: Records that failed with a transient error and must
+                 be retried (they remain in the spool).
+        """
+        try:
+            self._write_batch(batch)
+            return []
+        except PERMANENT_ERRORS as e:
+            if len(batch) == 1:
+                self.dropped += 1
+                print(f"[ResultWriter] ⚠️ Dropped result {batch[0].get('result_id')}: {e}")
+                return []
+            # One bad result must not sink the rest of the batch
+            print(f"[ResultWriter] ⚠️ Batch of {len(batch)} failed, writing one by one: {e}")
+            failed = []
+            for record in batch:
+                failed.extend(self._write_safely([record]))
+            return failed
+        except Exception as e:
+            # Locked / busy database and other transient failures
+            self.retried += len(batch)
+            print(f"[ResultWriter] ⚠️ Write of {len(batch)} results failed, will retry: {e}")
+            return list(batch)
+
+    def _write_batch(self, batch):
+        with session_scope() as db:
+            result_ids = [r["result_id"] for r in batch]
+            done = {row[0] for row in db.query(Score.result_id).filter(Score.result_id.in_(result_ids))}
+
+            stats_rows = []
+            written = 0
+            for record in batch:
+                if record["result_id"] in done:
+                    continue
+                _, stats = record_match_result(
+                    db, record["game_id"], record["winner_id"], record["points"],
+                    ended_at=datetime.fromisoformat(record["ended_at"]),
+                    result_id=record["result_id"]
+                )
+                stats_rows.extend(stats)
+                written += 1
+            db.commit()
+            self.committed += written
+            update_rankings(db, stats_rows)
+
+    def _truncate_spool(self):
+        # Caller holds self._lock
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        if os.path.exists(self.spool_path):
+            open(self.spool_path, "w").close()
+
+
+# ============================================================
+# 3. GLOBAL RESULT WRITER INSTANCE
+# ------------------------------------------------------------
+# Started in create_app(); used by game_routes.end_game when
+# Config.WRITE_BEHIND_ENABLED is set.
+# ============================================================
+result_writer = ResultWriter()
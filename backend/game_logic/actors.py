@@ -0,0 +1,314 @@
+# ================================================================
+# File: backend/game_logic/actors.py
+# Description:
+#   Per-room actors: each room's live game state is owned by one
+#   RoomActor and only ever touched while that actor processes its
+#   mailbox. Socket handlers, REST routes and the AI scheduler never
+#   mutate room state themselves; they send messages (tell / ask)
+#   and read the actor's latest snapshot.
+#
+#   - A message is (kind, payload); the actor runs on_<kind>(**payload).
+#   - Actors share a thread pool, but an actor is scheduled on at most
+#     one thread at a time, so its state needs no locks and rooms
+#     scale across threads independently.
+#   - After each batch of messages the actor publishes a new snapshot
+#     dict. Published snapshots are never mutated again, so readers
+#     (e.g. jsonify in /api/game-state) can use them from any thread.
+# ================================================================
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from backend.config import Config
+from backend.game_logic.rooms import room_manager as default_room_manager
+from backend.game_logic.dead_reckoning import DeadReckoningFilter
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# LOBBY_ROOM is the shared free-roam room used by clients that
+# join/move without a room_id (what GAME_STATE used to hold).
+# ================================================================
+LOBBY_ROOM = "lobby"
+EMPTY_SNAPSHOT = {'players': {}, 'moves': [], 'match': None}
+
+
+# ================================================================
+# 2. ROOM ACTOR CLASS
+# ================================================================
+class RoomActor:
+    def __init__(self, room_id, executor, emit=None, room=None):
+        """
+        :param room_id: ID of the room this actor owns.
+        :param executor: Shared executor that runs actor mailboxes.
+        :param emit: Optional callable(event, data, room_id) for
+                     broadcasting, called from the actor's thread.
+        :param room: Optional Room whose MatchSimulation this actor drives.
+        """
+        self.room_id = room_id
+        self.room = room
+        self.emit = emit
+        self._executor = executor
+        self._mailbox = deque()
+        self._lock = threading.Lock()   # guards only the mailbox / scheduled flag
+        self._scheduled = False
+
+        # Owned state: only read or written inside on_* handlers
+        self.players = {}
+        self.moves = deque(maxlen=Config.ROOM_MOVE_HISTORY)
+        self._outbox = []
+        self._dirty = False
+        self._reckoning = DeadReckoningFilter()
+        self._powerup_ids = ()
+        self.snapshot = EMPTY_SNAPSHOT
+
+    # ------------------------------------------------------------
+    # MESSAGING
+    # ------------------------------------------------------------
+    def tell(self, kind, **payload):
+        """Send a message without waiting for it to be processed."""
+        self._enqueue(kind, payload, None)
+
+    def ask(self, kind, **payload):
+        """Send a message; returns a Future resolved after the handler runs
+        and the resulting snapshot is published."""
+        future = Future()
+        self._enqueue(kind, payload, future)
+        return future
+
+    def _enqueue(self, kind, payload, future):
+        with self._lock:
+            self._mailbox.append((kind, payload, future))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._executor.submit(self._run)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._mailbox:
+                    self._scheduled = False
+                    return
+                batch = list(self._mailbox)
+                self._mailbox.clear()
+
+            results = []
+            for kind, payload, future in batch:
+                try:
+                    result = getattr(self, f"on_{kind}")(**payload)
+                except Exception as e:
+                    if future is not None:
+                        results.append((future, None, e))
+                    else:
+                        print(f"[RoomActor] ⚠️ {self.room_id}: '{kind}' failed: {e}")
+                    continue
+                if future is not None:
+                    results.append((future, result, None))
+
+            self._publish()
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _publish(self):
+        if self._dirty:
+            simulation = self.room.simulation if self.room is not None else None
+            self.snapshot = {
+                'players': {pid: dict(pos) for pid, pos in self.players.items()},
+                'moves': list(self.moves),
+                'match': simulation.snapshot() if simulation is not None else None
+            }
+            self._dirty = False
+
+        outbox, self._outbox = self._outbox, []
+        if self.emit is not None:
+            for event, data in outbox:
+                self.emit(event, data, self.room_id)
+
+    def _broadcast(self, event, data):
+        """Queue an event; it is emitted once the snapshot is published."""
+        self._outbox.append((event, data))
+
+    # ------------------------------------------------------------
+    # HANDLERS: FREE-ROAM POSITIONS (legacy join / move events)
+    # ------------------------------------------------------------
+    def on_join(self, player_id):
+        self.players[player_id] = {'x': 0, 'y': 0}
+        self._dirty = True
+        self._broadcast('player_joined', {
+            'player_id': player_id,
+            'players': {pid: dict(pos) for pid, pos in self.players.items()}
+        })
+
+    def on_move(self, player_id, x, y):
+        self.players[player_id] = {'x': x, 'y': y}
+        self.moves.append({'player_id': player_id, 'x': x, 'y': y})
+        self._dirty = True
+        self._broadcast('player_moved', {
+            'player_id': player_id,
+            'x': x,
+            'y': y,
+            'players': {pid: dict(pos) for pid, pos in self.players.items()}
+        })
+
+    def on_leave(self, player_id):
+        if self.players.pop(player_id, None) is not None:
+            self._dirty = True
+
+    # ------------------------------------------------------------
+    # HANDLERS: MATCH SIMULATION
+    # ------------------------------------------------------------
+    def on_input(self, player_id, code):
+        """Direction input (0..8) for the room's running match."""
+        simulation = self.room.simulation if self.room is not None else None
+        if simulation is None:
+            return False
+        self.room.touch()
+        return simulation.set_input(player_id, code)
+
+    def on_ai_direction(self, player_id, direction):
+        if self.room is not None and self.room.simulation is not None:
+            self.room.simulation.set_ai_direction(player_id, direction)
+
+    def on_add_ai(self, ai_id, target_id, difficulty="normal", scheduler=None):
+        """Attach an AI player; scheduler decisions come back as messages."""
+        def sink(player_id, direction):
+            self.tell('ai_direction', player_id=player_id, direction=direction)
+        self.room.simulation.add_ai(ai_id, target_id, difficulty, scheduler=scheduler,
+                                    room_id=self.room_id, sink=sink if scheduler is not None else None)
+
+    def on_end_game(self):
+        """End the match (idle timeout) between ticks."""
+        if self.room is not None and not self.room.finished:
+            self.room.end_game()
+
+    def on_checkpoint(self, now=None):
+        """Room state for a handoff, taken between ticks and inputs."""
+        return self.room.get_state(now) if self.room is not None else None
+
+    def on_tick(self, steps=1, cost_sink=None):
+        """
+        Advance the match and broadcast what clients cannot predict:
+        the full state when the match starts and once it ends, and in
+        between dead-reckoned entity updates, power-up changes and
+        game events.
+        :param cost_sink: Optional callable(seconds) told how long the
+                          whole tick took, stepping through publishing
+                          (the tick scheduler's CPU budget).
+        """
+        started = time.perf_counter()
+        try:
+            return self._tick(steps)
+        finally:
+            # Snapshot and emits are part of the tick's cost
+            self._publish()
+            if cost_sink is not None:
+                cost_sink(time.perf_counter() - started)
+
+    def _tick(self, steps):
+        simulation = self.room.simulation if self.room is not None else None
+        if simulation is None or simulation.finished:
+            return []
+        if simulation.tick == 0:
+            # Match just started: everyone gets the starting state
+            self._broadcast('game_state', simulation.snapshot())
+        events = simulation.step(steps)
+        self._dirty = True
+
+        updates = self._reckoning.filter(simulation.state['players'], simulation.time())
+        if updates:
+            self._broadcast('entity_updates', {'tick': simulation.tick, 'time': simulation.time(),
+                                               'entities': updates})
+        powerup_ids = tuple(simulation.powerups.active_powerups)
+        if powerup_ids != self._powerup_ids:
+            self._powerup_ids = powerup_ids
+            self._broadcast('powerups_changed', {'tick': simulation.tick,
+                                                 'powerups': simulation.snapshot()['powerups']})
+        for event in events:
+            self._broadcast('game_event', event)
+        if simulation.finished:
+            self._broadcast('game_state', simulation.snapshot())
+            self.room.end_game()
+        return events
+
+
+# ================================================================
+# 3. ACTOR SYSTEM
+# ------------------------------------------------
+# Creates actors on demand, one per room, and drops them when the
+# RoomManager removes the room. Actors only exist for the lobby and
+# for rooms the RoomManager knows: messages for any other room id
+# (made up by a client, or arriving after the room was removed) are
+# dropped by tell() and fail the Future returned by ask().
+# ================================================================
+class ActorSystem:
+    def __init__(self, room_manager=default_room_manager, max_workers=None):
+        """
+        :param room_manager: RoomManager whose rooms actors are bound to.
+        :param max_workers: Threads shared by all actors (Config.ACTOR_THREADS).
+        """
+        self.room_manager = room_manager
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or Config.ACTOR_THREADS,
+                                           thread_name_prefix="room-actor")
+        self.emit = None
+        self._actors = {}
+        self._lock = threading.Lock()
+        room_manager.add_listener(self._on_room_event)
+
+    def _on_room_event(self, event, room):
+        if event == 'removed':
+            with self._lock:
+                self._actors.pop(room.id, None)
+
+    def actor(self, room_id=LOBBY_ROOM):
+        """Return the room's actor, creating it on first use (None for unknown rooms)."""
+        actor = self._actors.get(room_id)
+        if actor is None:
+            with self._lock:
+                actor = self._actors.get(room_id)
+                if actor is None:
+                    # Checked under the lock: a room removed after this
+                    # point has its actor dropped by _on_room_event
+                    room = self.room_manager.get_room(room_id)
+                    if room is None and room_id != LOBBY_ROOM:
+                        return None
+                    actor = RoomActor(room_id, self.executor, emit=self._emit, room=room)
+                    self._actors[room_id] = actor
+        return actor
+
+    def _emit(self, event, data, room_id):
+        if self.emit is not None:
+            self.emit(event, data, room_id)
+
+    def tell(self, room_id, kind, **payload):
+        """Send a message; returns False (message dropped) for unknown rooms."""
+        actor = self.actor(room_id)
+        if actor is None:
+            return False
+        actor.tell(kind, **payload)
+        return True
+
+    def ask(self, room_id, kind, **payload):
+        """Send a message; the Future fails with KeyError for unknown rooms."""
+        actor = self.actor(room_id)
+        if actor is None:
+            future = Future()
+            future.set_exception(KeyError(f"Unknown room {room_id!r}"))
+            return future
+        return actor.ask(kind, **payload)
+
+    def snapshot(self, room_id=LOBBY_ROOM):
+        """Latest published snapshot (never mutated; safe to serialize)."""
+        actor = self._actors.get(room_id)
+        return actor.snapshot if actor is not None else EMPTY_SNAPSHOT
+
+
+# ================================================================
+# 4. GLOBAL ACTOR SYSTEM INSTANCE
+# ================================================================
+room_actors = ActorSystem()
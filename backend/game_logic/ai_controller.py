@@ -7,11 +7,25 @@
 #     - Chase the target (Tom chasing Jerry)
 #     - Escape from the target (Jerry avoiding Tom)
 #   Uses basic distance calculations and movement predictions.
+#   When a NavGrid is supplied, movement follows a shared flow
+#   field so the AI walks around walls instead of into them.
+#   The "hard" difficulty adds a time-budgeted lookahead planner
+#   and falls back to the greedy move when the budget runs out.
 # ================================================================
 
 import math
 import random
 
+from backend.game_logic.navigation import FlowFieldCache
+from backend.game_logic.lookahead import LookaheadPlanner
+from backend.game_logic.physics import WORLD_BOUNDS
+
+# Without a nav grid, a fleeing AI is pushed off map edges closer
+# than FLEE_WALL_MARGIN px (at up to FLEE_WALL_WEIGHT times its
+# flee direction), so it runs along them instead of into a corner
+FLEE_WALL_MARGIN = 120
+FLEE_WALL_WEIGHT = 1.0
+
 # ================================================================
 # 1. AI CONTROLLER CLASS
 # ------------------------------------------------
@@ -19,15 +33,31 @@ import random
 # based on player positions and basic strategies.
 # ================================================================
 class AIController:
-    def __init__(self, game_state, role="tom"):
+    def __init__(self, game_state, role="tom", nav_grid=None, flow_fields=None, difficulty="normal", rng=None,
+                 deterministic=False):
         """
         Initialize the AI controller.
         :param game_state: Shared dictionary tracking all player positions.
         :param role: Either 'tom' (chaser) or 'jerry' (escaper).
+        :param nav_grid: Optional NavGrid of the map's walkable space.
+        :param flow_fields: Optional FlowFieldCache shared with other AI
+                            agents on the same map (created if omitted).
+        :param difficulty: 'normal' (greedy) or 'hard' (lookahead).
+        :param rng: random.Random for movement jitter (defaults to the
+                    global random module).
+        :param deterministic: Hard AI plans without a time budget, so
+                              the same seed always plays the same match.
         """
         self.game_state = game_state
         self.role = role.lower()
         self.speed = 5  # Movement speed of AI
+        self.nav_grid = nav_grid
+        if flow_fields is None and nav_grid is not None:
+            flow_fields = FlowFieldCache(nav_grid)
+        self.flow_fields = flow_fields
+        self.difficulty = difficulty.lower()
+        self.planner = LookaheadPlanner(nav_grid, deterministic=deterministic) if self.difficulty == "hard" else None
+        self.rng = rng or random
 
     # ============================================================
     # 2. CALCULATE DISTANCE
@@ -39,39 +69,80 @@ class AIController:
         return math.sqrt((pos1['x'] - pos2['x'])**2 + (pos1['y'] - pos2['y'])**2)
 
     # ============================================================
-    # 3. DECIDE NEXT MOVE
+    # 3. PLAN DIRECTION
     # ------------------------------------------------------------
-    # Based on role (Tom or Jerry), decide where to move next.
-    # - Tom moves toward Jerry.
-    # - Jerry moves away from Tom.
+    # Returns a unit (dx, dy) vector for the AI to move along.
+    # - Hard difficulty: lookahead rollouts until the deadline.
+    # - With a nav grid: follow the shared flow field (O(1) lookup);
+    #   a fleeing AI follows its escape route (FlowField.escape_from).
+    # - Otherwise (or when the field has no better cell): move in
+    #   a straight line toward / away from the target, steering
+    #   away from the map edges when fleeing.
     # ============================================================
-    def decide_next_move(self, ai_id, target_id):
-        if ai_id not in self.game_state['players'] or target_id not in self.game_state['players']:
-            return None
+    def plan_direction(self, ai_pos, target_pos, deadline=None):
+        flee = self.role != "tom"
 
-        ai_pos = self.game_state['players'][ai_id]
-        target_pos = self.game_state['players'][target_id]
+        if self.planner is not None:
+            direction = self.planner.plan(ai_pos, target_pos, chase=not flee,
+                                          default_speed=self.speed, deadline=deadline)
+            if direction is not None:
+                return direction
+
+        if self.flow_fields is not None:
+            field = self.flow_fields.get(target_pos)
+            if flee:
+                direction = field.escape_from(self.flow_fields.get(ai_pos), ai_pos['x'], ai_pos['y'])
+            else:
+                direction = field.direction_from(ai_pos['x'], ai_pos['y'])
+            if direction is not None:
+                return direction
 
         dx = target_pos['x'] - ai_pos['x']
         dy = target_pos['y'] - ai_pos['y']
         distance = max(self.distance(ai_pos, target_pos), 1)  # avoid division by zero
 
-        # Normalize direction
-        direction_x = dx / distance
-        direction_y = dy / distance
+        # Normalize direction (reversed when escaping)
+        if flee:
+            return self.steer_off_edges(ai_pos, -dx / distance, -dy / distance)
+        return dx / distance, dy / distance
 
-        if self.role == "tom":
-            # Move toward target
-            new_x = ai_pos['x'] + direction_x * self.speed
-            new_y = ai_pos['y'] + direction_y * self.speed
+    def steer_off_edges(self, ai_pos, dx, dy):
+        """Bend a flee direction away from nearby map edges."""
+        grid = self.nav_grid
+        if grid is not None:
+            x_min, y_min, x_max, y_max = grid.x_min, grid.y_min, grid.x_max, grid.y_max
         else:
-            # Move away from target (Jerry escaping)
-            new_x = ai_pos['x'] - direction_x * self.speed
-            new_y = ai_pos['y'] - direction_y * self.speed
+            x_min, y_min = WORLD_BOUNDS['x_min'], WORLD_BOUNDS['y_min']
+            x_max, y_max = WORLD_BOUNDS['x_max'], WORLD_BOUNDS['y_max']
+        push = FLEE_WALL_WEIGHT / FLEE_WALL_MARGIN
+        x, y = ai_pos['x'], ai_pos['y']
+        dx += push * (max(0.0, FLEE_WALL_MARGIN - (x - x_min)) - max(0.0, FLEE_WALL_MARGIN - (x_max - x)))
+        dy += push * (max(0.0, FLEE_WALL_MARGIN - (y - y_min)) - max(0.0, FLEE_WALL_MARGIN - (y_max - y)))
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return 0.0, 0.0
+        return dx / length, dy / length
+
+    # ============================================================
+    # 4. STEP ALONG DIRECTION
+    # ------------------------------------------------------------
+    # Moves the AI one tick along an already planned direction.
+    # Cheap enough to run every tick, even when re-planning is
+    # throttled by the AI scheduler.
+    # ============================================================
+    def step(self, ai_id, direction):
+        ai_pos = self.game_state['players'][ai_id]
+        direction_x, direction_y = direction
+        new_x = ai_pos['x'] + direction_x * self.speed
+        new_y = ai_pos['y'] + direction_y * self.speed
 
         # Add slight randomness to movement for realism
-        new_x += random.uniform(-1, 1)
-        new_y += random.uniform(-1, 1)
+        new_x += self.rng.uniform(-1, 1)
+        new_y += self.rng.uniform(-1, 1)
+
+        # Never step into a wall cell
+        if self.nav_grid is not None and self.nav_grid.is_blocked_at(new_x, new_y):
+            new_x, new_y = ai_pos['x'], ai_pos['y']
 
         # Update game state
         self.game_state['players'][ai_id] = {'x': new_x, 'y': new_y}
@@ -80,7 +151,22 @@ class AIController:
         return {'player_id': ai_id, 'x': new_x, 'y': new_y}
 
     # ============================================================
-    # 4. UPDATE LOOP
+    # 5. DECIDE NEXT MOVE
+    # ------------------------------------------------------------
+    # Based on role (Tom or Jerry), decide where to move next.
+    # - Tom moves toward Jerry.
+    # - Jerry moves away from Tom.
+    # ============================================================
+    def decide_next_move(self, ai_id, target_id):
+        if ai_id not in self.game_state['players'] or target_id not in self.game_state['players']:
+            return None
+
+        ai_pos = self.game_state['players'][ai_id]
+        target_pos = self.game_state['players'][target_id]
+        return self.step(ai_id, self.plan_direction(ai_pos, target_pos))
+
+    # ============================================================
+    # 6. UPDATE LOOP
     # ------------------------------------------------------------
     # This would be called periodically (e.g., via Socket.IO)
     # to update AI movement in real-time during the game.
@@ -0,0 +1,232 @@
+# ================================================================
+# File: backend/game_logic/ai_scheduler.py
+# Description:
+#   Batches AI decisions for every AI agent owned by this worker
+#   into a single pass per tick.
+#   - Agents close to their target re-plan every tick.
+#   - Agents far away, or in rooms with no recent human input,
+#     re-plan less often and keep their last direction meanwhile.
+#   - Re-planning stops for the tick once the CPU budget is spent;
+#     leftover agents are first in line on the next tick.
+#
+#   Runs on its own thread at SIM_TICK_RATE (start()). Match state
+#   belongs to the room actors, so agents of actor-owned rooms plan
+#   against the room's published snapshot and send their direction
+#   back to the actor as a message (RoomActor.on_add_ai).
+# ================================================================
+
+import heapq
+import itertools
+import threading
+import time
+
+from backend.config import Config
+from backend.game_logic.rooms import room_manager as default_room_manager
+from backend.game_logic.actors import room_actors as default_room_actors
+
+# ================================================================
+# 1. LEVEL-OF-DETAIL INTERVALS
+# ------------------------------------------------
+# Number of ticks between re-plans for each activity level.
+# ================================================================
+NEAR_INTERVAL = 1
+MID_INTERVAL = 3
+FAR_INTERVAL = 6
+IDLE_INTERVAL = 15
+
+
+# ================================================================
+# 2. AI AGENT CLASS
+# ------------------------------------------------
+# One AI-controlled character and its cached plan.
+# ================================================================
+class AIAgent:
+    def __init__(self, room_id, controller, ai_id, target_id, sink=None):
+        """
+        :param room_id: Room the agent belongs to.
+        :param controller: AIController driving this character.
+        :param ai_id: Player ID of the AI character.
+        :param target_id: Player ID the AI chases or flees.
+        :param sink: Optional callable(ai_id, direction) that receives the
+                     planned direction instead of moving the controller's
+                     state directly (e.g. MatchSimulation.set_ai_direction).
+        """
+        self.room_id = room_id
+        self.controller = controller
+        self.ai_id = ai_id
+        self.target_id = target_id
+        self.sink = sink
+        self.direction = (0.0, 0.0)
+        self.sent_direction = None  # last direction handed to the sink
+        self.next_plan_tick = 0
+        self.active = True
+
+
+# ================================================================
+# 3. AI SCHEDULER CLASS
+# ------------------------------------------------
+# Keeps agents in a min-heap ordered by their next re-plan tick,
+# so each tick only touches the agents that are due.
+# ================================================================
+class AIScheduler:
+    def __init__(self, budget_ms=None, near_distance=None, far_distance=None, idle_seconds=None,
+                 room_manager=default_room_manager, actors=default_room_actors):
+        """
+        Initialize the scheduler. Unset values fall back to Config.
+        :param budget_ms: CPU time allowed for re-planning per tick.
+        :param near_distance: Below this distance agents re-plan every tick.
+        :param far_distance: Above this distance agents re-plan least often.
+        :param idle_seconds: Rooms without human input for this long are idle.
+        :param room_manager: RoomManager whose removed rooms drop their agents.
+        :param actors: ActorSystem whose published snapshots agents plan
+                       against (None: read the controller's state directly).
+        """
+        self.budget = (budget_ms if budget_ms is not None else Config.AI_TICK_BUDGET_MS) / 1000.0
+        self.near_distance = near_distance if near_distance is not None else Config.AI_NEAR_DISTANCE
+        self.far_distance = far_distance if far_distance is not None else Config.AI_FAR_DISTANCE
+        self.idle_seconds = idle_seconds if idle_seconds is not None else Config.AI_IDLE_SECONDS
+
+        self.tick = 0
+        self.agents = {}           # room_id -> [AIAgent]
+        self.room_activity = {}    # room_id -> last human input (monotonic)
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()   # agents are added from actor threads
+        self._thread = None
+        self.actors = actors
+
+        if room_manager is not None:
+            room_manager.add_listener(self._on_room_event)
+
+    # ------------------------------------------------------------
+    # REGISTRATION
+    # ------------------------------------------------------------
+    def add_agent(self, room_id, controller, ai_id, target_id, sink=None):
+        """Register an AI character; it is planned on the next tick."""
+        agent = AIAgent(room_id, controller, ai_id, target_id, sink)
+        with self._lock:
+            agent.next_plan_tick = self.tick + 1
+            self.agents.setdefault(room_id, []).append(agent)
+            self.room_activity.setdefault(room_id, time.monotonic())
+            heapq.heappush(self._heap, (agent.next_plan_tick, next(self._seq), agent))
+        return agent
+
+    def remove_room(self, room_id):
+        """Drop every agent of a room (heap entries are skipped lazily)."""
+        with self._lock:
+            for agent in self.agents.pop(room_id, []):
+                agent.active = False
+            self.room_activity.pop(room_id, None)
+
+    def _on_room_event(self, event, room):
+        if event == 'removed' or room.finished:
+            self.remove_room(room.id)
+        elif event == 'created' and room.simulation is not None and self.actors is not None:
+            # A room resumed from a checkpoint: re-attach its AI players
+            for ai_id, (target_id, difficulty) in room.simulation.scheduled_ai.items():
+                self.actors.tell(room.id, 'add_ai', ai_id=ai_id, target_id=target_id,
+                                 difficulty=difficulty, scheduler=self)
+
+    def mark_activity(self, room_id, now=None):
+        """Record human input in a room so its agents stay at full rate."""
+        if room_id in self.room_activity:   # only rooms with agents
+            self.room_activity[room_id] = now if now is not None else time.monotonic()
+
+    def _players(self, agent):
+        """Player positions the agent plans against."""
+        if self.actors is None:
+            return agent.controller.game_state['players']
+        match = self.actors.snapshot(agent.room_id)['match']
+        return match['players'] if match is not None else {}
+
+    # ------------------------------------------------------------
+    # LEVEL OF DETAIL
+    # ------------------------------------------------------------
+    def replan_interval(self, agent, now, players=None):
+        """Ticks to wait before this agent's next re-plan."""
+        if now - self.room_activity.get(agent.room_id, now) > self.idle_seconds:
+            return IDLE_INTERVAL
+
+        players = players if players is not None else agent.controller.game_state['players']
+        distance = agent.controller.distance(players[agent.ai_id], players[agent.target_id])
+        if distance < self.near_distance:
+            return NEAR_INTERVAL
+        if distance < self.far_distance:
+            return MID_INTERVAL
+        return FAR_INTERVAL
+
+    # ------------------------------------------------------------
+    # RUN ONE TICK
+    # ------------------------------------------------------------
+    def run_tick(self):
+        """
+        Re-plan due agents within the CPU budget, then move every
+        agent along its current direction (or hand it to its sink
+        when it changed; sinks keep a direction until told otherwise).
+        :return: List of move dicts for broadcasting.
+        """
+        with self._lock:
+            self.tick += 1
+            now = time.monotonic()
+            deadline = time.perf_counter() + self.budget
+
+            while self._heap and self._heap[0][0] <= self.tick:
+                if time.perf_counter() >= deadline:
+                    break  # Budget spent; remaining agents stay due
+                _, _, agent = heapq.heappop(self._heap)
+                if not agent.active:
+                    continue
+
+                players = self._players(agent)
+                if agent.ai_id in players and agent.target_id in players:
+                    agent.direction = agent.controller.plan_direction(
+                        players[agent.ai_id], players[agent.target_id], deadline=deadline
+                    )
+                    interval = self.replan_interval(agent, now, players)
+                else:
+                    interval = IDLE_INTERVAL
+
+                agent.next_plan_tick = self.tick + interval
+                heapq.heappush(self._heap, (agent.next_plan_tick, next(self._seq), agent))
+
+            agents = [agent for room_agents in self.agents.values() for agent in room_agents]
+
+        moves = []
+        for agent in agents:
+            if agent.sink is not None:
+                if agent.direction != agent.sent_direction:
+                    agent.sink(agent.ai_id, agent.direction)
+                    agent.sent_direction = agent.direction
+            elif agent.ai_id in agent.controller.game_state['players']:
+                moves.append(agent.controller.step(agent.ai_id, agent.direction))
+        return moves
+
+    # ------------------------------------------------------------
+    # MAIN LOOP
+    # ------------------------------------------------------------
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="ai-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = 1.0 / Config.SIM_TICK_RATE
+        next_tick = time.monotonic()
+        while True:
+            if self.agents:
+                self.run_tick()
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind: don't burst to catch up
+
+
+# ================================================================
+# 4. GLOBAL SCHEDULER INSTANCE
+# ------------------------------------------------
+# One scheduler per worker process, shared by all solo rooms.
+# Started in create_app(); Matchmaker.start_solo attaches agents.
+# ================================================================
+ai_scheduler = AIScheduler()
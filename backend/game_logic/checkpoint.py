@@ -0,0 +1,193 @@
+# ================================================================
+# File: backend/game_logic/checkpoint.py
+# Description:
+#   Binary room checkpoints and live handoff between workers.
+#   A checkpoint is every room's full state (players, simulation,
+#   power-up timers, RNG state, tick, replay so far) as plain data,
+#   pickled with a fixed protocol. Unlike marshal, whose format may
+#   change between Python versions, a pickle stays readable when a
+#   deploy upgrades the interpreter. Only plain data is accepted
+#   when loading: the unpickler refuses every class lookup. Not
+#   compressed: most of the bytes are RNG state, which does not
+#   compress, and zlib was the slowest step.
+#
+#   Handoff: on SIGTERM a draining worker stops its tick scheduler,
+#   takes each room's state through the room's actor (so it never
+#   races a tick or an input), writes the rooms to HANDOFF_DIR and
+#   releases them; the replacement worker claims the file at
+#   startup and resumes the matches at the tick they were
+#   checkpointed on.
+#
+#   File layout: b"TJCK" | version (u8) | pickle([room state, ...])
+#   (version 1 files, written with marshal, are still read)
+# ================================================================
+
+import io
+import marshal
+import os
+import pickle
+import signal
+import sys
+import threading
+import time
+
+from backend.config import HANDOFF_DIR
+from backend.game_logic.rooms import Room, room_manager as default_room_manager
+from backend.game_logic.actors import room_actors as default_room_actors
+from backend.game_logic.tick_scheduler import tick_scheduler as default_tick_scheduler
+from backend.game_logic.replay import replay_writer
+
+# ================================================================
+# 1. FORMAT CONSTANTS
+# ================================================================
+MAGIC = b"TJCK"
+VERSION = 2
+MARSHAL_FORMAT = 1          # earlier version, read-only
+CHECKPOINT_EXTENSION = ".tjck"
+PICKLE_PROTOCOL = 4
+# Errors a corrupt or incompatible checkpoint can raise while decoding
+DECODE_ERRORS = (ValueError, EOFError, TypeError, KeyError, IndexError, pickle.UnpicklingError)
+# How long to wait for an actor to hand over its room's state
+CHECKPOINT_TIMEOUT = 5.0
+
+
+# ================================================================
+# 2. ENCODING
+# ================================================================
+class _PlainDataUnpickler(pickle.Unpickler):
+    # Room state is dicts, lists, tuples, strings, bytes and numbers,
+    # none of which needs a class lookup
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Checkpoints hold plain data only, not {module}.{name}")
+
+
+def encode_states(states):
+    """Checkpoint a list of room states (Room.get_state) into bytes."""
+    return MAGIC + bytes([VERSION]) + pickle.dumps(list(states), PICKLE_PROTOCOL)
+
+
+def encode_rooms(rooms, now=None):
+    """Checkpoint a list of rooms into bytes (rooms no actor is ticking)."""
+    now = now if now is not None else time.monotonic()
+    return encode_states(room.get_state(now) for room in rooms)
+
+
+def decode_rooms(data, now=None):
+    """
+    Rebuild rooms (with their running matches) from checkpoint bytes.
+    :raises: One of DECODE_ERRORS if the data is not a usable checkpoint.
+    """
+    if data[:4] != MAGIC or len(data) < 5 or data[4] not in (VERSION, MARSHAL_FORMAT):
+        raise ValueError("Not a room checkpoint (or unsupported version)")
+    if data[4] == MARSHAL_FORMAT:
+        states = marshal.loads(data[5:])
+    else:
+        states = _PlainDataUnpickler(io.BytesIO(data[5:])).load()
+    return [Room.from_state(state, now) for state in states]
+
+
+# ================================================================
+# 3. HANDOFF
+# ------------------------------------------------
+# Files are written under a temporary name and renamed, and claimed
+# by renaming again, so a checkpoint is never read half-written or
+# resumed by two workers.
+# ================================================================
+def write_handoff(manager=default_room_manager, directory=HANDOFF_DIR, actors=default_room_actors):
+    """
+    Checkpoint every unfinished room and release it from this worker.
+    Finished rooms stay (their replays are already being written).
+    Each room's state is taken by its actor; stop the tick scheduler
+    first so matches do not advance past the checkpoint.
+    :return: Path of the checkpoint file, or None if there was nothing to hand off.
+    """
+    now = time.monotonic()
+    pending = [(room, actors.ask(room.id, 'checkpoint', now=now))
+               for room in list(manager.rooms.values()) if not room.finished]
+    rooms, states = [], []
+    for room, future in pending:
+        try:
+            state = future.result(timeout=CHECKPOINT_TIMEOUT)
+        except Exception as e:
+            print(f"[Checkpoint] ⚠️ Could not checkpoint room {room.id}: {e}")
+            continue
+        if state is not None and not state['finished']:
+            rooms.append(room)
+            states.append(state)
+    if not rooms:
+        return None
+
+    data = encode_states(states)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}-{time.time_ns()}{CHECKPOINT_EXTENSION}")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    for room in rooms:
+        manager.release_room(room.id)
+    print(f"[Checkpoint] 📦 Handed off {len(rooms)} rooms -> {path} ({len(data)} bytes)")
+    return path
+
+
+def resume_handoff(manager=default_room_manager, directory=HANDOFF_DIR):
+    """
+    Claim and resume every pending checkpoint in the handoff directory.
+    :return: List of resumed rooms.
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    resumed = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(CHECKPOINT_EXTENSION):
+            continue
+        path = os.path.join(directory, name)
+        claimed = f"{path}.{os.getpid()}.claimed"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue  # Another worker got it first
+
+        with open(claimed, "rb") as f:
+            data = f.read()
+        try:
+            rooms = decode_rooms(data)
+        except DECODE_ERRORS as e:
+            print(f"[Checkpoint] ⚠️ Could not resume {name}: {e}")
+            continue  # Leave the claimed file for inspection
+
+        for room in rooms:
+            manager.adopt_room(room)
+        resumed.extend(rooms)
+        os.remove(claimed)
+        print(f"[Checkpoint] 🔁 Resumed {len(rooms)} rooms from {name}")
+    return resumed
+
+
+# ================================================================
+# 4. DRAIN ON SIGTERM
+# ------------------------------------------------
+# Installed from create_app(). Stops ticking, hands rooms off, waits
+# for pending replays, then lets any previous SIGTERM handler (or
+# exit) run.
+# ================================================================
+def install_drain_handler(manager=default_room_manager, directory=HANDOFF_DIR,
+                          actors=default_room_actors, scheduler=default_tick_scheduler):
+    if threading.current_thread() is not threading.main_thread():
+        return False  # signal handlers can only be set from the main thread
+
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def _drain(signum, frame):
+        scheduler.stop(timeout=CHECKPOINT_TIMEOUT)
+        write_handoff(manager, directory, actors)
+        replay_writer.flush()
+        if callable(previous):
+            previous(signum, frame)
+        else:
+            sys.exit(0)
+
+    signal.signal(signal.SIGTERM, _drain)
+    return True
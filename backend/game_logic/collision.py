@@ -7,6 +7,11 @@
 # ============================================================
 
 import math
+from functools import lru_cache
+
+# Players are circles of PLAYER_RADIUS px: two players touch at the
+# default catch radius of 25 px between their centres.
+PLAYER_RADIUS = 12
 
 # ============================================================
 # 1. COLLISION BETWEEN TWO PLAYERS
@@ -131,3 +136,203 @@ def update_collisions(game_state, world_bounds):
     for _, player in game_state['players'].items():
         handle_wall_collision(player, world_bounds)
     handle_collision_response(game_state)
+
+
+# ============================================================
+# 6. COLLISION WITH LEVEL WALLS
+# ------------------------------------------------------------
+# `is_wall(x, y)` is a point query, e.g. a compiled level's
+# collision bitmap (levels.Level.is_wall).
+# If the new position is inside a wall, the player slides along
+# whichever axis is still free, otherwise stays where it was.
+# ============================================================
+def resolve_wall_collision(player_state, is_wall, prev_x, prev_y):
+    """
+    Pushes a player out of level walls after a move.
+
+    Args:
+        player_state (dict): Player's new position (x, y)
+        is_wall (callable): Point-in-wall query (x, y) -> bool
+        prev_x (float): X before the move
+        prev_y (float): Y before the move
+
+    Returns:
+        bool: True if the move was blocked (fully or partially).
+    """
+    x, y = player_state['x'], player_state['y']
+    if not is_wall(x, y):
+        return False
+
+    if not is_wall(x, prev_y):
+        player_state['y'] = prev_y
+    elif not is_wall(prev_x, y):
+        player_state['x'] = prev_x
+    else:
+        player_state['x'], player_state['y'] = prev_x, prev_y
+    return True
+
+
+# ============================================================
+# 7. CONTINUOUS (SWEPT) COLLISION
+# ------------------------------------------------------------
+# The checks above only look at where players are *now*. At low
+# tick rates a fast (power-up) player moves further than a catch
+# radius per tick and can tunnel through Jerry, an item or a thin
+# wall. These helpers test the whole movement segment of the tick
+# instead, treating each player as a circle swept from its start
+# to its end position.
+# Against walls, the circle is tested at every sample along the
+# path: its centre plus points on its outline spaced no more than
+# max_step apart. Any wall at least max_step thick that overlaps
+# the circle crosses the outline or covers the centre.
+# ============================================================
+def _segment_time_of_impact(px, py, dx, dy, radius):
+    """
+    Earliest t in [0, 1] at which the point p + t*d is within
+    `radius` of the origin, or None if it never is.
+    """
+    c = px * px + py * py - radius * radius
+    if c < 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = px * dx + py * dy
+    disc = b * b - a * c
+    if b >= 0 or disc < 0:
+        return None  # moving apart, or closest approach stays outside
+    t = (-b - math.sqrt(disc)) / a
+    return t if t <= 1.0 else None
+
+
+def swept_players_collide(a_start, a_end, b_start, b_end, radius=25):
+    """
+    Checks if two moving players touched at any point during a tick.
+    Both are assumed to move linearly over the same time interval,
+    so the test is done on their relative motion.
+
+    Args:
+        a_start, a_end (dict): First player's position (x, y) before/after the tick
+        b_start, b_end (dict): Second player's position before/after the tick
+        radius (int): Collision radius (same meaning as players_collide)
+
+    Returns:
+        float | None: Fraction of the tick (0..1) at first contact, or None.
+    """
+    px = a_start['x'] - b_start['x']
+    py = a_start['y'] - b_start['y']
+    dx = (a_end['x'] - a_start['x']) - (b_end['x'] - b_start['x'])
+    dy = (a_end['y'] - a_start['y']) - (b_end['y'] - b_start['y'])
+    return _segment_time_of_impact(px, py, dx, dy, radius)
+
+
+def swept_item_collision(start, end, items):
+    """
+    Detects the first item a player touched while moving from
+    `start` to `end` (items do not move).
+
+    Args:
+        start, end (dict): Player's position (x, y) before/after the tick
+        items (list): List of item dicts {'id': str, 'x': int, 'y': int, 'radius': int}
+
+    Returns:
+        str | None: ID of the first item hit along the path, or None.
+    """
+    dx, dy = end['x'] - start['x'], end['y'] - start['y']
+    best_id, best_t = None, None
+    for item in items:
+        t = _segment_time_of_impact(start['x'] - item['x'], start['y'] - item['y'],
+                                    dx, dy, item.get('radius', 20))
+        if t is not None and (best_t is None or t < best_t):
+            best_id, best_t = item['id'], t
+    return best_id
+
+
+@lru_cache(maxsize=16)
+def _outline_offsets(radius, max_step):
+    """(dx, dy) points on a circle's outline, at most max_step apart."""
+    count = max(8, math.ceil(2 * math.pi * radius / max_step))
+    return tuple(
+        (radius * math.cos(2 * math.pi * i / count), radius * math.sin(2 * math.pi * i / count))
+        for i in range(count)
+    )
+
+
+def circle_hits_wall(is_wall, x, y, radius=PLAYER_RADIUS, max_step=2.0):
+    """
+    Checks if a player's circle overlaps a wall.
+
+    Args:
+        is_wall (callable): Point-in-wall query (x, y) -> bool
+        x, y (float): Centre of the circle
+        radius (float): Circle radius (0 tests the centre only)
+        max_step (float): Largest gap between tested outline points
+
+    Returns:
+        bool: True if the centre or a point of the outline is in a wall.
+    """
+    if is_wall(x, y):
+        return True
+    if not radius:
+        return False
+    for dx, dy in _outline_offsets(radius, max_step):
+        if is_wall(x + dx, y + dy):
+            return True
+    return False
+
+
+def sweep_wall_collision(player_state, is_wall, prev_x, prev_y, max_step=2.0, radius=PLAYER_RADIUS,
+                         circle_test=None):
+    """
+    Moves a player back to the last free point on its path if its
+    circle hit a wall along the way, then slides along the wall with
+    whatever movement is left (see resolve_wall_collision).
+
+    Args:
+        player_state (dict): Player's new position (x, y)
+        is_wall (callable): Point-in-wall query (x, y) -> bool
+        prev_x (float): X before the move
+        prev_y (float): Y before the move
+        max_step (float): Distance between wall samples along the path
+        radius (float): Player's radius (0 sweeps the centre point only)
+        circle_test (callable): Optional faster (x, y) -> bool test of
+            the same circle, e.g. Level.circle_tester(radius)
+
+    Returns:
+        bool: True if the move was blocked (fully or partially).
+    """
+    def blocked_at(x, y):
+        return circle_hits_wall(is_wall, x, y, radius, max_step)
+
+    if circle_test is not None:
+        blocked_at = circle_test
+
+    if radius and blocked_at(prev_x, prev_y):
+        # Already overlapping a wall (e.g. a spawn point close to one):
+        # only the centre is tested, so the player can move away
+        blocked_at = is_wall
+
+    end_x, end_y = player_state['x'], player_state['y']
+    free_x, free_y, blocked = _sweep_path(blocked_at, prev_x, prev_y, end_x, end_y, max_step)
+    if not blocked:
+        return False
+
+    # Slide from the contact point along each axis with the rest of the movement
+    free_x, _, _ = _sweep_path(blocked_at, free_x, free_y, end_x, free_y, max_step)
+    _, free_y, _ = _sweep_path(blocked_at, free_x, free_y, free_x, end_y, max_step)
+    player_state['x'], player_state['y'] = free_x, free_y
+    return True
+
+
+def _sweep_path(is_wall, x0, y0, x1, y1, max_step):
+    """Walk from (x0, y0) to (x1, y1); return (last free x, y, blocked)."""
+    dx, dy = x1 - x0, y1 - y0
+    samples = int(math.hypot(dx, dy) / max_step) + 1
+    free_x, free_y = x0, y0
+    for i in range(1, samples + 1):
+        x = x0 + dx * i / samples
+        y = y0 + dy * i / samples
+        if is_wall(x, y):
+            return free_x, free_y, True
+        free_x, free_y = x, y
+    return free_x, free_y, False
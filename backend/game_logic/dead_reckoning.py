@@ -0,0 +1,81 @@
+# ================================================================
+# File: backend/game_logic/dead_reckoning.py
+# Description:
+#   Dead-reckoning filter for entity updates.
+#   Entities are sent as position + velocity (px per simulated
+#   second). Clients extrapolate x + vx * (t - t_sent) between
+#   updates, so the server only sends a new update when:
+#     - the velocity changed (new direction, speed boost, wall hit),
+#     - the extrapolation drifted past the position threshold,
+#     - visibility changed, or
+#     - nothing was sent for max_silence seconds (keep-alive).
+#   An AI walking in a straight line costs one update per turn
+#   instead of one per tick.
+#   There is one filter per room, so a client that joins a running
+#   match is first sent the full match state ('game_state') and
+#   extrapolates from there (see sockets/events.py).
+# ================================================================
+
+import math
+
+from backend.config import Config
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Velocity differences below VELOCITY_EPSILON (px/s) are noise.
+# ================================================================
+VELOCITY_EPSILON = 0.01
+
+
+# ================================================================
+# 2. DEAD RECKONING FILTER CLASS
+# ------------------------------------------------
+# Remembers what each client was last told about every entity
+# and decides which entities need a fresh update this tick.
+# ================================================================
+class DeadReckoningFilter:
+    def __init__(self, threshold=None, max_silence=None):
+        """
+        :param threshold: Allowed extrapolation error in pixels (Config.DR_POSITION_THRESHOLD).
+        :param max_silence: Longest gap between updates in seconds (Config.DR_MAX_SILENCE_SECONDS).
+        """
+        self.threshold = threshold if threshold is not None else Config.DR_POSITION_THRESHOLD
+        self.max_silence = max_silence if max_silence is not None else Config.DR_MAX_SILENCE_SECONDS
+        self._sent = {}  # entity_id -> (x, y, vx, vy, visible, t)
+
+    def predict(self, entity_id, t):
+        """Position the client currently extrapolates, or None if never sent."""
+        sent = self._sent.get(entity_id)
+        if sent is None:
+            return None
+        x, y, vx, vy, _, t0 = sent
+        return x + vx * (t - t0), y + vy * (t - t0)
+
+    def needs_update(self, entity_id, x, y, vx, vy, visible, t):
+        sent = self._sent.get(entity_id)
+        if sent is None:
+            return True
+        sx, sy, svx, svy, svisible, t0 = sent
+        if visible != svisible or t - t0 >= self.max_silence:
+            return True
+        if abs(vx - svx) > VELOCITY_EPSILON or abs(vy - svy) > VELOCITY_EPSILON:
+            return True
+        px, py = sx + svx * (t - t0), sy + svy * (t - t0)
+        return math.hypot(x - px, y - py) > self.threshold
+
+    def filter(self, entities, t):
+        """
+        Pick the entities that need an update and remember them as sent.
+        :param entities: Dict entity_id -> {'x', 'y', 'vx', 'vy', 'visible'}.
+        :param t: Current simulated time in seconds.
+        :return: List of update dicts (empty when clients are in sync).
+        """
+        updates = []
+        for entity_id, e in entities.items():
+            visible = e.get('visible', True)
+            if self.needs_update(entity_id, e['x'], e['y'], e['vx'], e['vy'], visible, t):
+                self._sent[entity_id] = (e['x'], e['y'], e['vx'], e['vy'], visible, t)
+                updates.append({'id': entity_id, 'x': e['x'], 'y': e['y'],
+                                'vx': e['vx'], 'vy': e['vy'], 'visible': visible})
+        return updates
@@ -0,0 +1,279 @@
+# ================================================================
+# File: backend/game_logic/levels.py
+# Description:
+#   Precompiled level format for server-side maps.
+#   A map definition (frontend/src/assets/maps/*.json) is compiled
+#   offline into a binary .tjl file holding:
+#     - a 1-bit-per-pixel collision bitmap (O(1) point-in-wall)
+#     - the NavGrid used by AI flow fields
+#     - the spawn-point table
+#   At runtime each level file is memory-mapped once per process
+#   and shared read-only by every room on that map, so creating a
+#   room costs a dict lookup and memory does not grow with rooms.
+#
+#   File layout (little endian, version 1):
+#     header  : b"TJLV" | version u8 | pad u8 | cell_size u16
+#               | x_min, y_min, x_max, y_max (i32)
+#               | width, height, cols, rows (u16)
+#               | spawn count u16 | bitmap offset u32 | nav offset u32
+#     spawns  : (role u8, pad u8, pad u16, x f32, y f32) * count
+#     bitmap  : height rows of ceil(width / 8) bytes
+#     nav grid: cols * rows bytes (0 walkable, 1 blocked)
+#
+#   Build all maps: python -m backend.game_logic.levels
+# ================================================================
+
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+
+from backend.config import LEVELS_DIR, MAPS_DIR
+from backend.game_logic.navigation import NavGrid, FlowFieldCache, point_in_polygon, DEFAULT_CELL_SIZE
+from backend.game_logic.collision import PLAYER_RADIUS
+from backend.game_logic.simulation import ROLES
+
+# ================================================================
+# 1. FORMAT CONSTANTS
+# ================================================================
+MAGIC = b"TJLV"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH4i5H2I")
+SPAWN = struct.Struct("<BBHff")
+LEVEL_EXTENSION = ".tjl"
+MAX_FLOW_FIELDS = 1024
+# Map names come from clients and become file names
+MAP_NAME_PATTERN = re.compile(r"[a-z0-9_-]+")
+
+
+# ================================================================
+# 2. COMPILER
+# ------------------------------------------------
+# Offline step: rasterizes obstacles into the bitmap and builds the
+# nav grid. Slow-ish (per-pixel polygon tests) but never per room.
+# ================================================================
+def compile_level(map_data, cell_size=DEFAULT_CELL_SIZE):
+    """
+    Compile a map definition into level bytes.
+    :param map_data: Dict with 'bounds', 'obstacles' and 'spawns'.
+    :return: bytes in the .tjl format
+    """
+    x_min, y_min, x_max, y_max = map_data.get('bounds', [0, 0, 800, 600])
+    width, height = x_max - x_min, y_max - y_min
+    row_bytes = (width + 7) // 8
+    bitmap = bytearray(row_bytes * height)
+
+    for polygon in map_data.get('obstacles', []):
+        xs = [p[0] for p in polygon]
+        ys = [p[1] for p in polygon]
+        for py in range(max(int(min(ys)), y_min), min(int(max(ys)) + 1, y_max)):
+            for px in range(max(int(min(xs)), x_min), min(int(max(xs)) + 1, x_max)):
+                if point_in_polygon(px + 0.5, py + 0.5, polygon):
+                    bx, by = px - x_min, py - y_min
+                    bitmap[by * row_bytes + (bx >> 3)] |= 1 << (bx & 7)
+
+    # AI paths keep a player's radius away from walls and edges
+    nav_grid = NavGrid.from_map(map_data, cell_size, clearance=PLAYER_RADIUS)
+    spawns = [
+        (ROLES.index(role), float(pos[0]), float(pos[1]))
+        for role, pos in map_data.get('spawns', {}).items()
+        if role in ROLES
+    ]
+
+    bitmap_offset = HEADER.size + SPAWN.size * len(spawns)
+    nav_offset = bitmap_offset + len(bitmap)
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, cell_size,
+        x_min, y_min, x_max, y_max,
+        width, height, nav_grid.cols, nav_grid.rows,
+        len(spawns), bitmap_offset, nav_offset
+    )
+    body = b"".join(SPAWN.pack(role, 0, 0, x, y) for role, x, y in spawns)
+    return header + body + bytes(bitmap) + bytes(nav_grid.blocked)
+
+
+def compile_map_file(source_path, output_dir=LEVELS_DIR):
+    """Compile one JSON map file; returns the written level path."""
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    with open(source_path) as f:
+        data = compile_level(json.load(f))
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, name + LEVEL_EXTENSION)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    print(f"[Levels] 🗺️ Compiled '{name}' -> {path} ({len(data)} bytes)")
+    return path
+
+
+# ================================================================
+# 3. LEVEL CLASS
+# ------------------------------------------------
+# Read-only view over a memory-mapped level file.
+# ================================================================
+class Level:
+    def __init__(self, name, path):
+        """
+        :param name: Map name (e.g. "house")
+        :param path: Path to the compiled .tjl file
+        """
+        self.name = name
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        (magic, version, _, cell_size, x_min, y_min, x_max, y_max,
+         width, height, cols, rows, spawn_count, bitmap_offset, nav_offset) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a compiled level (or unsupported version)")
+
+        self.bounds = {'x_min': x_min, 'x_max': x_max, 'y_min': y_min, 'y_max': y_max}
+        self.width = width
+        self.height = height
+        self._row_bytes = (width + 7) // 8
+        self._bitmap = view[bitmap_offset:bitmap_offset + self._row_bytes * height]
+
+        self.spawns = {}
+        for i in range(spawn_count):
+            role, _, _, x, y = SPAWN.unpack_from(view, HEADER.size + i * SPAWN.size)
+            self.spawns[ROLES[role]] = (x, y)
+
+        # Nav grid cells point straight into the mapped file
+        self.nav_grid = NavGrid(x_min, y_min, x_max, y_max, cell_size,
+                                blocked=view[nav_offset:nav_offset + cols * rows])
+        # Flow fields depend only on the map, so rooms share them too;
+        # small maps can keep a field for every cell
+        self.flow_fields = FlowFieldCache(self.nav_grid, max_fields=min(cols * rows, MAX_FLOW_FIELDS))
+        self._circle_testers = {}
+
+    def is_wall(self, x, y):
+        """O(1) point-in-wall test; outside the bounds counts as wall."""
+        px = int(x) - self.bounds['x_min']
+        py = int(y) - self.bounds['y_min']
+        if px < 0 or py < 0 or px >= self.width or py >= self.height:
+            return True
+        return bool(self._bitmap[py * self._row_bytes + (px >> 3)] & (1 << (px & 7)))
+
+    def circle_tester(self, radius):
+        """
+        Circle-in-wall test (x, y) -> bool for players of `radius`,
+        built once per radius. Walls (and the bounds, which count as
+        wall) are inflated by the radius into a second bitmap, so a
+        move costs one lookup instead of sampling the circle's outline
+        (collision.circle_hits_wall).
+        """
+        tester = self._circle_testers.get(radius)
+        if tester is not None:
+            return tester
+
+        width, height, row_bytes = self.width, self.height, self._row_bytes
+        mask = (1 << width) - 1
+        # Centres within `radius` of the left/right bounds
+        edges = ((1 << radius) - 1) | (mask ^ (mask >> radius))
+        rows = [int.from_bytes(self._bitmap[y * row_bytes:(y + 1) * row_bytes], "little")
+                for y in range(height)]
+
+        def widen(bits, half):
+            # OR of the row shifted by -half..half pixels
+            span, total = 1, 2 * half + 1
+            while span * 2 <= total:
+                bits |= bits << span
+                span *= 2
+            if span < total:
+                bits |= bits << (total - span)
+            return bits >> half
+
+        # Half-width of the disc at each vertical offset
+        half_widths = [math.isqrt(radius * radius - dy * dy) for dy in range(radius + 1)]
+        widened = {half: [widen(bits, half) for bits in rows] for half in set(half_widths)}
+        inflated = bytearray()
+        for y in range(height):
+            if y < radius or y >= height - radius:
+                inflated += b"\xff" * row_bytes
+                continue
+            bits = edges
+            for dy in range(max(-radius, -y), min(radius, height - 1 - y) + 1):
+                bits |= widened[half_widths[abs(dy)]][y + dy]
+            inflated += (bits & mask).to_bytes(row_bytes, "little")
+
+        x_min, y_min = self.bounds['x_min'], self.bounds['y_min']
+
+        def tester(x, y):
+            px = int(x) - x_min
+            py = int(y) - y_min
+            if px < 0 or py < 0 or px >= width or py >= height:
+                return True
+            return bool(inflated[py * row_bytes + (px >> 3)] & (1 << (px & 7)))
+
+        self._circle_testers[radius] = tester
+        return tester
+
+
+# ================================================================
+# 4. LEVEL REGISTRY
+# ------------------------------------------------
+# Each level is mapped once per process. If the compiled file is
+# missing but the JSON source exists, it is compiled on first use.
+# ================================================================
+_levels = {}
+_levels_lock = threading.Lock()
+
+
+def valid_map_name(name):
+    """True if `name` is a string that can only name a file inside the map dirs."""
+    return isinstance(name, str) and MAP_NAME_PATTERN.fullmatch(name) is not None
+
+
+def level_exists(name):
+    """True if a compiled level or its JSON source is available."""
+    if not valid_map_name(name):
+        return False
+    return (name in _levels
+            or os.path.exists(os.path.join(LEVELS_DIR, name + LEVEL_EXTENSION))
+            or os.path.exists(os.path.join(MAPS_DIR, name + ".json")))
+
+
+def load_level(name):
+    """
+    Return the shared Level for a map name.
+    :raises FileNotFoundError: If neither compiled nor source map exists.
+    """
+    level = _levels.get(name)
+    if level is not None:
+        return level
+    if not valid_map_name(name):
+        raise FileNotFoundError(f"Unknown map {name!r}")
+
+    with _levels_lock:
+        level = _levels.get(name)
+        if level is None:
+            path = os.path.join(LEVELS_DIR, name + LEVEL_EXTENSION)
+            if not os.path.exists(path):
+                source = os.path.join(MAPS_DIR, name + ".json")
+                if not os.path.exists(source):
+                    raise FileNotFoundError(f"Unknown map '{name}'")
+                path = compile_map_file(source)
+            level = Level(name, path)
+            _levels[name] = level
+    return level
+
+
+# ================================================================
+# 5. COMMAND LINE
+# ------------------------------------------------
+# python -m backend.game_logic.levels [map.json ...]
+# Compiles the given maps (default: every map in MAPS_DIR).
+# ================================================================
+if __name__ == "__main__":
+    import sys
+
+    sources = sys.argv[1:] or [
+        os.path.join(MAPS_DIR, f) for f in sorted(os.listdir(MAPS_DIR)) if f.endswith(".json")
+    ]
+    for source_path in sources:
+        compile_map_file(source_path)
@@ -0,0 +1,182 @@
+# ================================================================
+# File: backend/game_logic/lookahead.py
+# Description:
+#   Short-horizon lookahead planner for the "hard" AI difficulty.
+#   Every candidate plan (a first direction held for a few ticks,
+#   then a second direction) is rolled out in parallel with NumPy
+#   using the same movement model as physics.py, including the
+#   speed / trap effects applied by PowerUpManager.
+#   Planning stops at a strict deadline; if no rollout finished in
+#   time the caller falls back to the greedy policy. Deterministic
+#   planners (the offline simulator) always roll out every split
+#   instead, so their plans never depend on the wall clock.
+# ================================================================
+
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; hard AI degrades to greedy
+    np = None
+
+from backend.config import Config
+from backend.game_logic.physics import WORLD_BOUNDS, DIRECTION_VECTORS
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Candidate directions (the 9 physics direction codes), catch
+# radius (same as collision.players_collide) and the split points
+# tried, one vectorized batch per split.
+# ================================================================
+CANDIDATE_DIRECTIONS = DIRECTION_VECTORS
+CATCH_RADIUS = 25
+DEFAULT_HORIZON = 16
+SPLIT_TICKS = (2, 5, 10)
+
+
+# ================================================================
+# 2. LOOKAHEAD PLANNER CLASS
+# ------------------------------------------------
+# Holds the precomputed candidate arrays and the wall mask, so a
+# decision only runs the rollouts themselves.
+# ================================================================
+class LookaheadPlanner:
+    def __init__(self, nav_grid=None, horizon=DEFAULT_HORIZON, time_budget_ms=None, deterministic=False):
+        """
+        :param nav_grid: Optional NavGrid used to stop rollouts at walls.
+        :param horizon: Number of ticks simulated per rollout.
+        :param time_budget_ms: Maximum time per decision (Config default).
+        :param deterministic: Roll out every split and ignore all
+                              deadlines: same inputs -> same plan.
+        """
+        self.nav_grid = nav_grid
+        self.horizon = horizon
+        self.deterministic = deterministic
+        self.time_budget = (time_budget_ms if time_budget_ms is not None
+                            else Config.AI_LOOKAHEAD_BUDGET_MS) / 1000.0
+
+        if nav_grid is not None:
+            self.bounds = (nav_grid.x_min, nav_grid.y_min, nav_grid.x_max, nav_grid.y_max)
+        else:
+            self.bounds = (WORLD_BOUNDS['x_min'], WORLD_BOUNDS['y_min'],
+                           WORLD_BOUNDS['x_max'], WORLD_BOUNDS['y_max'])
+
+        if np is None:
+            return
+
+        # Every (first, second) direction pair -> arrays of shape (81,)
+        dirs = np.array(CANDIDATE_DIRECTIONS)
+        count = len(CANDIDATE_DIRECTIONS)
+        self.first = np.repeat(dirs, count, axis=0)
+        self.second = np.tile(dirs, (count, 1))
+        self.first_index = np.repeat(np.arange(count), count)
+
+        self.wall_mask = None
+        if nav_grid is not None:
+            self.wall_mask = np.frombuffer(nav_grid.blocked, dtype=np.uint8).reshape(
+                nav_grid.rows, nav_grid.cols
+            ).astype(bool)
+
+    @property
+    def available(self):
+        return np is not None
+
+    # ------------------------------------------------------------
+    # EFFECTIVE SPEED
+    # ------------------------------------------------------------
+    @staticmethod
+    def effective_speed(state, default_speed):
+        """Speed after power-up effects (trapped players cannot move)."""
+        if state.get('trapped'):
+            return 0.0
+        return float(state.get('speed', default_speed))
+
+    # ------------------------------------------------------------
+    # ROLLOUT (one vectorized batch)
+    # ------------------------------------------------------------
+    def _rollout(self, ai_state, target_state, chase, ai_speed, target_speed, split):
+        x_min, y_min, x_max, y_max = self.bounds
+        n = len(self.first)
+        ax = np.full(n, float(ai_state['x']))
+        ay = np.full(n, float(ai_state['y']))
+        tx = np.full(n, float(target_state['x']))
+        ty = np.full(n, float(target_state['y']))
+
+        min_dist = np.full(n, np.inf)
+        caught_at = np.full(n, self.horizon, dtype=np.int64)
+
+        for t in range(self.horizon):
+            direction = self.first if t < split else self.second
+            nx = np.clip(ax + direction[:, 0] * ai_speed, x_min, x_max)
+            ny = np.clip(ay + direction[:, 1] * ai_speed, y_min, y_max)
+
+            if self.wall_mask is not None:
+                grid = self.nav_grid
+                cols = np.clip(((nx - x_min) // grid.cell_size).astype(np.int64), 0, grid.cols - 1)
+                rows = np.clip(((ny - y_min) // grid.cell_size).astype(np.int64), 0, grid.rows - 1)
+                blocked = self.wall_mask[rows, cols]
+                nx = np.where(blocked, ax, nx)
+                ny = np.where(blocked, ay, ny)
+            ax, ay = nx, ny
+
+            # Opponent model: greedy response to the AI's rolled-out position
+            dx, dy = ax - tx, ay - ty
+            dist = np.maximum(np.hypot(dx, dy), 1e-6)
+            sign = -1.0 if chase else 1.0  # target flees a chaser, chases an escaper
+            tx = np.clip(tx + sign * dx / dist * target_speed, x_min, x_max)
+            ty = np.clip(ty + sign * dy / dist * target_speed, y_min, y_max)
+
+            dist = np.hypot(ax - tx, ay - ty)
+            min_dist = np.minimum(min_dist, dist)
+            caught_at = np.where((dist < CATCH_RADIUS) & (caught_at == self.horizon), t, caught_at)
+
+        final_dist = np.hypot(ax - tx, ay - ty)
+        if chase:
+            # Lower is better: catch as early as possible, else end up closest
+            cost = np.where(caught_at < self.horizon, caught_at, self.horizon + final_dist)
+            best = int(np.argmin(cost))
+            return float(cost[best]), best
+        # Escaper: keep the closest approach as far as possible
+        value = min_dist + 0.1 * final_dist
+        best = int(np.argmax(value))
+        return float(-value[best]), best
+
+    # ------------------------------------------------------------
+    # PLAN
+    # ------------------------------------------------------------
+    def plan(self, ai_state, target_state, chase, default_speed=5, deadline=None):
+        """
+        Pick the best first direction within the time budget.
+        :param deadline: Optional perf_counter() deadline from the caller;
+                         the tighter of it and our own budget is used
+                         (both are ignored by deterministic planners).
+        :return: Unit (dx, dy) vector, or None if no batch finished in time.
+        """
+        if np is None:
+            return None
+        if self.deterministic:
+            deadline = float("inf")
+        else:
+            own_deadline = time.perf_counter() + self.time_budget
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+
+        ai_speed = self.effective_speed(ai_state, default_speed)
+        target_speed = self.effective_speed(target_state, default_speed)
+
+        best_cost, best_plan = None, None
+        for split in SPLIT_TICKS:
+            if time.perf_counter() >= deadline:
+                break
+            cost, plan_index = self._rollout(ai_state, target_state, chase, ai_speed, target_speed, split)
+            if time.perf_counter() > deadline:
+                break  # Finished too late to count
+            if best_cost is None or cost < best_cost:
+                best_cost, best_plan = cost, plan_index
+
+        if best_plan is None:
+            return None
+        dx, dy = CANDIDATE_DIRECTIONS[int(self.first_index[best_plan])]
+        if dx == 0 and dy == 0:
+            return 0.0, 0.0
+        return dx, dy
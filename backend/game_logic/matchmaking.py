@@ -0,0 +1,223 @@
+# ================================================================
+# File: backend/game_logic/matchmaking.py
+# Description:
+#   Server-side matchmaking on top of RoomManager.
+#   Open, not-started rooms are indexed by their map and the role
+#   they still need (Tom or Jerry slot) in one min-heap per
+#   (map, role), ordered by room creation time. Pairing a player is a heap pop + join under
+#   a single lock, so join storms never scan the lobby and two
+#   players can never be booked into the same slot.
+#   Solo matches (start_solo) seat the player against an AI that
+#   the shared AIScheduler drives.
+#   A player holds at most one seat: asking again while queued or
+#   in an unfinished match returns the seat they already have.
+# ================================================================
+
+import heapq
+import itertools
+import threading
+
+from backend.game_logic.rooms import room_manager as default_room_manager
+from backend.game_logic.actors import room_actors as default_room_actors
+from backend.game_logic.ai_scheduler import ai_scheduler as default_ai_scheduler
+from backend.game_logic.simulation import ROLES
+from backend.config import Config
+
+AI_DIFFICULTIES = ("normal", "hard")
+
+# ================================================================
+# 1. MATCHMAKER CLASS
+# ------------------------------------------------
+# Keeps the per-role index in sync through RoomManager listeners;
+# entries for rooms that filled up, started or disappeared are
+# dropped lazily when they reach the top of a heap.
+# ================================================================
+class Matchmaker:
+    def __init__(self, room_manager=default_room_manager, actors=default_room_actors,
+                 ai_scheduler=default_ai_scheduler):
+        """
+        :param room_manager: RoomManager whose rooms are matched into.
+        :param actors: ActorSystem owning the rooms' matches.
+        :param ai_scheduler: AIScheduler that plans solo-match AIs.
+        """
+        self.room_manager = room_manager
+        self.actors = actors
+        self.ai_scheduler = ai_scheduler
+        self._queues = {}                              # (map_name, role) -> [(created_at, seq, room_id)]
+        self._indexed = set()                          # (room_id, role) present in a heap
+        self._seats = {}                               # player_id -> room_id
+        self._occupants = {}                           # room_id -> {player_id} (for cleanup)
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+        for room in room_manager.rooms.values():
+            self._index(room)
+        room_manager.add_listener(self._on_room_event)
+
+    # ------------------------------------------------------------
+    # INDEX MAINTENANCE
+    # ------------------------------------------------------------
+    def _index(self, room):
+        """Push every open role of a room that is not indexed yet."""
+        for role in room.open_roles():
+            key = (room.id, role)
+            if key not in self._indexed:
+                self._indexed.add(key)
+                heapq.heappush(self._queues.setdefault((room.map_name, role), []),
+                               (room.created_at, next(self._seq), room.id))
+
+    def _on_room_event(self, event, room):
+        # Removed rooms are skipped lazily in the heaps but free their
+        # seats; created/changed rooms may have (re)opened a slot,
+        # e.g. after a player left. A room created with players in it
+        # was resumed from a checkpoint: its players keep their seats.
+        with self._lock:
+            if event == 'removed':
+                for player_id in self._occupants.pop(room.id, ()):
+                    if self._seats.get(player_id) == room.id:
+                        del self._seats[player_id]
+            else:
+                if event == 'created' and not room.finished:
+                    for player_id in room.players:
+                        self._take_seat(player_id, room)
+                self._index(room)
+
+    # ------------------------------------------------------------
+    # SEAT TRACKING
+    # ------------------------------------------------------------
+    def _seat_of(self, player_id):
+        """Room the player is still seated in (queued or playing), else None."""
+        room_id = self._seats.get(player_id)
+        if room_id is None:
+            return None
+        room = self.room_manager.get_room(room_id)
+        if room is None or room.finished or player_id not in room.players:
+            # Left, finished or removed without us hearing about it
+            del self._seats[player_id]
+            self._occupants.get(room_id, set()).discard(player_id)
+            return None
+        return room
+
+    def _take_seat(self, player_id, room):
+        self._seats[player_id] = room.id
+        self._occupants.setdefault(room.id, set()).add(player_id)
+
+    def _peek(self, map_name, role):
+        """Return (entry, room) for the oldest room on `map_name` still needing `role`."""
+        heap = self._queues.get((map_name, role), [])
+        while heap:
+            entry = heap[0]
+            room = self.room_manager.get_room(entry[2])
+            if room is not None and role in room.open_roles():
+                return entry, room
+            heapq.heappop(heap)
+            self._indexed.discard((entry[2], role))
+        return None, None
+
+    # ------------------------------------------------------------
+    # FIND MATCH
+    # ------------------------------------------------------------
+    def find_match(self, player_id, nickname, role=None, map_name=None):
+        """
+        Seat a player in the oldest open room on their map needing
+        their role, creating a room on demand.
+        :param role: 'tom', 'jerry' or None for whichever slot is oldest.
+        :param map_name: Map to play (Config.DEFAULT_MAP); must exist.
+        :return: (room, assigned_role), or (None, None) when no room is
+                 open and this worker refuses new ones (overloaded).
+                 A player who already has a seat gets that seat back.
+        """
+        roles = [role] if role else list(ROLES)
+        map_name = map_name or Config.DEFAULT_MAP
+
+        with self._lock:
+            seated = self._seat_of(player_id)
+            if seated is not None:
+                return seated, seated.players[player_id]['role']
+
+            best_entry, best_room, best_role = None, None, None
+            for candidate in roles:
+                entry, room = self._peek(map_name, candidate)
+                if entry is not None and (best_entry is None or entry < best_entry):
+                    best_entry, best_room, best_role = entry, room, candidate
+
+            if best_room is not None:
+                heapq.heappop(self._queues[(map_name, best_role)])
+                self._indexed.discard((best_room.id, best_role))
+                self.room_manager.join_room(best_room.id, player_id, nickname, best_role)
+                self._take_seat(player_id, best_room)
+                print(f"[Matchmaker] 🤝 Paired {nickname} as {best_role} in '{best_room.name}'.")
+                if len(best_room.players) >= best_room.max_players:
+                    # Full room: the match starts right away
+                    for player in best_room.players.values():
+                        player['ready'] = True
+                    self.room_manager.start_game(best_room.id)
+                return best_room, best_role
+
+            assigned_role = role or ROLES[0]
+            room = self.room_manager.create_room(map_name=map_name)
+            if room is None:
+                return None, None
+            self.room_manager.join_room(room.id, player_id, nickname, assigned_role)
+            self._take_seat(player_id, room)
+            return room, assigned_role
+
+    # ------------------------------------------------------------
+    # SOLO MATCH
+    # ------------------------------------------------------------
+    def start_solo(self, player_id, nickname, role=None, difficulty="normal", map_name=None):
+        """
+        Start a match against an AI opponent right away.
+        :param role: Player's role ('tom' by default); the AI takes the other.
+        :param difficulty: AI difficulty, 'normal' or 'hard'.
+        :param map_name: Map to play (Config.DEFAULT_MAP); must exist.
+        :return: (room, assigned_role, ai_id), or (None, None, None)
+                 when this worker refuses new rooms (overloaded).
+                 A player who already has a seat gets that seat back
+                 (ai_id is then their current opponent, if any).
+        """
+        role = role or ROLES[0]
+        ai_role = next(r for r in ROLES if r != role)
+
+        # Under the lock, so find_match never sees the room's open slot
+        # between its creation and the start of the match
+        with self._lock:
+            seated = self._seat_of(player_id)
+            if seated is not None:
+                opponent = next((pid for pid in seated.players if pid != player_id), None)
+                return seated, seated.players[player_id]['role'], opponent
+
+            room = self.room_manager.create_room(name=f"Solo-{nickname}", map_name=map_name)
+            if room is None:
+                return None, None, None
+            ai_id = f"ai-{room.id[:8]}"
+            self.room_manager.join_room(room.id, player_id, nickname, role)
+            self.room_manager.join_room(room.id, ai_id, "AI", ai_role)
+            self._take_seat(player_id, room)
+            for player in room.players.values():
+                player['ready'] = True
+            self.room_manager.start_game(room.id)
+
+        # The simulation belongs to the room's actor from here on
+        self.actors.tell(room.id, 'add_ai', ai_id=ai_id, target_id=player_id,
+                         difficulty=difficulty, scheduler=self.ai_scheduler)
+        print(f"[Matchmaker] 🤖 Solo match for {nickname} as {role} in '{room.name}'.")
+        return room, role, ai_id
+
+    # ------------------------------------------------------------
+    # CANCEL
+    # ------------------------------------------------------------
+    def cancel(self, room_id, player_id):
+        """Leave a room before it starts; its slot is re-indexed."""
+        with self._lock:
+            left = self.room_manager.leave_room(room_id, player_id)
+            if self._seats.get(player_id) == room_id:
+                del self._seats[player_id]
+                self._occupants.get(room_id, set()).discard(player_id)
+            return left
+
+
+# ================================================================
+# 2. GLOBAL MATCHMAKER INSTANCE
+# ================================================================
+matchmaker = Matchmaker()
@@ -0,0 +1,389 @@
+# ================================================================
+# File: backend/game_logic/navigation.py
+# Description:
+#   Grid-based navigation for AI-controlled characters.
+#   The map's walkable space is precomputed once into a NavGrid.
+#   From it, a FlowField (distance field to a target) is built
+#   per target position and shared by every AI agent that chases
+#   or flees that target, so each agent's decision is a constant
+#   time lookup no matter how many agents there are. Fleeing agents
+#   also use a field from their own cell to plan an escape route.
+# ================================================================
+
+import math
+import threading
+from array import array
+from collections import deque, OrderedDict
+
+from backend.game_logic.physics import WORLD_BOUNDS
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Default cell size (pixels) and the 8 neighbour offsets used
+# when expanding the distance field. A fleeing agent values each
+# cell of clearance (distance to the nearest wall or map edge, up
+# to ESCAPE_CLEARANCE_CAP cells) like ESCAPE_CLEARANCE_WEIGHT cells
+# of distance from its chaser.
+# ================================================================
+DEFAULT_CELL_SIZE = 20
+UNREACHABLE = -1
+ESCAPE_CLEARANCE_WEIGHT = 1
+ESCAPE_CLEARANCE_CAP = 3
+NEIGHBOR_OFFSETS = (
+    (0, -1), (1, -1), (1, 0), (1, 1),
+    (0, 1), (-1, 1), (-1, 0), (-1, -1)
+)
+
+
+# ================================================================
+# 2. POLYGON HELPERS
+# ------------------------------------------------
+# Ray-casting point-in-polygon test and point-to-outline distance,
+# used only while building the grid from map obstacles (never per
+# tick).
+# ================================================================
+def point_in_polygon(x, y, polygon):
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def distance_to_polygon(x, y, polygon):
+    """Distance from a point to the nearest edge of a polygon."""
+    best = math.inf
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        ex, ey = xj - xi, yj - yi
+        length_sq = ex * ex + ey * ey
+        t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((x - xi) * ex + (y - yi) * ey) / length_sq))
+        best = min(best, math.hypot(x - (xi + t * ex), y - (yi + t * ey)))
+        j = i
+    return best
+
+
+# ================================================================
+# 3. NAV GRID CLASS
+# ------------------------------------------------
+# Precomputed walkability grid covering the map bounds.
+# One byte per cell: 0 = walkable, 1 = blocked.
+# ================================================================
+class NavGrid:
+    def __init__(self, x_min, y_min, x_max, y_max, cell_size=DEFAULT_CELL_SIZE, blocked=None):
+        """
+        Initialize the navigation grid.
+        :param x_min, y_min, x_max, y_max: Map bounds in pixels.
+        :param cell_size: Width/height of one grid cell in pixels.
+        :param blocked: Optional bytes-like object (one byte per cell).
+        """
+        self.x_min = x_min
+        self.y_min = y_min
+        self.x_max = x_max
+        self.y_max = y_max
+        self.cell_size = cell_size
+        self.cols = max(1, int(math.ceil((x_max - x_min) / cell_size)))
+        self.rows = max(1, int(math.ceil((y_max - y_min) / cell_size)))
+        self.blocked = blocked if blocked is not None else bytearray(self.cols * self.rows)
+        self._neighbors = None
+        self._clearance = None
+
+    # ------------------------------------------------------------
+    # BUILDERS
+    # ------------------------------------------------------------
+    @classmethod
+    def from_bounds(cls, world_bounds=WORLD_BOUNDS, cell_size=DEFAULT_CELL_SIZE):
+        """Build an open grid (no walls) from a bounds dict."""
+        return cls(world_bounds['x_min'], world_bounds['y_min'],
+                   world_bounds['x_max'], world_bounds['y_max'], cell_size)
+
+    @classmethod
+    def from_map(cls, map_data, cell_size=DEFAULT_CELL_SIZE, clearance=0):
+        """
+        Build a grid from a map definition (same layout as the
+        frontend's assets/maps/*.json: 'bounds' and 'obstacles').
+        A cell is blocked when its centre lies inside an obstacle,
+        or closer than `clearance` px to one or to the map edge
+        (the player's radius, so every walkable cell centre fits
+        a player).
+        """
+        x_min, y_min, x_max, y_max = map_data.get('bounds', [0, 0, 800, 600])
+        grid = cls(x_min, y_min, x_max, y_max, cell_size)
+
+        if clearance:
+            for row in range(grid.rows):
+                for col in range(grid.cols):
+                    cx, cy = grid.cell_center(col, row)
+                    if min(cx - x_min, x_max - cx, cy - y_min, y_max - cy) < clearance:
+                        grid.blocked[row * grid.cols + col] = 1
+
+        for polygon in map_data.get('obstacles', []):
+            xs = [p[0] for p in polygon]
+            ys = [p[1] for p in polygon]
+            c0, r0 = grid.cell_of(min(xs) - clearance, min(ys) - clearance)
+            c1, r1 = grid.cell_of(max(xs) + clearance, max(ys) + clearance)
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    cx, cy = grid.cell_center(col, row)
+                    if point_in_polygon(cx, cy, polygon) or distance_to_polygon(cx, cy, polygon) < clearance:
+                        grid.blocked[row * grid.cols + col] = 1
+        return grid
+
+    # ------------------------------------------------------------
+    # CELL LOOKUPS
+    # ------------------------------------------------------------
+    def cell_of(self, x, y):
+        """Return the (col, row) containing a world position, clamped to the grid."""
+        col = int((x - self.x_min) // self.cell_size)
+        row = int((y - self.y_min) // self.cell_size)
+        return min(max(col, 0), self.cols - 1), min(max(row, 0), self.rows - 1)
+
+    def cell_center(self, col, row):
+        """Return the world position at the centre of a cell."""
+        half = self.cell_size / 2
+        return self.x_min + col * self.cell_size + half, self.y_min + row * self.cell_size + half
+
+    def in_grid(self, col, row):
+        return 0 <= col < self.cols and 0 <= row < self.rows
+
+    def is_walkable(self, col, row):
+        return self.in_grid(col, row) and not self.blocked[row * self.cols + col]
+
+    def is_blocked_at(self, x, y):
+        """True if a world position falls inside a blocked cell."""
+        col, row = self.cell_of(x, y)
+        return bool(self.blocked[row * self.cols + col])
+
+    def neighbors(self):
+        """
+        Per-cell tuples of reachable neighbour indices, built once on
+        first use (so only after the grid's walls are final). Diagonal
+        moves that would cut a wall corner are left out.
+        """
+        if self._neighbors is None:
+            neighbors = []
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    cell = []
+                    for dc, dr in NEIGHBOR_OFFSETS:
+                        if not self.is_walkable(col + dc, row + dr):
+                            continue
+                        if dc and dr and not (self.is_walkable(col + dc, row) and self.is_walkable(col, row + dr)):
+                            continue
+                        cell.append((row + dr) * self.cols + col + dc)
+                    neighbors.append(tuple(cell))
+            self._neighbors = neighbors
+        return self._neighbors
+
+    def clearance(self):
+        """
+        Per-cell steps to the nearest blocked cell or map edge (1 =
+        touching one), capped at ESCAPE_CLEARANCE_CAP. Built once on
+        first use, like neighbors().
+        """
+        if self._clearance is None:
+            clearance = array('i', [ESCAPE_CLEARANCE_CAP]) * (self.cols * self.rows)
+            queue = deque()
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    idx = row * self.cols + col
+                    if self.blocked[idx]:
+                        clearance[idx] = 0
+                    elif not all(self.in_grid(col + dc, row + dr) for dc, dr in NEIGHBOR_OFFSETS):
+                        clearance[idx] = 1
+                    else:
+                        continue
+                    queue.append(idx)
+            while queue:
+                idx = queue.popleft()
+                col, row = idx % self.cols, idx // self.cols
+                for dc, dr in NEIGHBOR_OFFSETS:
+                    if self.in_grid(col + dc, row + dr):
+                        nidx = (row + dr) * self.cols + col + dc
+                        if clearance[idx] + 1 < clearance[nidx]:
+                            clearance[nidx] = clearance[idx] + 1
+                            queue.append(nidx)
+            self._clearance = clearance
+        return self._clearance
+
+
+# ================================================================
+# 4. FLOW FIELD CLASS
+# ------------------------------------------------
+# Breadth-first distance field from one target cell.
+# Each cell also stores the neighbour one step closer to the
+# target, so chasing is a single array lookup.
+# ================================================================
+class FlowField:
+    def __init__(self, grid, target_cell):
+        """
+        Build the distance field.
+        :param grid: NavGrid to expand over.
+        :param target_cell: (col, row) the field flows toward.
+        """
+        self.grid = grid
+        self.target_cell = target_cell
+        size = grid.cols * grid.rows
+        self.distance = array('i', [UNREACHABLE]) * size
+        self.next_cell = array('i', [UNREACHABLE]) * size
+        self._escape_goals = {}  # fleeing agent's cell -> escape_goal()
+        self._build()
+
+    def _build(self):
+        tcol, trow = self.target_cell
+        start = trow * self.grid.cols + tcol
+        neighbors = self.grid.neighbors()
+        distance, next_cell = self.distance, self.next_cell
+        distance[start] = 0
+        next_cell[start] = start
+        queue = deque([start])
+
+        while queue:
+            idx = queue.popleft()
+            dist = distance[idx] + 1
+            for nidx in neighbors[idx]:
+                if distance[nidx] == UNREACHABLE:
+                    distance[nidx] = dist
+                    next_cell[nidx] = idx
+                    queue.append(nidx)
+
+    # ------------------------------------------------------------
+    # DIRECTION LOOKUP
+    # ------------------------------------------------------------
+    def direction_from(self, x, y, flee=False):
+        """
+        Return a unit (dx, dy) vector to follow from a world position,
+        or None when the position is unreachable or already optimal.
+        :param flee: If True, move to the neighbour farthest from the target.
+        """
+        grid = self.grid
+        col, row = grid.cell_of(x, y)
+        idx = row * grid.cols + col
+        if self.distance[idx] == UNREACHABLE:
+            return None
+
+        if flee:
+            best_idx, best_dist = idx, self.distance[idx]
+            for dc, dr in NEIGHBOR_OFFSETS:
+                ncol, nrow = col + dc, row + dr
+                if not grid.in_grid(ncol, nrow):
+                    continue
+                nidx = nrow * grid.cols + ncol
+                if self.distance[nidx] > best_dist:
+                    best_idx, best_dist = nidx, self.distance[nidx]
+        else:
+            best_idx = self.next_cell[idx]
+
+        if best_idx == idx:
+            return None
+        return self._toward(best_idx, x, y)
+
+    def _toward(self, cell_idx, x, y):
+        """Unit vector from a world position to a cell's centre."""
+        grid = self.grid
+        tx, ty = grid.cell_center(cell_idx % grid.cols, cell_idx // grid.cols)
+        dx, dy = tx - x, ty - y
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return None
+        return dx / length, dy / length
+
+    # ------------------------------------------------------------
+    # ESCAPE ROUTE
+    # ------------------------------------------------------------
+    # Stepping to the neighbour farthest from the chaser (flee=True
+    # above) runs the agent into the nearest corner and keeps it
+    # there. Instead it heads for the best cell it reaches strictly
+    # before the chaser: far from the chaser, and away from walls
+    # and edges. As the chaser closes in, that cell moves around it,
+    # so the agent runs past and around obstacles.
+    # ------------------------------------------------------------
+    def escape_goal(self, own_field):
+        """
+        Cell index to flee to from own_field's target cell (this
+        field's target is the chaser), or None if the agent reaches
+        no cell first. Cached per agent cell.
+        """
+        tcol, trow = own_field.target_cell
+        start = trow * self.grid.cols + tcol
+        if start in self._escape_goals:
+            return self._escape_goals[start]
+
+        clearance = self.grid.clearance()
+        best_idx, best_value = None, None
+        for idx, (chaser_dist, own_dist) in enumerate(zip(self.distance, own_field.distance)):
+            if own_dist == UNREACHABLE or own_dist >= chaser_dist:
+                continue
+            # Nearer cells win ties
+            value = chaser_dist + ESCAPE_CLEARANCE_WEIGHT * clearance[idx] - own_dist / (chaser_dist + 1)
+            if best_value is None or value > best_value:
+                best_idx, best_value = idx, value
+        self._escape_goals[start] = best_idx
+        return best_idx
+
+    def escape_from(self, own_field, x, y):
+        """
+        Return a unit (dx, dy) vector fleeing this field's target.
+        :param own_field: FlowField toward the fleeing agent's cell;
+                          its next_cell links lead from the escape
+                          goal back to the agent.
+        Falls back to direction_from(flee=True) when the agent's own
+        cell is already the best one.
+        """
+        goal = self.escape_goal(own_field)
+        tcol, trow = own_field.target_cell
+        start = trow * self.grid.cols + tcol
+        if goal is None or goal == start:
+            return self.direction_from(x, y, flee=True)
+
+        step = goal
+        while own_field.next_cell[step] != start:
+            step = own_field.next_cell[step]
+        return self._toward(step, x, y)
+
+
+# ================================================================
+# 5. FLOW FIELD CACHE
+# ------------------------------------------------
+# Shares one FlowField per target cell between all agents.
+# A field is rebuilt only when its target moves to a new cell;
+# the cache is bounded so stale targets fall out. Safe to share
+# between rooms running on different threads.
+# ================================================================
+class FlowFieldCache:
+    def __init__(self, grid, max_fields=32):
+        """
+        :param grid: NavGrid all fields are built on.
+        :param max_fields: Maximum number of fields kept in memory.
+        """
+        self.grid = grid
+        self.max_fields = max_fields
+        self._fields = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, target_pos):
+        """Return the FlowField toward a target position ({'x', 'y'})."""
+        cell = self.grid.cell_of(target_pos['x'], target_pos['y'])
+        with self._lock:
+            field = self._fields.get(cell)
+            if field is not None:
+                self._fields.move_to_end(cell)
+                return field
+
+        field = FlowField(self.grid, cell)
+        with self._lock:
+            self._fields[cell] = field
+            if len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+        return field
+
+    def clear(self):
+        with self._lock:
+            self._fields.clear()
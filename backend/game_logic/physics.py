@@ -102,3 +102,50 @@ def update_game_state(game_state):
     for player_id, state in game_state['players'].items():
         apply_gravity(state)
         move_player(state, state.get('direction', None))
+
+
+# ============================================================
+# 6. TOP-DOWN DIRECTION CODES
+# ------------------------------------------------------------
+# Player inputs in the server simulation are one of 9 codes:
+# 0 = stand still, 1..8 = compass directions clockwise from north.
+# A single byte per input keeps replays and network input small.
+# ============================================================
+_DIAG = 1 / math.sqrt(2)
+DIRECTION_VECTORS = (
+    (0.0, 0.0),
+    (0.0, -1.0), (_DIAG, -_DIAG), (1.0, 0.0), (_DIAG, _DIAG),
+    (0.0, 1.0), (-_DIAG, _DIAG), (-1.0, 0.0), (-_DIAG, -_DIAG)
+)
+
+
+def direction_code(dx, dy):
+    """
+    Quantize a direction vector to the nearest direction code.
+
+    Args:
+        dx (float): X component (any length)
+        dy (float): Y component (any length)
+
+    Returns:
+        int: 0 for (near) zero vectors, else 1..8
+    """
+    if abs(dx) < 1e-9 and abs(dy) < 1e-9:
+        return 0
+    angle = math.atan2(dx, -dy)  # 0 = north, clockwise positive
+    return int(round(angle / (math.pi / 4))) % 8 + 1
+
+
+def move_in_direction(player_state, code, speed, bounds=WORLD_BOUNDS):
+    """
+    Moves a player along a direction code and clamps to the map.
+
+    Args:
+        player_state (dict): Player data (x, y)
+        code (int): Direction code (0..8)
+        speed (float): Distance to travel this step
+        bounds (dict): x_min, x_max, y_min, y_max
+    """
+    dx, dy = DIRECTION_VECTORS[code]
+    player_state['x'] = max(bounds['x_min'], min(player_state['x'] + dx * speed, bounds['x_max']))
+    player_state['y'] = max(bounds['y_min'], min(player_state['y'] + dy * speed, bounds['y_max']))
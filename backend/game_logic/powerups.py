@@ -4,53 +4,100 @@
 #   This module handles the logic for collectible power-ups
 #   in the Tom & Jerry game. Power-ups are temporary effects
 #   that modify player abilities like speed, visibility, or traps.
+#
+#   Expiry (of items on the map and of player effects) is driven
+#   by a min-heap on a monotonic clock, so each update only touches
+#   what actually expired. Player effects stack, and each player's
+#   effective stats are recomputed only when an effect starts or ends.
 # ================================================================
 
+import heapq
+import itertools
 import random
 import time
 
 # ================================================================
-# 1. POWERUP CLASS
+# 1. EFFECT MODIFIERS
+# ------------------------------------------------
+# How each power-up type changes a player's stats.
+# Speed boosts stack multiplicatively; flags are on while any
+# effect of that type is active.
+# ================================================================
+BASE_SPEED = 5
+SPEED_MULTIPLIER = 1.5
+SPAWN_CHANCE = 0.1
+DEFAULT_STATS = {'speed_multiplier': 1.0, 'visible': True, 'trapped': False}
+
+
+# ================================================================
+# 2. POWERUP CLASS
 # ------------------------------------------------
 # Represents a single power-up in the game world.
 # Each has a type (e.g., speed boost) and a duration.
 # ================================================================
 class PowerUp:
-    def __init__(self, powerup_type, x, y, duration=5):
+    def __init__(self, powerup_type, x, y, duration=5, spawn_time=None, powerup_id=None):
         """
         Initialize a power-up item.
         :param powerup_type: String type ('speed', 'invisibility', 'trap')
         :param x: X position on the map
         :param y: Y position on the map
         :param duration: Duration of power-up effect in seconds
+        :param spawn_time: Clock value at spawn (defaults to time.monotonic())
+        :param powerup_id: ID unique within its manager
         """
+        self.id = powerup_id
         self.type = powerup_type
         self.x = x
         self.y = y
         self.duration = duration
         self.active = True
-        self.spawn_time = time.time()
+        self.spawn_time = spawn_time if spawn_time is not None else time.monotonic()
+
+    @property
+    def expires_at(self):
+        return self.spawn_time + self.duration
 
-    def is_expired(self):
+    def is_expired(self, now=None):
         """Check if the power-up effect time has passed."""
-        return time.time() - self.spawn_time > self.duration
+        now = now if now is not None else time.monotonic()
+        return now > self.expires_at
 
 
 # ================================================================
-# 2. POWERUP MANAGER CLASS
+# 3. POWERUP MANAGER CLASS
 # ------------------------------------------------
 # Manages spawning, activation, and expiration of all power-ups.
 # Keeps track of active and collected power-ups for all players.
 # ================================================================
 class PowerUpManager:
-    def __init__(self, game_state):
+    def __init__(self, game_state, clock=None, rng=None, spawn_chance=SPAWN_CHANCE, verbose=True):
         """
         Initialize PowerUpManager with shared game state.
         :param game_state: Dictionary tracking players and moves.
+        :param clock: Zero-argument callable returning seconds
+                      (defaults to time.monotonic).
+        :param rng: random.Random used for spawns (defaults to the
+                    global random module). Pass a seeded one for
+                    deterministic simulations.
+        :param spawn_chance: Probability of a spawn on each update.
+        :param verbose: Log spawns, pickups and expiries.
         """
         self.game_state = game_state
-        self.active_powerups = []
-        self.collected_powerups = {}
+        self.clock = clock or time.monotonic
+        self.rng = rng or random
+        self.spawn_chance = spawn_chance
+        self.verbose = verbose
+        self.active_powerups = {}        # powerup_id -> PowerUp on the map
+        self.collected_powerups = {}     # player_id -> {effect_id: effect}
+        self.player_stats = {}           # player_id -> cached effective stats
+        self._expiry_heap = []           # (expires_at, seq, kind, key)
+        self._seq = itertools.count()
+        self._powerup_ids = itertools.count(1)
+        self._effect_ids = itertools.count(1)
+
+    def _schedule(self, expires_at, kind, key):
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._seq), kind, key))
 
     # ============================================================
     # SPAWN POWERUPS
@@ -60,33 +107,41 @@ class PowerUpManager:
     # ============================================================
     def spawn_powerup(self):
         powerup_types = ['speed', 'invisibility', 'trap']
-        p_type = random.choice(powerup_types)
-        x, y = random.randint(0, 500), random.randint(0, 500)
+        p_type = self.rng.choice(powerup_types)
+        x, y = self.rng.randint(0, 500), self.rng.randint(0, 500)
 
-        powerup = PowerUp(p_type, x, y)
-        self.active_powerups.append(powerup)
+        powerup = PowerUp(p_type, x, y, spawn_time=self.clock(), powerup_id=next(self._powerup_ids))
+        self.active_powerups[powerup.id] = powerup
+        self._schedule(powerup.expires_at, 'powerup', powerup.id)
 
-        print(f"[PowerUpManager] 🧩 Spawned {p_type} power-up at ({x}, {y})")
-        return {'type': p_type, 'x': x, 'y': y, 'duration': powerup.duration}
+        if self.verbose:
+            print(f"[PowerUpManager] 🧩 Spawned {p_type} power-up at ({x}, {y})")
+        return {'id': powerup.id, 'type': p_type, 'x': x, 'y': y, 'duration': powerup.duration}
 
     # ============================================================
     # COLLECT POWERUP
     # ------------------------------------------------------------
     # Triggered when a player touches a power-up on the map.
-    # The effect is applied temporarily and tracked per player.
+    # The effect is applied temporarily and tracked per player;
+    # several effects (even of the same type) can be active at once.
     # ============================================================
-    def collect_powerup(self, player_id, powerup_index):
-        if powerup_index >= len(self.active_powerups):
+    def collect_powerup(self, player_id, powerup_id):
+        powerup = self.active_powerups.pop(powerup_id, None)
+        if powerup is None:
             return None
 
-        powerup = self.active_powerups.pop(powerup_index)
         powerup.active = False
-        self.collected_powerups[player_id] = {
+        effect_id = next(self._effect_ids)
+        expires_at = self.clock() + powerup.duration
+        self.collected_powerups.setdefault(player_id, {})[effect_id] = {
             'type': powerup.type,
-            'expires_at': time.time() + powerup.duration
+            'expires_at': expires_at
         }
+        self._schedule(expires_at, 'effect', (player_id, effect_id))
+        self._recompute_stats(player_id)
 
-        print(f"[PowerUpManager] ⚡ Player {player_id} collected {powerup.type} power-up.")
+        if self.verbose:
+            print(f"[PowerUpManager] ⚡ Player {player_id} collected {powerup.type} power-up.")
         return {'player_id': player_id, 'powerup': powerup.type}
 
     # ============================================================
@@ -94,43 +149,120 @@ class PowerUpManager:
     # ------------------------------------------------------------
     # Called periodically to remove expired effects
     # and respawn new ones for continued gameplay.
+    # Only pops heap entries that are due; entries for power-ups
+    # collected before expiring are skipped.
+    # Returns the IDs of players whose stats changed.
     # ============================================================
     def update(self):
-        # Remove expired power-ups
-        self.active_powerups = [p for p in self.active_powerups if not p.is_expired()]
-
-        # Remove expired player effects
-        now = time.time()
-        expired_players = [
-            pid for pid, data in self.collected_powerups.items()
-            if data['expires_at'] <= now
-        ]
-        for pid in expired_players:
-            expired_type = self.collected_powerups[pid]['type']
-            del self.collected_powerups[pid]
-            print(f"[PowerUpManager] ⏳ Player {pid}'s {expired_type} effect expired.")
+        now = self.clock()
+        changed_players = set()
+
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, _, kind, key = heapq.heappop(self._expiry_heap)
+
+            if kind == 'powerup':
+                # Remove expired power-up (no-op if already collected)
+                self.active_powerups.pop(key, None)
+                continue
+
+            # Remove expired player effect
+            player_id, effect_id = key
+            effects = self.collected_powerups.get(player_id, {})
+            expired = effects.pop(effect_id, None)
+            if expired is None:
+                continue
+            if not effects:
+                del self.collected_powerups[player_id]
+            self._recompute_stats(player_id)
+            changed_players.add(player_id)
+            if self.verbose:
+                print(f"[PowerUpManager] ⏳ Player {player_id}'s {expired['type']} effect expired.")
 
         # Random chance to spawn a new power-up
-        if random.random() < 0.1:  # 10% chance every update cycle
+        if self.rng.random() < self.spawn_chance:  # 10% chance every update cycle by default
             self.spawn_powerup()
 
+        return changed_players
+
+    # ============================================================
+    # CHECKPOINT
+    # ------------------------------------------------------------
+    # Plain-data copy of every item, effect, timer and id counter,
+    # so a restored manager continues exactly where this one was.
+    # ============================================================
+    def _counter_value(self, attr):
+        value = next(getattr(self, attr))
+        setattr(self, attr, itertools.count(value))
+        return value
+
+    def get_state(self):
+        return {
+            'powerups': [(p.id, p.type, p.x, p.y, p.duration, p.spawn_time)
+                         for p in self.active_powerups.values()],
+            'effects': [(player_id, effect_id, effect['type'], effect['expires_at'])
+                        for player_id, effects in self.collected_powerups.items()
+                        for effect_id, effect in effects.items()],
+            'heap': list(self._expiry_heap),
+            'counters': (self._counter_value('_seq'), self._counter_value('_powerup_ids'),
+                         self._counter_value('_effect_ids'))
+        }
+
+    def set_state(self, state):
+        self.active_powerups = {}
+        for powerup_id, p_type, x, y, duration, spawn_time in state['powerups']:
+            self.active_powerups[powerup_id] = PowerUp(p_type, x, y, duration, spawn_time, powerup_id)
+
+        self.collected_powerups = {}
+        for player_id, effect_id, e_type, expires_at in state['effects']:
+            self.collected_powerups.setdefault(player_id, {})[effect_id] = {
+                'type': e_type,
+                'expires_at': expires_at
+            }
+        self.player_stats = {}
+        for player_id in self.collected_powerups:
+            self._recompute_stats(player_id)
+
+        self._expiry_heap = list(state['heap'])  # already in heap order
+        seq, powerup_id, effect_id = state['counters']
+        self._seq = itertools.count(seq)
+        self._powerup_ids = itertools.count(powerup_id)
+        self._effect_ids = itertools.count(effect_id)
+
+    # ============================================================
+    # RECOMPUTE STATS
+    # ------------------------------------------------------------
+    # Folds all of a player's active effects into one cached set
+    # of modifiers. Runs only when an effect starts or ends.
+    # ============================================================
+    def _recompute_stats(self, player_id):
+        effects = self.collected_powerups.get(player_id)
+        if not effects:
+            self.player_stats.pop(player_id, None)
+            return
+
+        stats = dict(DEFAULT_STATS)
+        for effect in effects.values():
+            if effect['type'] == 'speed':
+                stats['speed_multiplier'] *= SPEED_MULTIPLIER
+            elif effect['type'] == 'invisibility':
+                stats['visible'] = False
+            elif effect['type'] == 'trap':
+                stats['trapped'] = True
+        self.player_stats[player_id] = stats
+
     # ============================================================
     # APPLY EFFECT
     # ------------------------------------------------------------
     # Helper to apply the active effect of a power-up to player stats.
     # For example, speed boost or invisibility logic.
+    # Writes the cached stats onto the player's state, always from
+    # the player's base speed, so calling it repeatedly is safe.
     # ============================================================
     def apply_effect(self, player_id, player_state):
-        if player_id not in self.collected_powerups:
-            return player_state
-
-        effect = self.collected_powerups[player_id]['type']
-
-        if effect == 'speed':
-            player_state['speed'] = player_state.get('speed', 5) * 1.5
-        elif effect == 'invisibility':
-            player_state['visible'] = False
-        elif effect == 'trap':
-            player_state['trapped'] = True
+        stats = self.player_stats.get(player_id, DEFAULT_STATS)
+        base_speed = player_state.setdefault('base_speed', player_state.get('speed', BASE_SPEED))
 
+        player_state['speed'] = base_speed * stats['speed_multiplier']
+        player_state['visible'] = stats['visible']
+        player_state['trapped'] = stats['trapped']
         return player_state
@@ -0,0 +1,302 @@
+# ================================================================
+# File: backend/game_logic/replay.py
+# Description:
+#   Compact match recording and server-side playback.
+#   A replay is the room's seed plus the input changes made on each
+#   tick, not a dump of states: MatchSimulation is deterministic,
+#   so re-feeding the same inputs reproduces the match exactly.
+#
+#   File layout (version 1):
+#     b"TJRP" | version (u8) | zlib( header | records )
+#     header : seed (u64) | tick_rate (u8) | duration (u16)
+#              | map name | player count (u8) | (role u8, id)*
+#     record : tick delta (varint) | op byte [| varint]
+#              op < 0xF0 -> input: player index (high nibble)
+#                                  + direction code (low nibble)
+#              0xFE      -> step size change, followed by varint
+#              0xFF      -> end of match
+#
+#   Recording only appends a few bytes to a bytearray; compression
+#   and disk writes happen on a background writer thread.
+# ================================================================
+
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+from backend.config import REPLAY_DIR
+from backend.game_logic.simulation import MatchSimulation, ROLES
+from backend.game_logic.levels import load_level
+
+# ================================================================
+# 1. FORMAT CONSTANTS & VARINT HELPERS
+# ================================================================
+MAGIC = b"TJRP"
+VERSION = 1
+OP_STEP = 0xFE
+OP_END = 0xFF
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos):
+    result, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(buf, text):
+    raw = text.encode("utf-8")
+    _write_varint(buf, len(raw))
+    buf.extend(raw)
+
+
+def _read_str(data, pos):
+    length, pos = _read_varint(data, pos)
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+# ================================================================
+# 2. REPLAY RECORDER CLASS
+# ------------------------------------------------
+# Attached to a MatchSimulation as `simulation.recorder`; the
+# simulation calls it whenever an input or the step size changes.
+# ================================================================
+class ReplayRecorder:
+    def __init__(self, simulation):
+        """
+        :param simulation: MatchSimulation to record (attaches itself).
+        """
+        self.seed = simulation.seed
+        self.tick_rate = simulation.tick_rate
+        self.duration = simulation.duration
+        self.map_name = simulation.map_name or ""
+        self.players = [(pid, role) for pid, role in simulation.roles.items()]
+        self.closed = False
+        self._records = bytearray()
+        self._last_tick = 0
+        simulation.recorder = self
+
+    def _tick(self, tick):
+        _write_varint(self._records, tick - self._last_tick)
+        self._last_tick = tick
+
+    def record_input(self, tick, player_index, code):
+        if self.closed:
+            return
+        self._tick(tick)
+        self._records.append((player_index << 4) | code)
+
+    def record_step(self, tick, steps):
+        if self.closed:
+            return
+        self._tick(tick)
+        self._records.append(OP_STEP)
+        _write_varint(self._records, steps)
+
+    def get_state(self):
+        """Records so far, for checkpoints (see checkpoint.py)."""
+        return {'records': bytes(self._records), 'last_tick': self._last_tick, 'closed': self.closed}
+
+    @classmethod
+    def from_state(cls, simulation, state):
+        """Re-attach a checkpointed recorder to a restored simulation."""
+        recorder = cls(simulation)
+        recorder._records = bytearray(state['records'])
+        recorder._last_tick = state['last_tick']
+        recorder.closed = state['closed']
+        return recorder
+
+    def close(self, tick):
+        """Mark the end of the match; no more records are accepted."""
+        if not self.closed:
+            self._tick(tick)
+            self._records.append(OP_END)
+            self.closed = True
+
+    def to_bytes(self):
+        """Encode the full replay (compresses; call off the hot path)."""
+        payload = bytearray(struct.pack("<QBH", self.seed, self.tick_rate, self.duration))
+        _write_str(payload, self.map_name)
+        payload.append(len(self.players))
+        for player_id, role in self.players:
+            payload.append(ROLES.index(role))
+            _write_str(payload, str(player_id))
+        payload.extend(self._records)
+        return MAGIC + bytes([VERSION]) + zlib.compress(bytes(payload), 9)
+
+
+# ================================================================
+# 3. DECODING
+# ================================================================
+def load_replay(data):
+    """
+    Decode replay bytes.
+    :return: (meta dict, list of (tick, op, value) records)
+    """
+    if data[:4] != MAGIC or data[4] != VERSION:
+        raise ValueError("Not a Tom & Jerry replay (or unsupported version)")
+    payload = zlib.decompress(data[5:])
+
+    seed, tick_rate, duration = struct.unpack_from("<QBH", payload, 0)
+    pos = struct.calcsize("<QBH")
+    map_name, pos = _read_str(payload, pos)
+    player_count = payload[pos]
+    pos += 1
+    players = []
+    for _ in range(player_count):
+        role = ROLES[payload[pos]]
+        player_id, pos = _read_str(payload, pos + 1)
+        players.append((player_id, role))
+
+    records, tick = [], 0
+    while pos < len(payload):
+        delta, pos = _read_varint(payload, pos)
+        tick += delta
+        op = payload[pos]
+        pos += 1
+        if op == OP_STEP:
+            steps, pos = _read_varint(payload, pos)
+            records.append((tick, OP_STEP, steps))
+        elif op == OP_END:
+            records.append((tick, OP_END, None))
+            break
+        else:
+            records.append((tick, op >> 4, op & 0x0F))
+
+    meta = {'seed': seed, 'tick_rate': tick_rate, 'duration': duration,
+            'map_name': map_name, 'players': players}
+    return meta, records
+
+
+# ================================================================
+# 4. PLAYBACK
+# ------------------------------------------------
+# Re-runs the match as fast as the CPU allows. `on_frame` gets a
+# snapshot every `frame_every` ticks (used for instant replay).
+# ================================================================
+def play_replay(data, level=None, on_frame=None, frame_every=1):
+    """
+    :param data: Replay bytes.
+    :param level: Level of the recorded map (loaded by name if omitted).
+    :return: The MatchSimulation in its final state.
+    """
+    meta, records = load_replay(data)
+    if level is None and meta['map_name']:
+        level = load_level(meta['map_name'])
+    simulation = MatchSimulation(
+        meta['seed'], dict(meta['players']), tick_rate=meta['tick_rate'],
+        duration=meta['duration'], map_name=meta['map_name'], level=level
+    )
+    player_ids = [pid for pid, _ in meta['players']]
+    steps, index, end_tick = 1, 0, None
+    next_frame = 0
+
+    while not simulation.finished:
+        while index < len(records) and records[index][0] <= simulation.tick:
+            _, op, value = records[index]
+            index += 1
+            if op == OP_STEP:
+                steps = value
+            elif op == OP_END:
+                end_tick = simulation.tick
+            else:
+                simulation.set_input(player_ids[op], value)
+
+        if end_tick is not None:
+            break
+        simulation.step(steps)
+
+        if on_frame is not None and simulation.tick >= next_frame:
+            on_frame(simulation.snapshot())
+            next_frame = simulation.tick + frame_every
+
+    return simulation
+
+
+def verify_replay(data, expected_winner, level=None):
+    """Re-simulate a match and check the recorded winner role."""
+    return play_replay(data, level=level).state['winner'] == expected_winner
+
+
+# ================================================================
+# 5. BACKGROUND REPLAY WRITER
+# ------------------------------------------------
+# Compresses and writes finished replays on a daemon thread so
+# the game loop never waits on zlib or the disk.
+# ================================================================
+class ReplayWriter:
+    def __init__(self, directory=REPLAY_DIR):
+        self.directory = directory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="replay-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, name, recorder):
+        """Queue a closed recorder; returns the path it will be written to."""
+        path = os.path.join(self.directory, f"{name}.tjr")
+        self._queue.put((path, recorder))
+        self._ensure_started()
+        return path
+
+    def flush(self):
+        """Block until every queued replay has been written."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            path, recorder = self._queue.get()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(recorder.to_bytes())
+                os.replace(tmp_path, path)
+                print(f"[ReplayWriter] 💾 Saved replay {path}")
+            except OSError as e:
+                print(f"[ReplayWriter] ⚠️ Failed to save replay {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+# ================================================================
+# 6. GLOBAL WRITER INSTANCE
+# ================================================================
+replay_writer = ReplayWriter()
+
+
+# ================================================================
+# 7. COMMAND LINE
+# ------------------------------------------------
+# python -m backend.game_logic.replay <file.tjr>
+# Re-simulates a saved match and prints the outcome.
+# ================================================================
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m backend.game_logic.replay <file.tjr>")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        replay_data = f.read()
+    result = play_replay(replay_data)
+    print(f"Replay size : {len(replay_data)} bytes")
+    print(f"Ticks       : {result.tick}")
+    print(f"Winner      : {result.state['winner']}")
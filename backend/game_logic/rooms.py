@@ -6,10 +6,26 @@
 #
 #   Each room can host multiple players (e.g., Tom vs Jerry),
 #   and tracks its own state such as players, scores, and readiness.
+#   Once started, a room drives a seeded MatchSimulation and records
+#   it as a compact replay.
+#
+#   Lifecycle deadlines (abandoned lobby, idle match, finished room)
+#   are kept in a min-heap so each cleanup sweep only touches rooms
+#   that are due, and chat history is a bounded ring.
 # ================================================================
 
+import heapq
+import itertools
 import uuid
 import time
+import secrets
+import threading
+from collections import deque
+
+from backend.config import Config
+from backend.game_logic.simulation import MatchSimulation, ROLES
+from backend.game_logic.replay import ReplayRecorder, replay_writer
+from backend.game_logic.levels import load_level
 
 # ================================================================
 # 1. ROOM CLASS
@@ -18,33 +34,45 @@ import time
 # Tracks players, scores, and room status.
 # ================================================================
 class Room:
-    def __init__(self, name, max_players=2):
+    def __init__(self, name, max_players=2, chat_limit=None, map_name=None):
         """
         Initialize a game room with a unique ID and optional name.
         :param name: Human-readable name (e.g. "House Arena")
         :param max_players: Maximum allowed players per room
+        :param chat_limit: Chat messages kept (Config.ROOM_CHAT_HISTORY)
+        :param map_name: Level played in this room (Config.DEFAULT_MAP)
         """
         self.id = str(uuid.uuid4())  # unique room ID
         self.name = name
+        self.map_name = map_name or Config.DEFAULT_MAP
         self.max_players = max_players
         self.players = {}
         self.created_at = time.time()
         self.started = False
         self.finished = False
         self.scoreboard = {}
-        self.chat_history = []
+        self.chat_history = deque(maxlen=chat_limit or Config.ROOM_CHAT_HISTORY)
+        self.last_activity = time.monotonic()
+        self.finished_at = None
+        self.seed = secrets.randbits(63)  # drives all randomness in the match
+        self.simulation = None
+        self.replay_path = None
 
-    def add_player(self, player_id, nickname):
-        """Add a player to this room if capacity allows."""
+    def add_player(self, player_id, nickname, role=None):
+        """Add a player to this room if capacity (and the role slot) allows."""
         if len(self.players) >= self.max_players:
             return False  # Room full
+        if role is not None and role not in self.open_roles():
+            return False  # Role already taken
 
         self.players[player_id] = {
             'nickname': nickname,
+            'role': role,
             'ready': False,
             'score': 0,
             'joined_at': time.time()
         }
+        self.touch()
         print(f"[Room] 👤 Player '{nickname}' joined room '{self.name}'.")
         return True
 
@@ -53,10 +81,30 @@ class Room:
         if player_id in self.players:
             player_name = self.players[player_id]['nickname']
             del self.players[player_id]
+            self.touch()
             print(f"[Room] ❌ Player '{player_name}' left room '{self.name}'.")
             return True
         return False
 
+    def touch(self):
+        """Record activity (joins, chat, inputs) for idle detection."""
+        self.last_activity = time.monotonic()
+
+    def deadline(self):
+        """Monotonic time at which this room should be cleaned up."""
+        if self.finished:
+            return self.finished_at + Config.ROOM_FINISHED_TTL_SECONDS
+        if self.started:
+            return self.last_activity + Config.ROOM_IDLE_SECONDS
+        return self.last_activity + Config.ROOM_ABANDON_SECONDS
+
+    def open_roles(self):
+        """Roles (Tom / Jerry) still free in this room."""
+        if self.started or len(self.players) >= self.max_players:
+            return []
+        taken = {p.get('role') for p in self.players.values()}
+        return [role for role in ROLES if role not in taken]
+
     def all_ready(self):
         """Check if all players in the room are ready to start."""
         return all(p['ready'] for p in self.players.values())
@@ -65,24 +113,104 @@ class Room:
         """Mark the room's game session as started."""
         if not self.started and self.all_ready():
             self.started = True
+            self.touch()
+            self.simulation = self.create_simulation()
+            ReplayRecorder(self.simulation)
             print(f"[Room] 🎮 Game started in room '{self.name}'.")
             return True
         return False
 
+    def create_simulation(self):
+        """Build the seeded simulation; roles default to join order."""
+        roles = {}
+        for index, (player_id, data) in enumerate(self.players.items()):
+            roles[player_id] = data.get('role') or ROLES[index % len(ROLES)]
+        # Levels are memory-mapped once and shared by every room on the map
+        return MatchSimulation(self.seed, roles, level=load_level(self.map_name))
+
     def end_game(self):
         """Mark the room as finished and record final scores."""
         self.finished = True
+        self.finished_at = time.monotonic()
+        self.touch()
+        if self.simulation is not None and self.simulation.recorder is not None:
+            # Hand the replay to the background writer (off the hot path)
+            self.simulation.recorder.close(self.simulation.tick)
+            self.replay_path = replay_writer.submit(self.id, self.simulation.recorder)
         self.scoreboard = {
             pid: data['score'] for pid, data in self.players.items()
         }
         print(f"[Room] 🏁 Game in room '{self.name}' has ended.")
         return self.scoreboard
 
+    def summary(self):
+        """Lobby listing entry for this room."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'players': len(self.players),
+            'max_players': self.max_players,
+            'started': self.started
+        }
+
+    def get_state(self, now=None):
+        """
+        Full room state as plain data for checkpoints / handoff.
+        Monotonic timestamps are stored as ages, since they mean
+        nothing in another process.
+        """
+        now = now if now is not None else time.monotonic()
+        simulation = self.simulation
+        return {
+            'id': self.id,
+            'name': self.name,
+            'map_name': self.map_name,
+            'max_players': self.max_players,
+            'players': {pid: dict(p) for pid, p in self.players.items()},
+            'created_at': self.created_at,
+            'started': self.started,
+            'finished': self.finished,
+            'scoreboard': dict(self.scoreboard),
+            'chat_limit': self.chat_history.maxlen,
+            'chat_history': list(self.chat_history),
+            'idle_for': now - self.last_activity,
+            'finished_for': now - self.finished_at if self.finished_at is not None else None,
+            'seed': self.seed,
+            'replay_path': self.replay_path,
+            'simulation': simulation.get_state() if simulation is not None else None,
+            'recorder': (simulation.recorder.get_state()
+                         if simulation is not None and simulation.recorder is not None else None)
+        }
+
+    @classmethod
+    def from_state(cls, data, now=None):
+        """Rebuild a room (and its running match) from get_state() output."""
+        now = now if now is not None else time.monotonic()
+        room = cls(data['name'], data['max_players'], data['chat_limit'], data['map_name'])
+        room.id = data['id']
+        room.players = data['players']
+        room.created_at = data['created_at']
+        room.started = data['started']
+        room.finished = data['finished']
+        room.scoreboard = data['scoreboard']
+        room.chat_history.extend(data['chat_history'])
+        room.last_activity = now - data['idle_for']
+        if data['finished_for'] is not None:
+            room.finished_at = now - data['finished_for']
+        room.seed = data['seed']
+        room.replay_path = data['replay_path']
+        if data['simulation'] is not None:
+            room.simulation = MatchSimulation.from_state(data['simulation'], level=load_level(room.map_name))
+            if data['recorder'] is not None:
+                ReplayRecorder.from_state(room.simulation, data['recorder'])
+        return room
+
     def add_chat(self, player_id, message):
-        """Append a chat message to the room history."""
+        """Append a chat message to the (bounded) room history."""
         nickname = self.players.get(player_id, {}).get('nickname', 'Unknown')
         msg = {'player': nickname, 'text': message, 'timestamp': time.time()}
         self.chat_history.append(msg)
+        self.touch()
         return msg
 
 
@@ -96,15 +224,70 @@ class RoomManager:
     def __init__(self):
         """Initialize the global room manager with a dict of active rooms."""
         self.rooms = {}
+        self.listeners = []
+        self.admission = None  # optional callable() -> bool (see tick_scheduler.py)
+        self.closer = None     # optional callable(room) ending an idle match (see tick_scheduler.py)
+        self._expiry_heap = []  # (wake_time, seq, room_id)
+        self._expiry_lock = threading.Lock()
+        self._seq = itertools.count()
+        # A room's deadline is never earlier than last_activity + this
+        self._min_ttl = min(Config.ROOM_IDLE_SECONDS, Config.ROOM_ABANDON_SECONDS,
+                            Config.ROOM_FINISHED_TTL_SECONDS)
+
+    def _schedule(self, room_id, wake_time):
+        with self._expiry_lock:
+            heapq.heappush(self._expiry_heap, (wake_time, next(self._seq), room_id))
+
+    def next_expiry(self):
+        """Monotonic time of the earliest expiry check (None if no rooms)."""
+        with self._expiry_lock:
+            return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    # ------------------------------------------------------------
+    # CHANGE LISTENERS
+    # ------------------------------------------------------------
+    def add_listener(self, callback):
+        """
+        Register callback(event, room) for room changes.
+        event is one of 'created', 'changed', 'removed'.
+        """
+        self.listeners.append(callback)
+
+    def _notify(self, event, room):
+        for callback in self.listeners:
+            callback(event, room)
 
     # ------------------------------------------------------------
     # CREATE ROOM
     # ------------------------------------------------------------
-    def create_room(self, name=None, max_players=2):
-        """Create a new room and return its data."""
-        room = Room(name or f"Room-{len(self.rooms)+1}", max_players)
+    def create_room(self, name=None, max_players=2, map_name=None):
+        """Create a new room and return it (None if the worker is overloaded)."""
+        if self.admission is not None and not self.admission():
+            print("[RoomManager] 🚦 Refusing new room (tick budget exceeded).")
+            return None
+        room = Room(name or f"Room-{len(self.rooms)+1}", max_players, map_name=map_name)
         self.rooms[room.id] = room
+        self._schedule(room.id, room.last_activity + self._min_ttl)
         print(f"[RoomManager] 🏠 Created new room: {room.name} (ID: {room.id})")
+        self._notify('created', room)
+        return room
+
+    # ------------------------------------------------------------
+    # ADOPT / RELEASE ROOMS (checkpoint handoff)
+    # ------------------------------------------------------------
+    def adopt_room(self, room):
+        """Take over a room restored from another worker's checkpoint."""
+        self.rooms[room.id] = room
+        self._schedule(room.id, min(room.deadline(), time.monotonic() + self._min_ttl))
+        print(f"[RoomManager] 📥 Resumed room: {room.name} (ID: {room.id})")
+        self._notify('created', room)
+        return room
+
+    def release_room(self, room_id):
+        """Drop a room that was handed off, without ending its match."""
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            self._notify('removed', room)
         return room
 
     # ------------------------------------------------------------
@@ -117,14 +300,15 @@ class RoomManager:
     # ------------------------------------------------------------
     # JOIN ROOM
     # ------------------------------------------------------------
-    def join_room(self, room_id, player_id, nickname):
+    def join_room(self, room_id, player_id, nickname, role=None):
         """Add a player to an existing room."""
         room = self.get_room(room_id)
         if not room:
             print(f"[RoomManager] ⚠️ Room with ID {room_id} not found.")
             return None
 
-        if room.add_player(player_id, nickname):
+        if room.add_player(player_id, nickname, role):
+            self._notify('changed', room)
             return room
         else:
             print(f"[RoomManager] 🚫 Failed to add {nickname} (room full).")
@@ -144,34 +328,80 @@ class RoomManager:
         if success and not room.players:
             print(f"[RoomManager] 🧹 Removing empty room '{room.name}'.")
             del self.rooms[room_id]
+            self._notify('removed', room)
+        elif success:
+            self._notify('changed', room)
         return success
 
+    # ------------------------------------------------------------
+    # START GAME
+    # ------------------------------------------------------------
+    def start_game(self, room_id):
+        """Start a room's match once everyone is ready."""
+        room = self.get_room(room_id)
+        if room is None or not room.start_game():
+            return False
+        self._notify('changed', room)  # lets the tick scheduler pick it up
+        return True
+
     # ------------------------------------------------------------
     # UPDATE ROOM STATES
     # ------------------------------------------------------------
-    def update_rooms(self):
-        """Periodic cleanup of finished or inactive rooms."""
-        now = time.time()
-        expired = [
-            rid for rid, room in self.rooms.items()
-            if room.finished and (now - room.created_at) > 300
-        ]
-        for rid in expired:
-            print(f"[RoomManager] ⏳ Removing old finished room: {self.rooms[rid].name}")
+    def update_rooms(self, now=None):
+        """
+        Periodic cleanup of abandoned, idle and finished rooms.
+        Only pops heap entries that are due. An entry that wakes
+        up early (the room saw activity) is re-queued no later than
+        now + the shortest TTL, so a later state change can never
+        make a room's real deadline earlier than its heap entry.
+        The tick scheduler calls this at next_expiry().
+        """
+        now = now if now is not None else time.monotonic()
+        removed = []
+
+        with self._expiry_lock:
+            due_ids = []
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                due_ids.append(heapq.heappop(self._expiry_heap)[2])
+
+        for rid in due_ids:
+            room = self.rooms.get(rid)
+            if room is None:
+                continue  # Already removed (e.g. emptied)
+
+            due = room.deadline()
+            if due > now:
+                self._schedule(rid, min(due, now + self._min_ttl))
+                continue
+
+            if room.finished:
+                reason = "finished"
+            elif room.started:
+                reason = "idle"
+                # Close the match (flushes the replay)
+                if self.closer is not None:
+                    self.closer(room)
+                else:
+                    room.end_game()
+            else:
+                reason = "abandoned"
+            print(f"[RoomManager] ⏳ Removing {reason} room: {room.name}")
             del self.rooms[rid]
+            self._notify('removed', room)
+            removed.append(rid)
+        return removed
 
     # ------------------------------------------------------------
     # GET ALL ROOMS (LISTING)
     # ------------------------------------------------------------
     def list_rooms(self):
         """Return summary info for all active rooms."""
-        return [
-            {
-                'id': r.id,
-                'name': r.name,
-                'players': len(r.players),
-                'max_players': r.max_players,
-                'started': r.started
-            }
-            for r in self.rooms.values()
-        ]
+        return [r.summary() for r in list(self.rooms.values())]
+
+
+# ================================================================
+# 3. GLOBAL ROOM MANAGER INSTANCE
+# ------------------------------------------------
+# Shared by socket handlers and the matchmaker on this worker.
+# ================================================================
+room_manager = RoomManager()
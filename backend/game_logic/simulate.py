@@ -0,0 +1,195 @@
+# ================================================================
+# File: backend/game_logic/simulate.py
+# Description:
+#   Headless mass-simulation runner for balance tuning.
+#   Plays AI-vs-AI matches with MatchSimulation as fast as the CPU
+#   allows: time is the simulation's tick counter, never the wall
+#   clock, so a 30 second match takes a few milliseconds. Matches
+#   are split into batches and spread over a process pool; each
+#   worker returns partial statistics that are merged at the end.
+#
+#   Usage:
+#     python -m backend.game_logic.simulate --matches 10000 \
+#         --map house --catch-radius 30 --output stats.json
+# ================================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backend.config import Config
+from backend.game_logic.levels import load_level
+from backend.game_logic.simulation import MatchSimulation, CATCH_RADIUS
+from backend.game_logic.powerups import BASE_SPEED, SPAWN_CHANCE
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Matches per task sent to a worker: large enough to amortize
+# process round trips, small enough to balance load across cores.
+# ================================================================
+DEFAULT_BATCH_SIZE = 200
+PERCENTILES = (10, 50, 90)
+
+
+# ================================================================
+# 2. SINGLE MATCH
+# ================================================================
+def run_match(seed, settings):
+    """
+    Play one AI-vs-AI match to the end.
+    :param seed: Match seed (same seed + settings -> same result).
+    :param settings: Dict of match settings (see build_settings).
+    :return: Dict with winner role, duration (simulated seconds) and pickups.
+    """
+    level = load_level(settings['map']) if settings['map'] else None
+    simulation = MatchSimulation(
+        seed, {'tom': 'tom', 'jerry': 'jerry'},
+        tick_rate=settings['tick_rate'], duration=settings['duration'], level=level,
+        catch_radius=settings['catch_radius'], base_speed=settings['base_speed'],
+        spawn_chance=settings['spawn_chance'], verbose=False
+    )
+    # Deterministic AI: hard lookahead must not depend on CPU speed or load
+    simulation.add_ai('tom', 'jerry', difficulty=settings['tom_difficulty'], deterministic=True)
+    simulation.add_ai('jerry', 'tom', difficulty=settings['jerry_difficulty'], deterministic=True)
+
+    pickups = {'tom': 0, 'jerry': 0}
+    while not simulation.finished:
+        for event in simulation.step():
+            if event['type'] == 'pickup':
+                pickups[event['player_id']] += 1
+
+    return {'winner': simulation.state['winner'], 'duration': simulation.time(), 'pickups': pickups}
+
+
+# ================================================================
+# 3. WORKER BATCH
+# ------------------------------------------------
+# Runs in a pool process. Returns compact partial stats so only a
+# few numbers per match cross the process boundary.
+# ================================================================
+def run_batch(seeds, settings):
+    wins = {'tom': 0, 'jerry': 0}
+    pickups = {'tom': 0, 'jerry': 0}
+    catch_times = []
+    ticks = 0
+
+    for seed in seeds:
+        result = run_match(seed, settings)
+        wins[result['winner']] += 1
+        for role, count in result['pickups'].items():
+            pickups[role] += count
+        if result['winner'] == 'tom':
+            catch_times.append(result['duration'])
+        ticks += round(result['duration'] * settings['tick_rate'])
+
+    return {'matches': len(seeds), 'wins': wins, 'pickups': pickups,
+            'catch_times': catch_times, 'ticks': ticks}
+
+
+# ================================================================
+# 4. AGGREGATION
+# ================================================================
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return round(sorted_values[index], 3)
+
+
+def merge_results(partials, settings, elapsed):
+    """Combine worker partials into the final statistics dict."""
+    matches = sum(p['matches'] for p in partials)
+    wins = {role: sum(p['wins'][role] for p in partials) for role in ('tom', 'jerry')}
+    pickups = {role: sum(p['pickups'][role] for p in partials) for role in ('tom', 'jerry')}
+    catch_times = sorted(t for p in partials for t in p['catch_times'])
+    ticks = sum(p['ticks'] for p in partials)
+    simulated_seconds = ticks / settings['tick_rate']
+
+    return {
+        'settings': settings,
+        'matches': matches,
+        'wins': wins,
+        'win_rate': {role: round(wins[role] / matches, 4) if matches else 0.0 for role in wins},
+        'pickups_per_match': {role: round(pickups[role] / matches, 3) if matches else 0.0 for role in pickups},
+        'catch_time': {
+            'mean': round(sum(catch_times) / len(catch_times), 3) if catch_times else None,
+            **{f"p{pct}": _percentile(catch_times, pct) for pct in PERCENTILES}
+        },
+        'simulated_seconds': round(simulated_seconds, 1),
+        'wall_seconds': round(elapsed, 2),
+        'matches_per_second': round(matches / elapsed, 1) if elapsed else None
+    }
+
+
+# ================================================================
+# 5. RUNNER
+# ================================================================
+def build_settings(args):
+    return {
+        'map': args.map,
+        'tick_rate': args.tick_rate or Config.SIM_TICK_RATE,
+        'duration': args.duration or Config.MATCH_DURATION_SECONDS,
+        'catch_radius': args.catch_radius,
+        'base_speed': args.base_speed,
+        'spawn_chance': args.spawn_chance,
+        'tom_difficulty': args.tom_difficulty,
+        'jerry_difficulty': args.jerry_difficulty
+    }
+
+
+def run_simulations(matches, settings, workers=None, seed=0, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run `matches` matches (seeds seed .. seed + matches - 1) on a process pool.
+    :return: Aggregated statistics dict.
+    """
+    if settings['map']:
+        load_level(settings['map'])  # compile once here, not in every worker
+
+    seeds = range(seed, seed + matches)
+    batches = [list(seeds[i:i + batch_size]) for i in range(0, matches, batch_size)]
+    started = time.perf_counter()
+
+    partials = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_batch, batch, settings) for batch in batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            partials.append(future.result())
+            print(f"[Simulate] ⏱️ {done}/{len(batches)} batches done", file=sys.stderr)
+
+    return merge_results(partials, settings, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI matches and report outcome statistics.")
+    parser.add_argument("--matches", type=int, default=1000, help="number of matches to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="first match seed")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="matches per worker task")
+    parser.add_argument("--map", default=Config.DEFAULT_MAP, help="level name ('' for an open arena)")
+    parser.add_argument("--tick-rate", type=int, help="simulation ticks per second")
+    parser.add_argument("--duration", type=int, help="match length in seconds")
+    parser.add_argument("--catch-radius", type=float, default=CATCH_RADIUS)
+    parser.add_argument("--base-speed", type=float, default=BASE_SPEED)
+    parser.add_argument("--spawn-chance", type=float, default=SPAWN_CHANCE, help="power-up spawn chance per tick")
+    parser.add_argument("--tom-difficulty", default="normal", choices=("normal", "hard"))
+    parser.add_argument("--jerry-difficulty", default="normal", choices=("normal", "hard"))
+    parser.add_argument("--output", help="write the statistics JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    stats = run_simulations(args.matches, build_settings(args), workers=args.workers,
+                            seed=args.seed, batch_size=args.batch_size)
+    report = json.dumps(stats, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+        print(f"[Simulate] 📊 Wrote statistics for {stats['matches']} matches to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
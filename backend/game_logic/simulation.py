@@ -0,0 +1,355 @@
+# ================================================================
+# File: backend/game_logic/simulation.py
+# Description:
+#   Deterministic, tick-based match simulation for one room.
+#   All randomness comes from a random.Random seeded per room and
+#   all timing from the tick counter, so the same seed plus the
+#   same per-tick inputs always produce the same match. This is
+#   what makes compact replays (see replay.py) possible.
+#
+#   Inputs are direction codes (physics.DIRECTION_VECTORS).
+#   AI characters feed the simulation through the same input path
+#   as humans, so replays never need to re-run the AI.
+# ================================================================
+
+import math
+import random
+from array import array
+
+from backend.config import Config
+from backend.game_logic.physics import WORLD_BOUNDS, DIRECTION_VECTORS, direction_code, move_in_direction
+from backend.game_logic.collision import (
+    swept_players_collide, swept_item_collision, sweep_wall_collision, PLAYER_RADIUS
+)
+from backend.game_logic.powerups import PowerUpManager, BASE_SPEED, SPAWN_CHANCE
+from backend.game_logic.ai_controller import AIController
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Speeds (px per tick) are tuned for REFERENCE_TICK_RATE; other
+# tick rates scale movement so real-world speed stays the same.
+# ================================================================
+REFERENCE_TICK_RATE = 30
+ROLES = ('tom', 'jerry')
+ITEM_RADIUS = 20
+CATCH_RADIUS = 25
+# AI keeps its current heading while the plan is within this angle
+# of it, instead of zig-zagging between neighbouring direction codes
+# (which would also defeat dead reckoning, see dead_reckoning.py).
+AI_HEADING_TOLERANCE = math.cos(math.radians(35))
+
+
+def pack_rng_state(rng):
+    """random.Random state with its 625 words packed into bytes (checkpoints)."""
+    version, internal, gauss_next = rng.getstate()
+    return version, array('I', internal).tobytes(), gauss_next
+
+
+def unpack_rng_state(rng, packed):
+    version, raw, gauss_next = packed
+    rng.setstate((version, tuple(array('I', raw)), gauss_next))
+
+
+# ================================================================
+# 2. MATCH SIMULATION CLASS
+# ------------------------------------------------
+# Owns the full state of one match: players, power-ups, the seeded
+# RNG and the tick counter.
+# ================================================================
+class MatchSimulation:
+    def __init__(self, seed, players, tick_rate=None, nav_grid=None, spawns=None,
+                 duration=None, map_name="", level=None, catch_radius=CATCH_RADIUS,
+                 base_speed=BASE_SPEED, spawn_chance=SPAWN_CHANCE, verbose=True):
+        """
+        Initialize the simulation.
+        :param seed: Integer seed for every random decision in the match.
+        :param players: Ordered dict of player_id -> role ('tom' / 'jerry').
+        :param tick_rate: Simulation ticks per second (Config default).
+        :param nav_grid: Optional NavGrid for walls and map bounds.
+        :param spawns: Optional dict role -> (x, y) spawn point.
+        :param duration: Match length in seconds (Config default).
+        :param map_name: Name of the map, stored in replays.
+        :param level: Optional compiled Level; provides walls, nav grid,
+                      bounds, spawns and the map name.
+        :param catch_radius, base_speed, spawn_chance: Balance knobs for
+                      offline tuning (replays assume the defaults).
+        :param verbose: Log power-up events (off for headless runs).
+        """
+        if level is not None:
+            nav_grid = level.nav_grid
+            spawns = spawns or level.spawns
+            map_name = level.name
+
+        self.seed = seed
+        self.tick_rate = tick_rate or Config.SIM_TICK_RATE
+        self.duration = duration or Config.MATCH_DURATION_SECONDS
+        self.level = level
+        self.nav_grid = nav_grid
+        self.circle_in_wall = None  # faster player-circle test, when the level has one
+        if level is not None:
+            self.is_wall = level.is_wall
+            self.circle_in_wall = level.circle_tester(PLAYER_RADIUS)
+        elif nav_grid is not None:
+            self.is_wall = nav_grid.is_blocked_at
+        else:
+            self.is_wall = None
+        self.map_name = map_name
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.speed_scale = REFERENCE_TICK_RATE / self.tick_rate
+        self.catch_radius = catch_radius
+        self.end_tick = self.duration * self.tick_rate
+
+        if nav_grid is not None:
+            self.bounds = {'x_min': nav_grid.x_min, 'x_max': nav_grid.x_max,
+                           'y_min': nav_grid.y_min, 'y_max': nav_grid.y_max}
+        else:
+            self.bounds = dict(WORLD_BOUNDS)
+
+        spawns = {**self.default_spawns(), **(spawns or {})}
+        self.roles = dict(players)
+        self.state = {
+            'players': {},
+            'scores': {},
+            'status': 'running',
+            'winner': None
+        }
+        for player_id, role in self.roles.items():
+            x, y = spawns[role]
+            self.state['players'][player_id] = {
+                'x': float(x), 'y': float(y), 'role': role,
+                'base_speed': base_speed, 'speed': base_speed,
+                'visible': True, 'trapped': False, 'direction': 0,
+                'vx': 0.0, 'vy': 0.0  # px per simulated second, for dead reckoning
+            }
+
+        self.inputs = {player_id: 0 for player_id in self.roles}
+        self.player_index = {player_id: i for i, player_id in enumerate(self.roles)}
+        self.powerups = PowerUpManager(self.state, clock=self.time, rng=self.rng,
+                                       spawn_chance=spawn_chance, verbose=verbose)
+        self.ai_agents = []
+        self.scheduled_ai = {}  # ai_id -> (target_id, difficulty), planned by an AIScheduler
+        self.recorder = None
+        self._last_steps = 1
+
+    # ------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------
+    def default_spawns(self):
+        """Tom in the top-left, Jerry in the bottom-right corner."""
+        b = self.bounds
+        width, height = b['x_max'] - b['x_min'], b['y_max'] - b['y_min']
+        return {
+            'tom': (b['x_min'] + width * 0.1, b['y_min'] + height * 0.1),
+            'jerry': (b['x_min'] + width * 0.9, b['y_min'] + height * 0.9)
+        }
+
+    def time(self):
+        """Simulated seconds since the match started."""
+        return self.tick / self.tick_rate
+
+    @property
+    def finished(self):
+        return self.state['status'] == 'finished'
+
+    # ------------------------------------------------------------
+    # INPUTS
+    # ------------------------------------------------------------
+    def set_input(self, player_id, code):
+        """Set a player's direction code (0..8) from the next step on."""
+        if player_id not in self.inputs or not 0 <= code <= 8:
+            return False
+        if self.inputs[player_id] != code:
+            self.inputs[player_id] = code
+            if self.recorder is not None:
+                self.recorder.record_input(self.tick, self.player_index[player_id], code)
+        return True
+
+    def set_ai_direction(self, player_id, direction):
+        """AI sink: quantize a planned (dx, dy) vector into an input."""
+        dx, dy = direction
+        current = self.inputs.get(player_id)
+        if current:
+            length = math.hypot(dx, dy)
+            cx, cy = DIRECTION_VECTORS[current]
+            if length and (dx * cx + dy * cy) / length >= AI_HEADING_TOLERANCE:
+                return  # close enough to the current heading
+        self.set_input(player_id, direction_code(dx, dy))
+
+    def add_ai(self, ai_id, target_id, difficulty="normal", scheduler=None, room_id=None, sink=None,
+               deterministic=False):
+        """
+        Let an AIController drive one of the players.
+        With a scheduler (AIScheduler) planning is batched across rooms;
+        otherwise the simulation plans the AI itself every step.
+        :param sink: Receives scheduler decisions (defaults to
+                     set_ai_direction; room actors pass a message sender).
+        :param deterministic: Plan without wall-clock budgets (see
+                              AIController), for reproducible matches.
+        """
+        flow_fields = self.level.flow_fields if self.level is not None else None
+        controller = AIController(self.state, role=self.roles[ai_id], nav_grid=self.nav_grid,
+                                  flow_fields=flow_fields, difficulty=difficulty,
+                                  rng=random.Random(self.seed + 1), deterministic=deterministic)
+        if scheduler is not None:
+            # Kept in the checkpoint so a resumed room can re-attach it
+            self.scheduled_ai[ai_id] = (target_id, difficulty)
+            return scheduler.add_agent(room_id, controller, ai_id, target_id, sink=sink or self.set_ai_direction)
+        self.ai_agents.append((controller, ai_id, target_id))
+        return controller
+
+    # ------------------------------------------------------------
+    # STEP
+    # ------------------------------------------------------------
+    def step(self, steps=1):
+        """
+        Advance the match by `steps` ticks in one go.
+        :return: List of event dicts (pickups, expiries, catch, timeout).
+        """
+        if self.finished:
+            return []
+
+        if self.recorder is not None and steps != self._last_steps:
+            self.recorder.record_step(self.tick, steps)
+        self._last_steps = steps
+
+        players = self.state['players']
+        for controller, ai_id, target_id in self.ai_agents:
+            direction = controller.plan_direction(players[ai_id], players[target_id])
+            self.set_ai_direction(ai_id, direction)
+
+        events = []
+        scale = self.speed_scale * steps
+        dt = steps / self.tick_rate
+
+        # Movement (collisions below are swept over start -> end of the
+        # step, so nothing tunnels through at low tick rates)
+        starts = {}
+        for player_id, player in players.items():
+            self.powerups.apply_effect(player_id, player)
+            starts[player_id] = {'x': player['x'], 'y': player['y']}
+            code = self.inputs[player_id]
+            player['direction'] = code
+            if not code or player['trapped']:
+                player['vx'] = player['vy'] = 0.0
+                continue
+            move_in_direction(player, code, player['speed'] * scale, self.bounds)
+            if self.is_wall is not None:
+                sweep_wall_collision(player, self.is_wall, starts[player_id]['x'], starts[player_id]['y'],
+                                     circle_test=self.circle_in_wall)
+            # Actual velocity, so walls and map edges show up as a change
+            player['vx'] = (player['x'] - starts[player_id]['x']) / dt
+            player['vy'] = (player['y'] - starts[player_id]['y']) / dt
+
+        # Power-up pickups
+        items = [
+            {'id': p.id, 'x': p.x, 'y': p.y, 'radius': ITEM_RADIUS}
+            for p in self.powerups.active_powerups.values()
+        ]
+        for player_id, player in players.items():
+            item_id = swept_item_collision(starts[player_id], player, items) if items else None
+            if item_id is not None:
+                events.append({'type': 'pickup', **self.powerups.collect_powerup(player_id, item_id)})
+                items = [item for item in items if item['id'] != item_id]
+
+        # Tom catching Jerry
+        toms = [pid for pid, role in self.roles.items() if role == 'tom']
+        jerries = [pid for pid, role in self.roles.items() if role == 'jerry']
+        for tom_id in toms:
+            for jerry_id in jerries:
+                if swept_players_collide(starts[tom_id], players[tom_id],
+                                         starts[jerry_id], players[jerry_id], self.catch_radius) is not None:
+                    self._finish('tom')
+                    events.append({'type': 'catch', 'tom': tom_id, 'jerry': jerry_id})
+
+        self.tick += steps
+        for player_id in self.powerups.update():
+            events.append({'type': 'effect_expired', 'player_id': player_id})
+
+        if not self.finished and self.tick >= self.end_tick:
+            self._finish('jerry')
+            events.append({'type': 'timeout'})
+        return events
+
+    def _finish(self, winner_role):
+        if self.finished:
+            return
+        self.state['status'] = 'finished'
+        self.state['winner'] = winner_role
+
+    # ------------------------------------------------------------
+    # CHECKPOINT
+    # ------------------------------------------------------------
+    # Full state as plain data (dicts, lists, tuples, numbers,
+    # strings) so it can be marshalled; see checkpoint.py. The
+    # replay recorder and scheduler-driven AI are not included.
+    # ------------------------------------------------------------
+    def get_state(self):
+        return {
+            'seed': self.seed,
+            'roles': list(self.roles.items()),
+            'tick_rate': self.tick_rate,
+            'duration': self.duration,
+            'map_name': self.map_name,
+            'catch_radius': self.catch_radius,
+            'spawn_chance': self.powerups.spawn_chance,
+            'verbose': self.powerups.verbose,
+            'tick': self.tick,
+            'state': {
+                'players': {pid: dict(p) for pid, p in self.state['players'].items()},
+                'scores': dict(self.state['scores']),
+                'status': self.state['status'],
+                'winner': self.state['winner']
+            },
+            'inputs': dict(self.inputs),
+            'rng': pack_rng_state(self.rng),
+            'powerups': self.powerups.get_state(),
+            'ai_agents': [(ai_id, target_id, controller.difficulty, pack_rng_state(controller.rng))
+                          for controller, ai_id, target_id in self.ai_agents],
+            'scheduled_ai': dict(self.scheduled_ai),
+            'last_steps': self._last_steps
+        }
+
+    @classmethod
+    def from_state(cls, data, level=None):
+        """Rebuild a simulation from get_state() output."""
+        simulation = cls(
+            data['seed'], dict(data['roles']), tick_rate=data['tick_rate'],
+            duration=data['duration'], map_name=data['map_name'], level=level,
+            catch_radius=data['catch_radius'], spawn_chance=data['spawn_chance'],
+            verbose=data['verbose']
+        )
+        simulation.tick = data['tick']
+        simulation.state.update(data['state'])  # same dict the power-ups and AI hold
+        simulation.inputs.update(data['inputs'])
+        unpack_rng_state(simulation.rng, data['rng'])
+        simulation.powerups.set_state(data['powerups'])
+        for ai_id, target_id, difficulty, rng_state in data['ai_agents']:
+            unpack_rng_state(simulation.add_ai(ai_id, target_id, difficulty).rng, rng_state)
+        # Re-attached to the new worker's AIScheduler once the room is adopted
+        simulation.scheduled_ai = {ai_id: tuple(entry)
+                                   for ai_id, entry in data.get('scheduled_ai', {}).items()}
+        simulation._last_steps = data['last_steps']
+        return simulation
+
+    # ------------------------------------------------------------
+    # SNAPSHOT
+    # ------------------------------------------------------------
+    def snapshot(self):
+        """Plain-dict view of the current state for broadcasting."""
+        return {
+            'tick': self.tick,
+            'time': self.time(),
+            'players': {
+                pid: {'x': p['x'], 'y': p['y'], 'vx': p['vx'], 'vy': p['vy'],
+                      'role': p['role'], 'visible': p['visible']}
+                for pid, p in self.state['players'].items()
+            },
+            'powerups': [
+                {'id': p.id, 'type': p.type, 'x': p.x, 'y': p.y}
+                for p in self.powerups.active_powerups.values()
+            ],
+            'status': self.state['status'],
+            'winner': self.state['winner']
+        }
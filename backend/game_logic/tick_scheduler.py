@@ -0,0 +1,232 @@
+# ================================================================
+# File: backend/game_logic/tick_scheduler.py
+# Description:
+#   Drives every running match on this worker at its own rate.
+#   A room ticks every `steps` base ticks (SIM_TICK_RATE / steps Hz)
+#   and advances its simulation by `steps` at once, so slower rooms
+#   stay in sync with real time. Swept collisions (collision.py)
+#   keep large steps correct; replays record step changes.
+#     - close chase            -> full rate (1 step)
+#     - players mid-distance   -> half rate
+#     - far apart / no input   -> TICK_MIN_RATE
+#
+#   Tick cost is measured inside the room actors and summed over a
+#   sliding window. When it exceeds the worker budget, every room's
+#   step grows in proportion (latency degrades evenly instead of
+#   the worker falling behind), and new rooms are refused so the
+#   matchmaker can send players elsewhere.
+#
+#   The same thread runs RoomManager.update_rooms at the room
+#   manager's next expiry deadline, and ends idle matches through
+#   their actor so closing never races a tick.
+# ================================================================
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+
+from backend.config import Config
+from backend.game_logic.rooms import room_manager as default_room_manager
+from backend.game_logic.actors import room_actors as default_room_actors
+
+# ================================================================
+# 1. CONSTANTS
+# ------------------------------------------------
+# Tick cost is averaged over LOAD_WINDOW seconds; rooms are refused
+# until the load drops back below the budget.
+# ================================================================
+LOAD_WINDOW = 1.0
+# Longest sleep between expiry checks; catches deadlines queued
+# (earlier than the one being waited for) while the thread sleeps.
+EXPIRY_CHECK_INTERVAL = 1.0
+# How long to wait for an actor to end an idle match
+CLOSE_TIMEOUT = 5.0
+
+
+# ================================================================
+# 2. TICK SCHEDULER CLASS
+# ------------------------------------------------
+# One background thread pops rooms from a min-heap ordered by due
+# time and sends their actor a 'tick' message. A room never has
+# more than one tick in flight.
+# ================================================================
+class TickScheduler:
+    def __init__(self, room_manager=default_room_manager, actors=default_room_actors,
+                 base_rate=None, min_rate=None, cpu_budget=None):
+        """
+        Initialize the scheduler. Unset values fall back to Config.
+        :param room_manager: RoomManager whose matches are ticked.
+        :param actors: ActorSystem that owns the rooms' state.
+        :param base_rate: Full simulation rate in Hz (SIM_TICK_RATE).
+        :param min_rate: Slowest rate for a running match (TICK_MIN_RATE).
+        :param cpu_budget: Share of one core that ticks may use (TICK_CPU_BUDGET).
+        """
+        self.room_manager = room_manager
+        self.actors = actors
+        self.base_rate = base_rate or Config.SIM_TICK_RATE
+        self.max_steps = max(1, self.base_rate // (min_rate or Config.TICK_MIN_RATE))
+        self.cpu_budget = cpu_budget if cpu_budget is not None else Config.TICK_CPU_BUDGET
+
+        self._heap = []             # (due_time, seq, room_id)
+        self._seq = itertools.count()
+        self._scheduled = set()     # rooms with a heap entry
+        self._in_flight = set()     # rooms whose tick the actor has not finished
+        self._costs = deque()       # (finished_at, seconds)
+        self._cost_total = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+        room_manager.add_listener(self._on_room_event)
+        room_manager.admission = self.admit
+        room_manager.closer = self.close_room
+
+    # ------------------------------------------------------------
+    # ROOM REGISTRATION
+    # ------------------------------------------------------------
+    def _on_room_event(self, event, room):
+        # Started (or resumed) matches get scheduled; removed rooms
+        # are dropped lazily when their entry comes up.
+        if event != 'removed' and room.simulation is not None and not room.finished:
+            self.schedule(room.id)
+
+    def schedule(self, room_id, due=None):
+        with self._cond:
+            if room_id in self._scheduled:
+                return
+            self._scheduled.add(room_id)
+            heapq.heappush(self._heap, (due if due is not None else time.monotonic(),
+                                        next(self._seq), room_id))
+            self._cond.notify()
+
+    # ------------------------------------------------------------
+    # LOAD TRACKING & ADMISSION
+    # ------------------------------------------------------------
+    def record_cost(self, seconds):
+        """Called by room actors with the CPU time a tick took."""
+        with self._cond:
+            self._costs.append((time.monotonic(), seconds))
+            self._cost_total += seconds
+
+    def load(self, now=None):
+        """Share of one core spent ticking over the last LOAD_WINDOW."""
+        now = now if now is not None else time.monotonic()
+        with self._cond:
+            while self._costs and self._costs[0][0] < now - LOAD_WINDOW:
+                self._cost_total -= self._costs.popleft()[1]
+            return max(0.0, self._cost_total) / LOAD_WINDOW
+
+    def admit(self):
+        """Admission check for RoomManager.create_room."""
+        return self.load() < self.cpu_budget
+
+    def close_room(self, room):
+        """Closer for RoomManager.update_rooms: end the match on its actor."""
+        try:
+            self.actors.ask(room.id, 'end_game').result(timeout=CLOSE_TIMEOUT)
+        except Exception as e:
+            print(f"[TickScheduler] ⚠️ Could not end idle match in room {room.id}: {e}")
+
+    # ------------------------------------------------------------
+    # RATE SELECTION
+    # ------------------------------------------------------------
+    def steps_for(self, room, now, load):
+        """Base ticks to advance this room per scheduler tick."""
+        match = self.actors.snapshot(room.id)['match']
+        if now - room.last_activity > Config.TICK_IDLE_SECONDS or match is None:
+            steps = self.max_steps
+        else:
+            players = match['players'].values()
+            toms = [p for p in players if p['role'] == 'tom']
+            jerries = [p for p in players if p['role'] == 'jerry']
+            distance = min((math.hypot(t['x'] - j['x'], t['y'] - j['y']) for t in toms for j in jerries),
+                           default=0.0)
+            if distance < Config.TICK_NEAR_DISTANCE:
+                steps = 1
+            elif distance < Config.TICK_FAR_DISTANCE:
+                steps = 2
+            else:
+                steps = self.max_steps
+
+        if load > self.cpu_budget:
+            # Overloaded: slow every room down by the same factor
+            steps = math.ceil(steps * load / self.cpu_budget)
+        return max(1, min(steps, self.max_steps))
+
+    # ------------------------------------------------------------
+    # MAIN LOOP
+    # ------------------------------------------------------------
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="tick-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop ticking (worker drain). Ticks already sent still finish on their actors."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _next_wake(self, now):
+        # Earliest of: next room tick, next room expiry, the check interval
+        wake = now + EXPIRY_CHECK_INTERVAL
+        if self._heap:
+            wake = min(wake, self._heap[0][0])
+        expiry = self.room_manager.next_expiry()
+        return min(wake, expiry) if expiry is not None else wake
+
+    def _run(self):
+        while True:
+            room_id = None
+            with self._cond:
+                now = time.monotonic()
+                wake = self._next_wake(now)
+                if wake > now and not self._stopping:
+                    self._cond.wait(wake - now)
+                    now = time.monotonic()
+                if self._stopping:
+                    return
+                if self._heap and self._heap[0][0] <= now:
+                    due, _, room_id = heapq.heappop(self._heap)
+                    self._scheduled.discard(room_id)
+
+            expiry = self.room_manager.next_expiry()
+            if expiry is not None and expiry <= now:
+                try:
+                    self.room_manager.update_rooms(now)
+                except Exception as e:  # never let cleanup stop the ticks
+                    print(f"[TickScheduler] ⚠️ Room cleanup failed: {e}")
+            if room_id is not None:
+                self._tick_room(room_id, due)
+
+    def _tick_room(self, room_id, due):
+        room = self.room_manager.get_room(room_id)
+        if room is None or room.simulation is None or room.finished:
+            return
+
+        now = time.monotonic()
+        if room_id in self._in_flight:
+            # Actor still busy with the last tick: try again next base tick
+            self.schedule(room_id, now + 1 / self.base_rate)
+            return
+
+        steps = self.steps_for(room, now, self.load(now))
+        self._in_flight.add(room_id)
+        future = self.actors.ask(room_id, 'tick', steps=steps, cost_sink=self.record_cost)
+        future.add_done_callback(lambda _: self._in_flight.discard(room_id))
+
+        # Stay on the room's timeline unless we fell a full interval behind
+        next_due = due + steps / self.base_rate
+        self.schedule(room_id, next_due if next_due > now else now)
+
+
+# ================================================================
+# 3. GLOBAL TICK SCHEDULER INSTANCE
+# ================================================================
+tick_scheduler = TickScheduler()
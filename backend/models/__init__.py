@@ -7,6 +7,7 @@
 # ============================================================
 
 from backend.database.db import engine
+from backend.utils.serializer import serialize_model
 from sqlalchemy.orm import declarative_base
 
 # ============================================================
@@ -14,8 +15,19 @@ from sqlalchemy.orm import declarative_base
 # ------------------------------------------------------------
 # SQLAlchemy’s Declarative Base class acts as the foundation
 # for all models (tables). Each model will inherit from this base.
+# Every model also gets to_dict() from SerializerMixin, backed by
+# the compiled per-class serializers in utils/serializer.py.
 # ============================================================
-Base = declarative_base()
+class SerializerMixin:
+    def to_dict(self, fields=None):
+        """
+        JSON-ready dict of this row's columns.
+        :param fields: Optional column names to include (projection).
+        """
+        return serialize_model(self, fields)
+
+
+Base = declarative_base(cls=SerializerMixin)
 
 # ============================================================
 # 2. MODEL IMPORTS
@@ -27,17 +39,20 @@ Base = declarative_base()
 from backend.models.player_model import Player
 from backend.models.game_model import Game
 from backend.models.score_model import Score
+from backend.models.player_stats_model import PlayerStats
 
 # ============================================================
 # 3. DATABASE TABLE CREATION
 # ------------------------------------------------------------
-# This line creates all tables defined in the imported models
-# if they don’t already exist in the database.
-# It’s safe to call this multiple times — SQLAlchemy checks
-# before creating duplicate tables.
+# Creates missing tables and brings existing ones up to date
+# (new columns and indexes) through the versioned migrations
+# in backend/database/migrations.py.
+# It’s safe to call this multiple times — applied migrations
+# are recorded and skipped.
 # ============================================================
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    from backend.database.migrations import migrate
+    migrate(engine)
     print("✅ All database tables initialized successfully.")
 
 # ============================================================
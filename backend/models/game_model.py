@@ -5,7 +5,7 @@
 #              including participants, scores, duration, and result.
 # ============================================================
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from datetime import datetime
 from backend.models import Base
 
@@ -18,6 +18,15 @@ from backend.models import Base
 # ============================================================
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # Active-game listing (GET /api/game/active)
+        Index("ix_games_status", "status"),
+        # Player foreign keys (games a player took part in)
+        Index("ix_games_player1_id", "player1_id"),
+        Index("ix_games_player2_id", "player2_id"),
+        Index("ix_games_tom_id", "tom_id"),
+        Index("ix_games_jerry_id", "jerry_id"),
+    )
 
     # ------------------------------------------------------------
     # Primary Key ID — unique identifier for each game session
@@ -46,6 +55,17 @@ class Game(Base):
     # ------------------------------------------------------------
     duration = Column(Integer, nullable=True)
 
+    # ------------------------------------------------------------
+    # Session Fields — set by the /api/game start and end routes
+    # (added to existing databases by migration 2)
+    # ------------------------------------------------------------
+    player1_id = Column(Integer, ForeignKey("players.id"), nullable=True)
+    player2_id = Column(Integer, ForeignKey("players.id"), nullable=True)
+    map_name = Column(String(50), nullable=True)
+    status = Column(String(20), nullable=True)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+
     # ------------------------------------------------------------
     # Created Timestamp — when this game session was recorded
     # ------------------------------------------------------------
@@ -5,7 +5,7 @@
 #              and connection status.
 # ============================================================
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from datetime import datetime
 from backend.models import Base
 
@@ -18,6 +18,10 @@ from backend.models import Base
 # ============================================================
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        # Keyset pagination of /api/player/?order=score
+        Index("ix_players_score_id", "score", "id"),
+    )
 
     # ------------------------------------------------------------
     # Primary Key ID — unique identifier for each player
@@ -0,0 +1,113 @@
+# ============================================================
+# File: backend/models/player_stats_model.py
+# Description: Defines the PlayerStats model for the Tom & Jerry
+#              game. Keeps one pre-aggregated row per player
+#              (total points, games, wins, best score) so the
+#              leaderboard never has to scan the scores table.
+# ============================================================
+
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, func, update
+from sqlalchemy.dialects.sqlite import insert
+from datetime import datetime
+from backend.models import Base
+from backend.models.player_model import Player
+
+# ============================================================
+# 1. PLAYER STATS MODEL
+# ------------------------------------------------------------
+# Aggregate of a player's match results: the winner's Score rows
+# plus the games they lost. It is updated in the same transaction
+# that inserts a Score (see record_score below), and can be
+# rebuilt from the scores and games tables at any time with:
+#   python -m backend.database.maintenance rebuild-stats
+# ============================================================
+class PlayerStats(Base):
+    __tablename__ = "player_stats"
+    __table_args__ = (
+        # Leaderboard order: highest total first, ties by player id
+        Index("ix_player_stats_total_points", "total_points", "player_id"),
+        # Highest single score (MAX in /summary)
+        Index("ix_player_stats_best_score", "best_score"),
+    )
+
+    # ------------------------------------------------------------
+    # Player Reference — one stats row per player
+    # ------------------------------------------------------------
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+
+    # ------------------------------------------------------------
+    # Aggregates — running totals over all of the player's scores
+    # ------------------------------------------------------------
+    total_points = Column(Integer, nullable=False, default=0)
+    games_played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    best_score = Column(Integer, nullable=False, default=0)
+
+    # ------------------------------------------------------------
+    # Updated Timestamp — when the aggregate last changed
+    # ------------------------------------------------------------
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # ============================================================
+    # 2. REPR METHOD
+    # ============================================================
+    def __repr__(self):
+        return (
+            f"<PlayerStats(player_id={self.player_id}, total_points={self.total_points}, "
+            f"games_played={self.games_played}, wins={self.wins})>"
+        )
+
+
+# ============================================================
+# 3. INCREMENTAL UPDATE HELPER
+# ------------------------------------------------------------
+# Call this next to db.add(Score(...)) and before db.commit(),
+# so the score and the aggregate are committed (or rolled back)
+# together.
+# The increment is a single INSERT ... ON CONFLICT DO UPDATE,
+# evaluated by SQLite against the current row under its write
+# lock. Reading the row in Python and writing it back would lose
+# updates: pysqlite only opens the transaction at the first
+# write, so two concurrent results for one player could both
+# read the same old totals.
+# players.score (the accumulated score /api/player/?order=score
+# pages on) is incremented in the same transaction, so it always
+# equals total_points.
+# ============================================================
+def record_score(db, player_id, points, won=False):
+    """
+    Add one game result to a player's aggregate row.
+
+    :param db: Active SQLAlchemy session (the caller commits).
+    :param player_id: Player who earned the points.
+    :param points: Points scored in the game.
+    :param won: True if the player won the game.
+    :return: The updated PlayerStats instance.
+    """
+    wins = 1 if won else 0
+    now = datetime.utcnow()
+    table = PlayerStats.__table__
+    stmt = insert(PlayerStats).values(
+        player_id=player_id, total_points=points, games_played=1,
+        wins=wins, best_score=points, updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.player_id],
+        set_={
+            "total_points": table.c.total_points + stmt.excluded.total_points,
+            "games_played": table.c.games_played + 1,
+            "wins": table.c.wins + stmt.excluded.wins,
+            "best_score": func.max(table.c.best_score, stmt.excluded.best_score),
+            "updated_at": now,
+        }
+    ).returning(PlayerStats)
+
+    # populate_existing: a PlayerStats already in the session picks
+    # up the new totals instead of keeping its stale ones
+    stats = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    if points:
+        db.execute(
+            update(Player).where(Player.id == player_id)
+            .values(score=func.coalesce(Player.score, 0) + points)
+        )
+    return stats
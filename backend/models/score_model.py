@@ -5,7 +5,7 @@
 #              different matches for leaderboard and analytics.
 # ============================================================
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from datetime import datetime
 from backend.models import Base
 
@@ -18,6 +18,14 @@ from backend.models import Base
 # ============================================================
 class Score(Base):
     __tablename__ = "scores"
+    __table_args__ = (
+        # A player's most recent scores (leaderboard history)
+        Index("ix_scores_player_created", "player_id", "created_at"),
+        # Scores of one game; distinct game count in /summary
+        Index("ix_scores_game_id", "game_id"),
+        # Write-behind results are applied at most once
+        Index("ix_scores_result_id", "result_id", unique=True),
+    )
 
     # ------------------------------------------------------------
     # Primary Key ID — unique identifier for each score record
@@ -39,6 +47,13 @@ class Score(Base):
     # ------------------------------------------------------------
     points = Column(Integer, nullable=False)
 
+    # ------------------------------------------------------------
+    # Result ID — set for match results written behind the request
+    # (database/write_behind.py), so a replayed spool record is
+    # never applied twice
+    # ------------------------------------------------------------
+    result_id = Column(String(36), nullable=True)
+
     # ------------------------------------------------------------
     # Timestamp — when this score record was added
     # ------------------------------------------------------------
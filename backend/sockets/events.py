@@ -4,9 +4,17 @@
 #     This file defines all real-time WebSocket (Socket.IO)
 #     event handlers for the Tom & Jerry game.
 #     It manages player connections, movement broadcasting,
-#     and shared game state synchronization.
+#     and forwards game actions to the per-room actors.
 # ============================================================
 
+from flask_socketio import emit, join_room as join_socket_room
+
+from backend.game_logic.matchmaking import matchmaker, AI_DIFFICULTIES
+from backend.game_logic.ai_scheduler import ai_scheduler
+from backend.game_logic.actors import room_actors, LOBBY_ROOM
+from backend.game_logic.levels import level_exists
+from backend.config import Config
+
 
 # ============================================================
 # 1. REGISTER SOCKET EVENTS
@@ -14,16 +22,31 @@
 # This function is called from socket_manager.py to register
 # all event listeners for the Flask-SocketIO server.
 # ============================================================
-def register_socket_events(socketio, game_state):
+def register_socket_events(socketio):
     """
     Registers all WebSocket event listeners for the game.
+    Room state is owned by per-room actors (game_logic/actors.py);
+    handlers only send them messages, and actors broadcast back
+    through the emitter set here.
 
     Args:
         socketio (SocketIO): The Socket.IO instance.
-        game_state (dict): Shared in-memory state tracking
-                           players, positions, and moves.
     """
 
+    def emit_from_actor(event, data, room_id):
+        # The lobby is everyone connected; other rooms are Socket.IO rooms
+        socketio.emit(event, data, to=None if room_id == LOBBY_ROOM else room_id)
+
+    room_actors.emit = emit_from_actor
+
+    def send_match_state(room_id):
+        # Entity updates are dead-reckoned against what the room was
+        # last sent, so a client joining a running match (or
+        # reconnecting) gets the full state once, to this client only
+        match = room_actors.snapshot(room_id)['match']
+        if match is not None:
+            emit('game_state', match)
+
     # --------------------------------------------------------
     # EVENT: CONNECT
     # --------------------------------------------------------
@@ -52,30 +75,25 @@ def register_socket_events(socketio, game_state):
     # The client emits this event with player_id information.
     #
     # Example payload:
-    #   { "player_id": "Jerry" }
+    #   { "player_id": "Jerry", "room_id": "lobby" }
     #
-    # This adds the player to the shared game_state dictionary
-    # and notifies all connected clients.
+    # The room's actor adds the player and notifies all
+    # connected clients ("room_id" defaults to the lobby).
     # --------------------------------------------------------
     @socketio.on('join')
     def handle_join(data):
         player_id = data.get('player_id')
 
         if player_id:
-            # Add player to the game state with default position
-            game_state['players'][player_id] = {'x': 0, 'y': 0}
-
+            room_id = data.get('room_id', LOBBY_ROOM)
+            if room_actors.actor(room_id) is None:
+                print(f"⚠️ Join for unknown room {room_id!r} from {player_id}")
+                return
+            if room_id != LOBBY_ROOM:
+                join_socket_room(room_id)
+                send_match_state(room_id)
+            room_actors.tell(room_id, 'join', player_id=player_id)
             print(f"🎮 Player joined: {player_id}")
-
-            # Broadcast updated state to all players
-            socketio.emit(
-                'player_joined',
-                {
-                    'player_id': player_id,
-                    'players': game_state['players']
-                },
-                broadcast=True
-            )
         else:
             print("⚠️ Join event received without player_id")
 
@@ -83,13 +101,13 @@ def register_socket_events(socketio, game_state):
     # EVENT: MOVE
     # --------------------------------------------------------
     # Fired when a player moves their character (Tom or Jerry).
-    # The client emits movement data (x, y coordinates) which
-    # updates the shared game state and broadcasts to others.
+    # The client emits movement data (x, y coordinates); the
+    # room's actor stores it and broadcasts to the others.
     #
     # Example payload:
     #   { "player_id": "Tom", "x": 120, "y": 240 }
     #
-    # The server stores movement history and syncs positions.
+    # The server stores recent movement history and syncs positions.
     # --------------------------------------------------------
     @socketio.on('move')
     def handle_move(data):
@@ -98,29 +116,123 @@ def register_socket_events(socketio, game_state):
         y = data.get('y')
 
         if player_id and x is not None and y is not None:
-            # Update player position in game state
-            game_state['players'][player_id] = {'x': x, 'y': y}
+            room_actors.tell(data.get('room_id', LOBBY_ROOM), 'move', player_id=player_id, x=x, y=y)
+        else:
+            print("⚠️ Invalid move data received:", data)
 
-            # Log move to move history
-            game_state['moves'].append({
-                'player_id': player_id,
-                'x': x,
-                'y': y
-            })
-
-            # Broadcast updated positions to all connected clients
-            socketio.emit(
-                'player_moved',
-                {
-                    'player_id': player_id,
-                    'x': x,
-                    'y': y,
-                    'players': game_state['players']
-                },
-                broadcast=True
-            )
-
-            print(f"🏃 Player {player_id} moved to ({x}, {y})")
+    # --------------------------------------------------------
+    # EVENT: INPUT
+    # --------------------------------------------------------
+    # Direction input for a running match, applied by the room's
+    # actor on its next tick.
+    #
+    # Example payload:
+    #   { "room_id": "...", "player_id": "p1", "direction": 3 }
+    #
+    # "direction" is 0 (stand still) or 1..8 clockwise from north.
+    # --------------------------------------------------------
+    @socketio.on('input')
+    def handle_input(data):
+        room_id = data.get('room_id')
+        player_id = data.get('player_id')
+        direction = data.get('direction')
 
+        if room_id and player_id and isinstance(direction, int):
+            room_actors.tell(room_id, 'input', player_id=player_id, code=direction)
+            ai_scheduler.mark_activity(room_id)  # keeps a solo room's AI at full rate
         else:
-            print("⚠️ Invalid move data received:", data)
+            print("⚠️ Invalid input data received:", data)
+
+    # --------------------------------------------------------
+    # EVENT: FIND MATCH
+    # --------------------------------------------------------
+    # Fired when a player wants to be seated in a game.
+    # The server picks the oldest open room that needs the
+    # requested role (or creates one) and pairs atomically,
+    # so clients never scan the lobby themselves.
+    #
+    # Example payload:
+    #   { "player_id": "p1", "nickname": "TomHero", "role": "tom",
+    #     "map": "house" }
+    #
+    # "role" may be omitted to take whichever slot is free, "map"
+    # defaults to Config.DEFAULT_MAP. Players are only paired with
+    # players on the same map. The match starts as soon as the
+    # room is full ('match_found' carries "started": true); the
+    # room then receives the starting 'game_state'.
+    # --------------------------------------------------------
+    @socketio.on('find_match')
+    def handle_find_match(data):
+        player_id = data.get('player_id')
+        nickname = data.get('nickname', player_id)
+        role = data.get('role')
+        map_name = data.get('map', Config.DEFAULT_MAP)
+
+        if not player_id or role not in (None, 'tom', 'jerry') or not level_exists(map_name):
+            print("⚠️ Invalid find_match data received:", data)
+            return
+
+        room, assigned_role = matchmaker.find_match(player_id, nickname, role, map_name)
+        if room is None:
+            # Worker over its tick budget: send the player elsewhere
+            emit('server_busy', {'redirect': Config.OVERFLOW_SERVER_URL or None, 'retry_after': 5})
+            return
+        join_socket_room(room.id)
+        send_match_state(room.id)  # reconnecting to a running match
+
+        # Notify everyone seated in the room
+        socketio.emit(
+            'match_found',
+            {
+                'room_id': room.id,
+                'player_id': player_id,
+                'role': assigned_role,
+                'players': len(room.players),
+                'max_players': room.max_players,
+                'started': room.started
+            },
+            to=room.id
+        )
+
+    # --------------------------------------------------------
+    # EVENT: START SOLO
+    # --------------------------------------------------------
+    # Fired when a player wants to play against the AI. A room
+    # is created and started at once; the AI opponent is planned
+    # by the worker's AI scheduler.
+    #
+    # Example payload:
+    #   { "player_id": "p1", "nickname": "TomHero", "role": "tom",
+    #     "difficulty": "hard", "map": "house" }
+    #
+    # "role" defaults to tom, "difficulty" to normal, "map" to
+    # Config.DEFAULT_MAP.
+    # --------------------------------------------------------
+    @socketio.on('start_solo')
+    def handle_start_solo(data):
+        player_id = data.get('player_id')
+        nickname = data.get('nickname', player_id)
+        role = data.get('role')
+        difficulty = data.get('difficulty', 'normal')
+        map_name = data.get('map', Config.DEFAULT_MAP)
+
+        if (not player_id or role not in (None, 'tom', 'jerry') or difficulty not in AI_DIFFICULTIES
+                or not level_exists(map_name)):
+            print("⚠️ Invalid start_solo data received:", data)
+            return
+
+        room, assigned_role, ai_id = matchmaker.start_solo(player_id, nickname, role, difficulty, map_name)
+        if room is None:
+            emit('server_busy', {'redirect': Config.OVERFLOW_SERVER_URL or None, 'retry_after': 5})
+            return
+        join_socket_room(room.id)
+        send_match_state(room.id)
+
+        emit('match_found', {
+            'room_id': room.id,
+            'player_id': player_id,
+            'role': assigned_role,
+            'opponent_id': ai_id,
+            'players': len(room.players),
+            'max_players': room.max_players
+        })
@@ -0,0 +1,122 @@
+# ============================================================
+# File: backend/sockets/lobby.py
+# Description:
+#     Push-based lobby room list over Socket.IO.
+#     A client subscribes once, gets the full room list, and from
+#     then on only receives batched diffs: rooms created/changed
+#     (upserts) and rooms removed. Changes are collected from
+#     RoomManager listeners and coalesced, so a room that changes
+#     five times between flushes is sent once, and each flush is
+#     a single emit to the whole subscriber channel.
+# ============================================================
+
+import threading
+
+from flask_socketio import emit, join_room, leave_room
+
+from backend.config import Config
+from backend.game_logic.rooms import room_manager
+
+# ============================================================
+# 1. CONSTANTS
+# ------------------------------------------------------------
+# Socket.IO room every lobby subscriber is joined to.
+# ============================================================
+LOBBY_CHANNEL = "lobby-watchers"
+
+
+# ============================================================
+# 2. LOBBY FEED CLASS
+# ------------------------------------------------------------
+# Collects room changes between flushes. `version` goes up by
+# one per flushed batch; a snapshot carries the version it is
+# current as of, so clients can drop older batches.
+# ============================================================
+class LobbyFeed:
+    def __init__(self, socketio, manager=room_manager, interval_ms=None):
+        """
+        :param socketio: SocketIO instance used to emit batches.
+        :param manager: RoomManager to watch.
+        :param interval_ms: Batch interval (Config.LOBBY_BATCH_MS).
+        """
+        self.socketio = socketio
+        self.manager = manager
+        self.interval = (interval_ms or Config.LOBBY_BATCH_MS) / 1000.0
+        self.version = 0
+        self._pending = {}     # room_id -> Room, or None if removed
+        self._lock = threading.Lock()
+        self._started = False
+        manager.add_listener(self._on_room_event)
+
+    def _on_room_event(self, event, room):
+        # Keep the room itself; its summary is built at flush time,
+        # so only the latest state is sent
+        with self._lock:
+            self._pending[room.id] = None if event == 'removed' else room
+
+    def snapshot(self):
+        """Full room list plus the version it is current as of."""
+        with self._lock:
+            return {'rooms': self.manager.list_rooms(), 'version': self.version}
+
+    def flush(self):
+        """Emit everything changed since the last flush as one diff."""
+        with self._lock:
+            if not self._pending:
+                return None
+            pending, self._pending = self._pending, {}
+            self.version += 1
+            diff = {
+                'version': self.version,
+                'changed': [room.summary() for room in pending.values() if room is not None],
+                'removed': [room_id for room_id, room in pending.items() if room is None]
+            }
+        self.socketio.emit('lobby_diff', diff, to=LOBBY_CHANNEL)
+        return diff
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            self.flush()
+
+
+# ============================================================
+# 3. REGISTER LOBBY EVENTS
+# ------------------------------------------------------------
+# Called from socket_manager.py next to register_socket_events.
+# ============================================================
+def register_lobby_events(socketio):
+    """
+    Registers the lobby subscription events.
+
+    Args:
+        socketio (SocketIO): The Socket.IO instance.
+    """
+    feed = LobbyFeed(socketio)
+    feed.start()
+
+    # --------------------------------------------------------
+    # EVENT: LOBBY SUBSCRIBE
+    # --------------------------------------------------------
+    # Sends the current room list once ('lobby_snapshot'), then
+    # 'lobby_diff' batches: { version, changed: [...], removed: [...] }.
+    # Diffs with a version <= the snapshot's can be ignored.
+    # --------------------------------------------------------
+    @socketio.on('lobby_subscribe')
+    def handle_lobby_subscribe(data=None):
+        join_room(LOBBY_CHANNEL)
+        emit('lobby_snapshot', feed.snapshot())
+
+    # --------------------------------------------------------
+    # EVENT: LOBBY UNSUBSCRIBE
+    # --------------------------------------------------------
+    @socketio.on('lobby_unsubscribe')
+    def handle_lobby_unsubscribe(data=None):
+        leave_room(LOBBY_CHANNEL)
+
+    return feed
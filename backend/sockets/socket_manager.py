@@ -23,14 +23,13 @@ socketio = None
 # Called from app.py to initialize Socket.IO with the Flask app.
 # Handles configuration, event registration, and basic connect/disconnect logs.
 # ============================================================
-def init_socket(app, game_state):
+def init_socket(app):
     """
     Initialize and configure Socket.IO for the Flask app.
     Automatically registers all socket event handlers.
 
     Args:
         app (Flask): The main Flask app instance.
-        game_state (dict): Shared in-memory game state.
     """
 
     global socketio
@@ -54,9 +53,11 @@ def init_socket(app, game_state):
     try:
         # Dynamically import to avoid circular imports
         from backend.sockets.events import register_socket_events
+        from backend.sockets.lobby import register_lobby_events
 
         # Register all the event listeners (join room, move, etc.)
-        register_socket_events(socketio, game_state)
+        register_socket_events(socketio)
+        register_lobby_events(socketio)
         print("[SocketManager] ✅ Socket events registered successfully.")
     except Exception as e:
         print("[SocketManager] ⚠️ Failed to register socket events:")
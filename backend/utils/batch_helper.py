@@ -0,0 +1,58 @@
+# Batch request helpers
+# ============================================================
+# File: backend/utils/batch_helper.py
+# Description:
+#   Shared parsing for the batch endpoints (/api/player/batch,
+#   /api/game/batch, /api/game/end/batch), so they all accept
+#   ids the same way and enforce the same size cap.
+# ============================================================
+
+from backend.config import Config
+
+
+# ============================================================
+# SECTION 1: ID List Parsing
+# ------------------------------------------------------------
+# Accepts "?ids=1,2,3". Duplicates are dropped (first occurrence
+# wins) so the IN (...) query and the response stay small.
+# ============================================================
+
+def parse_ids(raw, max_ids=None):
+    """
+    Parse a comma-separated id list.
+
+    :param raw: Value of the ids query argument.
+    :param max_ids: Most ids allowed (Config.BATCH_MAX_IDS).
+    :return: Tuple (ids, error); error is None when ids are valid.
+    """
+    max_ids = max_ids or Config.BATCH_MAX_IDS
+    if not raw:
+        return None, "ids is required, e.g. ?ids=1,2,3"
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+    except ValueError:
+        return None, "ids must be comma-separated integers"
+    if not ids:
+        return None, "ids is required, e.g. ?ids=1,2,3"
+    if len(ids) > max_ids:
+        return None, f"At most {max_ids} ids per request"
+    return ids, None
+
+
+# ============================================================
+# SECTION 2: Ordering Results
+# ------------------------------------------------------------
+# IN (...) returns rows in index order; batch responses follow
+# the order the caller asked for and list the ids not found.
+# ============================================================
+
+def order_by_ids(ids, rows):
+    """
+    :param ids: Requested ids, in order.
+    :param rows: Model instances with an `id` attribute.
+    :return: Tuple (rows in request order, missing ids).
+    """
+    by_id = {row.id: row for row in rows}
+    found = [by_id[i] for i in ids if i in by_id]
+    missing = [i for i in ids if i not in by_id]
+    return found, missing
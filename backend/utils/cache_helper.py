@@ -6,11 +6,20 @@
 #   for storing and retrieving temporary data such as
 #   active sessions, leaderboard snapshots, or player states.
 #   It’s designed for easy upgrade to Redis or Memcached later.
+#   Also caches whole GET responses (body + strong ETag) until an
+#   event that changes them invalidates their tags.
 # ============================================================
 
+import hashlib
 import time
+from collections import OrderedDict
+from functools import wraps
 from threading import Lock
 
+from flask import current_app, make_response, request
+
+from backend.config import Config
+
 # ============================================================
 # SECTION 1: Simple Thread-Safe Cache Class
 # ------------------------------------------------------------
@@ -103,3 +112,190 @@ def cache_delete(key):
 def cache_clear():
     """Convenience wrapper to clear the cache."""
     cache.clear()
+
+
+# ============================================================
+# SECTION 4: HTTP Response Cache
+# ------------------------------------------------------------
+# Stores the encoded body and a strong ETag of GET responses,
+# keyed by path and query string. Every entry carries tags
+# ("leaderboard", "player:7", ...) and the code that changes the
+# underlying data calls invalidate() with them.
+# Each tag also has a version. A response computed while one of
+# its tags was invalidated is not stored, so a request racing a
+# commit can never put the old answer back in the cache.
+# Entries live in this process only: invalidate() only sees this
+# worker's writes, so entries also expire after
+# Config.RESPONSE_CACHE_TTL_SECONDS when it is set, which bounds how
+# long another worker's commit can go unseen. The default 0 (no
+# expiry) suits a single worker; multi-worker deployments set it.
+# The least recently used entries are evicted beyond
+# Config.RESPONSE_CACHE_MAX_ENTRIES.
+# ============================================================
+
+class ResponseCache:
+    def __init__(self, max_entries=None, ttl=None):
+        """
+        :param max_entries: Most responses kept (defaults to Config).
+        :param ttl: Seconds an entry stays valid (defaults to Config; 0 = forever).
+        """
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.RESPONSE_CACHE_TTL_SECONDS
+        self._entries = OrderedDict()   # key -> (body, etag, mimetype, tags, expires_at)
+        self._tag_keys = {}             # tag -> keys of entries carrying it
+        self._versions = {}             # tag -> times invalidated
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def versions(self, tags):
+        """Current version of each tag; pass it back to store()."""
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def get(self, key):
+        """Return (body, etag, mimetype) for a cached response, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[4] is not None and entry[4] <= time.monotonic():
+                # Expired: may predate another worker's commit
+                self._unlink(key, self._entries.pop(key))
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[:3]
+
+    def store(self, key, body, mimetype, tags, versions):
+        """
+        Cache a response body unless one of its tags changed meanwhile.
+        :param key: Cache key of the request.
+        :param body: Encoded response body (bytes).
+        :param mimetype: Response mimetype.
+        :param tags: Tags that invalidate this entry.
+        :param versions: versions(tags) taken before the body was built.
+        :return: Strong ETag of the body.
+        """
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if versions != tuple(self._versions.get(tag, 0) for tag in tags):
+                return etag
+            self._unlink(key, self._entries.pop(key, None))
+            self._entries[key] = (body, etag, mimetype, tags, expires_at)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._unlink(old_key, old_entry)
+        return etag
+
+    def invalidate(self, *tags):
+        """Drop every cached response carrying any of `tags`."""
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._unlink(key, entry)
+                        self.invalidations += 1
+
+    def _unlink(self, key, entry):
+        # Caller holds self._lock
+        if entry is None:
+            return
+        for tag in entry[3]:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_keys.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations
+            }
+
+
+response_cache = ResponseCache()
+
+# Tags used by the API: LEADERBOARD_TAG whenever player totals
+# change (write_behind.update_rankings), PLAYERS_TAG when players
+# are added or removed, player_tag(id) when that player or their
+# scores change.
+LEADERBOARD_TAG = "leaderboard"
+PLAYERS_TAG = "players"
+
+
+def player_tag(player_id):
+    return f"player:{player_id}"
+
+
+# ============================================================
+# SECTION 5: Cached Route Decorator
+# ------------------------------------------------------------
+# Wrap a GET view (below @route) to serve it from response_cache:
+#
+#   @leaderboard_bp.route("/player/<int:player_id>")
+#   @cached_response(lambda player_id: [f"player:{player_id}"])
+#
+# A hit never calls the view, so it touches neither the database
+# nor the JSON encoder. Every 200 response gets its ETag and
+# "Cache-Control: no-cache" (clients revalidate each time), and
+# a matching If-None-Match is answered with 304 and no body.
+# Other status codes pass through uncached.
+# ============================================================
+
+def cached_response(tags):
+    """
+    :param tags: List of tags, or a function of the view arguments
+                 returning them.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not Config.RESPONSE_CACHE_ENABLED:
+                return view(*args, **kwargs)
+
+            entry_tags = tuple(tags(**kwargs) if callable(tags) else tags)
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            cached = response_cache.get(key)
+
+            if cached is None:
+                versions = response_cache.versions(entry_tags)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                etag = response_cache.store(key, response.get_data(), response.mimetype,
+                                            entry_tags, versions)
+            else:
+                body, etag, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                response_cache.record_not_modified()
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,308 @@
+# ============================================================
+# File: backend/utils/ranking.py
+# Description:
+#   In-memory ranked leaderboard. Player totals are kept in an
+#   indexable skip list (every link stores how many entries it
+#   skips), so top-N, "what rank am I" and "who is around me"
+#   are all O(log n) instead of SQL counting every player that
+#   outranks you.
+#   The list is loaded at startup from the player_stats table and
+#   updated whenever this worker records a score. Scores recorded
+#   by other worker processes are picked up by reloading the table
+#   every Config.RANKING_RELOAD_SECONDS (start_reloading).
+# ============================================================
+
+import random
+import threading
+import time
+
+from sqlalchemy import desc
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.config import Config
+
+# ============================================================
+# SECTION 1: Constants
+# ------------------------------------------------------------
+# Nodes are promoted a level with chance 1/4, so 16 levels
+# keep searches O(log n) well past 4 billion entries.
+# ============================================================
+MAX_LEVEL = 16
+
+
+# ============================================================
+# SECTION 2: Indexable Skip List
+# ------------------------------------------------------------
+# Sorted by key (ascending). Positions count from the head
+# (position 0); entry i sits at position i + 1 and the end of
+# the list at len + 1. width[level] is the position distance
+# to next[level] (or to the end when next[level] is None).
+# ============================================================
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, level):
+        self.key = key
+        self.value = value
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    def __init__(self, seed=None):
+        """
+        :param seed: Optional seed for the level generator.
+        """
+        self._rng = random.Random(seed)
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _random_level(self):
+        # Each pair of low zero bits is one promotion (chance 1/4)
+        bits = self._rng.getrandbits(2 * (MAX_LEVEL - 1))
+        if not bits:
+            return MAX_LEVEL
+        return ((bits & -bits).bit_length() - 1) // 2 + 1
+
+    def insert(self, key, value=None):
+        """Insert a key (keys must be unique and comparable)."""
+        chain = [None] * MAX_LEVEL
+        steps_at = [0] * MAX_LEVEL
+        node, steps = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps += node.width[level]
+                node = node.next[level]
+            chain[level], steps_at[level] = node, steps
+
+        new = _Node(key, value, self._random_level())
+        for level in range(len(new.next)):
+            prev = chain[level]
+            skipped = steps - steps_at[level]
+            new.next[level] = prev.next[level]
+            new.width[level] = prev.width[level] - skipped
+            prev.next[level] = new
+            prev.width[level] = skipped + 1
+        for level in range(len(new.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """Remove a key; returns False if it was not present."""
+        chain = [None] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = node.next[0]
+        if target is None or target.key != key:
+            return False
+        for level in range(MAX_LEVEL):
+            prev = chain[level]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        self._size -= 1
+        return True
+
+    def index(self, key):
+        """0-based position of a key, or None if it is not present."""
+        node, steps = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps += node.width[level]
+                node = node.next[level]
+        node = node.next[0]
+        return steps if node is not None and node.key == key else None
+
+    def _node_at(self, i):
+        position, node = i + 1, self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= position:
+                position -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def slice(self, start, stop):
+        """List of (key, value) for positions start..stop-1."""
+        start, stop = max(0, start), min(stop, self._size)
+        if start >= stop:
+            return []
+        node, items = self._node_at(start), []
+        for _ in range(stop - start):
+            items.append((node.key, node.value))
+            node = node.next[0]
+        return items
+
+    @classmethod
+    def from_sorted(cls, items, seed=None):
+        """
+        Build in O(n) from (key, value) pairs already sorted by key
+        (e.g. straight from an ORDER BY query).
+        """
+        skiplist = cls(seed)
+        last = [skiplist._head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        position = 0
+        for key, value in items:
+            position += 1
+            node = _Node(key, value, skiplist._random_level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level], last_position[level] = node, position
+        for level in range(MAX_LEVEL):
+            last[level].width[level] = position + 1 - last_position[level]
+        skiplist._size = position
+        return skiplist
+
+
+# ============================================================
+# SECTION 3: Ranked Leaderboard
+# ------------------------------------------------------------
+# Keys sort best-first: (-total_points, -player_id), the same
+# order as the player_stats index used by /api/leaderboard/top.
+# Ranks are 1-based. Values are usernames, so listing players
+# needs no extra query.
+# ============================================================
+class RankedLeaderboard:
+    def __init__(self):
+        self._list = IndexableSkipList()
+        self._totals = {}       # player_id -> (total_points, username)
+        self._lock = threading.Lock()
+        self._reloader = None
+        self.loaded = False
+
+    @staticmethod
+    def _key(player_id, total):
+        return (-total, -player_id)
+
+    def __len__(self):
+        return len(self._list)
+
+    def load(self, db=None, quiet=False):
+        """
+        Replace the ranking with the current player_stats table.
+        :param db: Optional session; a new one is opened (and closed) if omitted.
+        :param quiet: Skip the log line (periodic reloads).
+        :return: Number of ranked players, or None if the table is unavailable.
+        """
+        from backend.database.db import ReadSessionLocal
+        from backend.models.player_model import Player
+        from backend.models.player_stats_model import PlayerStats
+
+        own_session = db is None
+        db = db or ReadSessionLocal()
+        try:
+            rows = (
+                db.query(PlayerStats.player_id, PlayerStats.total_points, Player.username)
+                .join(Player, Player.id == PlayerStats.player_id)
+                .order_by(desc(PlayerStats.total_points), desc(PlayerStats.player_id))
+                .yield_per(10000)
+            )
+            totals = {}
+            items = []
+            for player_id, total, username in rows:
+                totals[player_id] = (total, username)
+                items.append((self._key(player_id, total), username))
+        except SQLAlchemyError as e:
+            print(f"[RankedLeaderboard] ⚠️ Could not load player stats: {e}")
+            return None
+        finally:
+            if own_session:
+                db.close()
+
+        ranking = IndexableSkipList.from_sorted(items)
+        with self._lock:
+            self._list, self._totals = ranking, totals
+            self.loaded = True
+        if not quiet:
+            print(f"[RankedLeaderboard] 🏆 Loaded {len(totals)} players.")
+        return len(totals)
+
+    def start_reloading(self, interval=None):
+        """
+        Reload from player_stats every `interval` seconds in a daemon
+        thread, so totals committed by other workers show up. A total
+        set while a reload is reading the table can be lost until the
+        next reload.
+        :param interval: Seconds between reloads (Config.RANKING_RELOAD_SECONDS; 0 = never).
+        :return: True if the thread was started.
+        """
+        interval = interval if interval is not None else Config.RANKING_RELOAD_SECONDS
+        if not interval or self._reloader is not None:
+            return False
+
+        def _reload_loop():
+            while True:
+                time.sleep(interval)
+                self.load(quiet=True)
+
+        self._reloader = threading.Thread(target=_reload_loop, name="ranking-reload", daemon=True)
+        self._reloader.start()
+        return True
+
+    def set_total(self, player_id, total, username=None):
+        """Insert or move a player after their total changed."""
+        with self._lock:
+            old = self._totals.get(player_id)
+            if old is not None:
+                self._list.remove(self._key(player_id, old[0]))
+                username = username if username is not None else old[1]
+            self._totals[player_id] = (total, username)
+            self._list.insert(self._key(player_id, total), username)
+
+    def remove(self, player_id):
+        with self._lock:
+            old = self._totals.pop(player_id, None)
+            if old is not None:
+                self._list.remove(self._key(player_id, old[0]))
+
+    def _entries(self, start, stop):
+        return [
+            {"rank": start + i + 1, "player_id": -key[1],
+             "username": username, "total_points": -key[0]}
+            for i, (key, username) in enumerate(self._list.slice(start, stop))
+        ]
+
+    def top(self, n=10):
+        """The n best players as rank entries."""
+        with self._lock:
+            return self._entries(0, n)
+
+    def rank(self, player_id):
+        """Rank entry for one player, or None if they have no score yet."""
+        with self._lock:
+            old = self._totals.get(player_id)
+            if old is None:
+                return None
+            position = self._list.index(self._key(player_id, old[0]))
+            return self._entries(position, position + 1)[0]
+
+    def around(self, player_id, radius=5):
+        """
+        The player plus up to `radius` players above and below them.
+        :return: List of rank entries, or None if the player is unranked.
+        """
+        with self._lock:
+            old = self._totals.get(player_id)
+            if old is None:
+                return None
+            position = self._list.index(self._key(player_id, old[0]))
+            return self._entries(max(0, position - radius), position + radius + 1)
+
+
+# ============================================================
+# SECTION 4: Global Leaderboard Instance
+# ------------------------------------------------------------
+# Loaded (and periodically reloaded) in create_app() and updated
+# whenever a match result is committed (database/write_behind.py).
+# ============================================================
+ranked_leaderboard = RankedLeaderboard()
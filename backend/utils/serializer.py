@@ -6,57 +6,187 @@
 #   for converting Python objects (especially SQLAlchemy models)
 #   into JSON-friendly dictionaries.
 #   It simplifies how database models are returned through APIs.
+#   Serializers are compiled once per model class (and field
+#   projection) and cached, so serializing a row is one C-level
+#   fetch of its values plus formatting of the few non-JSON columns.
 # ============================================================
 
-from datetime import datetime
-from typing import Any, Dict
+from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import inspect
+
+
+# ============================================================
+# SECTION 1: Type-Specific Formatters
+# ------------------------------------------------------------
+# Picked once per column from its SQL type. Columns whose values
+# are already JSON-safe (ints, strings, bools) get no formatter.
+# ============================================================
+
+def _format_datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def _format_bytes(value):
+    return value.decode("utf-8") if value is not None else None
+
+
+def _formatter_for(column) -> Optional[Callable[[Any], Any]]:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return format_value
+    if issubclass(python_type, (datetime, date)):
+        return _format_datetime
+    if issubclass(python_type, bytes):
+        return _format_bytes
+    if issubclass(python_type, (int, str, bool, float)):
+        return None
+    return format_value
+
+
+# ============================================================
+# SECTION 2: Compiled Per-Model Serializers
+# ------------------------------------------------------------
+# get_serializer(Model, fields) builds a function for one model
+# class and field list: a single itemgetter fetches every column
+# value, dict(zip(...)) builds the result, and only columns with
+# a formatter are touched again. Results are cached per
+# (class, fields); parse_fields() puts client projections in column
+# order first, so each field set compiles once however it is spelled,
+# and the cache is bounded by SERIALIZER_CACHE_SIZE.
+# ============================================================
+
+SERIALIZER_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def _columns(model_class):
+    """Column name -> Column of a model class, in table order."""
+    return {attr.key: attr.columns[0] for attr in inspect(model_class).column_attrs}
+
+
+@lru_cache(maxsize=SERIALIZER_CACHE_SIZE)
+def get_serializer(model_class, fields: Optional[Sequence[str]] = None) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Compiled serializer for a model class.
+
+    :param model_class: SQLAlchemy model class.
+    :param fields: Optional tuple of column names to include (projection).
+    :return: Function model instance -> dict.
+    :raises ValueError: If a requested field is not a column.
+    """
+    columns = _columns(model_class)
+    if fields is None:
+        keys = tuple(columns)
+    else:
+        unknown = [f for f in fields if f not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields for {model_class.__name__}: {', '.join(unknown)}")
+        keys = tuple(fields)
+    if not keys:
+        raise ValueError("At least one field is required")
+
+    # Loaded column values live in the instance __dict__; reading them
+    # there skips the ORM attribute descriptors. Expired or deferred
+    # attributes are missing from it, so fall back to getattr, which
+    # loads them.
+    fetch_loaded = itemgetter(*keys)
+    fetch = attrgetter(*keys)
+    formatted = tuple((key, fmt) for key in keys if (fmt := _formatter_for(columns[key])) is not None)
+    single = len(keys) == 1     # the getters return a bare value, not a tuple
+
+    def serialize(model):
+        try:
+            values = fetch_loaded(model.__dict__)
+        except KeyError:
+            values = fetch(model)
+        data = {keys[0]: values} if single else dict(zip(keys, values))
+        for key, fmt in formatted:
+            data[key] = fmt(data[key])
+        return data
+
+    return serialize
+
+
+def parse_fields(model_class, raw: Optional[str]):
+    """
+    Parse a "?fields=id,username" projection argument.
+
+    :param model_class: Model the fields must be columns of.
+    :param raw: Comma-separated column names (None/empty = all).
+    :return: Tuple (fields in column order or None, error message or None).
+    """
+    if not raw:
+        return None, None
+    requested = {f.strip() for f in raw.split(",") if f.strip()}
+    columns = _columns(model_class)
+    unknown = sorted(requested.difference(columns))
+    if unknown:
+        return None, f"Unknown fields for {model_class.__name__}: {', '.join(unknown)}"
+    if not requested:
+        return None, "At least one field is required"
+    return tuple(key for key in columns if key in requested), None
 
 
 # ============================================================
-# SECTION 1: Generic Serializer Function
+# SECTION 3: Generic Serializer Function
 # ------------------------------------------------------------
 # The `serialize_model` function takes in a SQLAlchemy model
 # instance and converts it into a dictionary that can be safely
 # returned as JSON.
 # ============================================================
 
-def serialize_model(model) -> Dict[str, Any]:
+def serialize_model(model, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
     """
     Convert a SQLAlchemy model instance into a JSON-serializable dictionary.
 
     :param model: SQLAlchemy model instance
+    :param fields: Optional sequence of column names to include
     :return: Dictionary of column-value pairs
     """
-    serialized_data = {}
-    for column in model.__table__.columns:
-        value = getattr(model, column.name)
-        serialized_data[column.name] = format_value(value)
-    return serialized_data
+    return get_serializer(type(model), tuple(fields) if fields is not None else None)(model)
 
 
 # ============================================================
-# SECTION 2: Serializer for Lists of Models
+# SECTION 4: Serializer for Lists of Models
 # ------------------------------------------------------------
 # This helper is used when you want to serialize a list or query
 # result of multiple model instances into JSON-ready data.
+# The compiled serializer is looked up once per model class,
+# not once per row.
 # ============================================================
 
-def serialize_list(models) -> list:
+def serialize_list(models, fields: Optional[Sequence[str]] = None) -> list:
     """
     Serialize a list of SQLAlchemy model instances.
 
     :param models: Iterable (e.g., list or SQLAlchemy query result)
+    :param fields: Optional sequence of column names to include
     :return: List of serialized dictionaries
     """
-    return [serialize_model(m) for m in models]
+    fields = tuple(fields) if fields is not None else None
+    result = []
+    model_class, serialize = None, None
+    for model in models:
+        if type(model) is not model_class:
+            model_class = type(model)
+            serialize = get_serializer(model_class, fields)
+        result.append(serialize(model))
+    return result
 
 
 # ============================================================
-# SECTION 3: Value Formatting Helper
+# SECTION 5: Value Formatting Helper
 # ------------------------------------------------------------
 # Since JSON doesn’t support complex types like datetime or
 # decimals natively, this function ensures all values are cleanly
 # formatted before sending them as API responses.
+# Compiled serializers fall back to it for column types without
+# a dedicated formatter.
 # ============================================================
 
 def format_value(value: Any) -> Any:
@@ -74,7 +204,7 @@ def format_value(value: Any) -> Any:
 
 
 # ============================================================
-# SECTION 4: Example - Custom Game Serialization
+# SECTION 6: Example - Custom Game Serialization
 # ------------------------------------------------------------
 # (Optional) You can use this pattern to serialize custom logic
 # like game states, scores, or joined query results.
@@ -0,0 +1,39 @@
+# ================================================================
+# File: tests/conftest.py
+# Description:
+#   Shared fixtures. The app database is pointed at a scratch
+#   file before backend.database is imported (its engines are
+#   built at import time), and the `database` fixture migrates
+#   it once and empties every table after each test.
+# ================================================================
+
+import os
+import tempfile
+
+import pytest
+
+import backend.config
+
+backend.config.DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="tomjerry-tests-"), "test.db")
+
+
+# ================================================================
+# 1. DATABASE
+# ================================================================
+@pytest.fixture(scope="session")
+def migrated_database():
+    from backend.database.migrations import migrate
+    migrate()
+
+
+@pytest.fixture
+def database(migrated_database):
+    """The migrated scratch database, emptied after the test."""
+    from backend.database.db import session_scope
+    from backend.models import Game, Player, PlayerStats, Score
+
+    yield session_scope
+    with session_scope() as db:
+        for model in (Score, PlayerStats, Game, Player):
+            db.query(model).delete()
+        db.commit()
@@ -0,0 +1,152 @@
+# ================================================================
+# File: tests/test_ranking.py
+# Description:
+#   Tests for the in-memory ranked leaderboard (utils/ranking.py).
+#   The skip list is checked against a plain sorted list after
+#   random inserts and removals; the leaderboard against ranks
+#   computed by sorting every player.
+# ================================================================
+
+import bisect
+import random
+
+import pytest
+
+from backend.utils.ranking import IndexableSkipList, RankedLeaderboard
+
+
+# ================================================================
+# 1. INDEXABLE SKIP LIST
+# ================================================================
+def assert_matches(skiplist, reference):
+    """Every query of the skip list agrees with the sorted reference."""
+    assert len(skiplist) == len(reference)
+    assert skiplist.slice(0, len(reference) + 5) == [(key, f"v{key}") for key in reference]
+    for i, key in enumerate(reference):
+        assert skiplist.index(key) == i
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_skiplist_random_operations_match_sorted_list(seed):
+    rng = random.Random(seed)
+    skiplist = IndexableSkipList(seed=seed)
+    reference = []
+
+    for _ in range(2000):
+        key = rng.randrange(500)
+        position = bisect.bisect_left(reference, key)
+        present = position < len(reference) and reference[position] == key
+        if present and rng.random() < 0.5:
+            assert skiplist.remove(key) is True
+            reference.pop(position)
+        elif not present:
+            skiplist.insert(key, f"v{key}")
+            reference.insert(position, key)
+        else:
+            assert skiplist.index(key) == position
+
+    assert_matches(skiplist, reference)
+    for start in range(0, len(reference) + 2, 7):
+        stop = start + rng.randrange(12)
+        assert [k for k, _ in skiplist.slice(start, stop)] == reference[start:stop]
+
+
+def test_skiplist_missing_keys():
+    skiplist = IndexableSkipList(seed=1)
+    for key in (10, 20, 30):
+        skiplist.insert(key, f"v{key}")
+
+    assert skiplist.index(15) is None
+    assert skiplist.remove(15) is False
+    assert skiplist.remove(10) is True
+    assert skiplist.remove(10) is False
+    assert skiplist.index(20) == 0
+    assert skiplist.slice(-3, 1) == [(20, "v20")]
+    assert skiplist.slice(2, 10) == []
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 257])
+def test_skiplist_from_sorted_matches_inserts(size):
+    keys = list(range(0, size * 3, 3))
+    skiplist = IndexableSkipList.from_sorted([(key, f"v{key}") for key in keys], seed=size)
+    assert_matches(skiplist, keys)
+
+    # Still a valid skip list afterwards
+    skiplist.insert(1, "v1")
+    if size:
+        assert skiplist.remove(0) is True
+    assert_matches(skiplist, sorted(keys[1:] + [1]))
+
+
+# ================================================================
+# 2. RANKED LEADERBOARD
+# ------------------------------------------------
+# Best first: higher total, then higher player id on ties.
+# ================================================================
+def reference_ranking(totals):
+    return sorted(totals, key=lambda player_id: (-totals[player_id], -player_id))
+
+
+def entry(totals, ranking, player_id):
+    return {"rank": ranking.index(player_id) + 1, "player_id": player_id,
+            "username": f"u{player_id}", "total_points": totals[player_id]}
+
+
+@pytest.fixture
+def board():
+    rng = random.Random(7)
+    board = RankedLeaderboard()
+    totals = {}
+    for _ in range(600):
+        player_id = rng.randrange(1, 150)
+        if player_id in totals and rng.random() < 0.1:
+            board.remove(player_id)
+            del totals[player_id]
+        else:
+            totals[player_id] = rng.randrange(40)   # many ties
+            board.set_total(player_id, totals[player_id], f"u{player_id}")
+    return board, totals
+
+
+def test_top_matches_sorted_totals(board):
+    board, totals = board
+    ranking = reference_ranking(totals)
+
+    assert len(board) == len(totals)
+    assert board.top(10) == [entry(totals, ranking, pid) for pid in ranking[:10]]
+    assert len(board.top(len(totals) + 10)) == len(totals)
+
+
+def test_rank_of_every_player(board):
+    board, totals = board
+    ranking = reference_ranking(totals)
+
+    for player_id in totals:
+        assert board.rank(player_id) == entry(totals, ranking, player_id)
+    assert board.rank(10_000) is None
+
+
+def test_around_me_clips_at_both_ends(board):
+    board, totals = board
+    ranking = reference_ranking(totals)
+
+    for position in (0, 1, len(ranking) // 2, len(ranking) - 2, len(ranking) - 1):
+        player_id = ranking[position]
+        expected = ranking[max(0, position - 3):position + 4]
+        assert board.around(player_id, radius=3) == [entry(totals, ranking, pid) for pid in expected]
+    assert board.around(10_000) is None
+
+
+def test_set_total_moves_player_and_keeps_username():
+    board = RankedLeaderboard()
+    board.set_total(1, 5, "tom")
+    board.set_total(2, 8, "jerry")
+    assert board.rank(1)["rank"] == 2
+
+    board.set_total(1, 9)
+    assert board.rank(1) == {"rank": 1, "player_id": 1, "username": "tom", "total_points": 9}
+    assert len(board) == 2
+
+    board.remove(2)
+    board.remove(2)
+    assert [e["player_id"] for e in board.top()] == [1]
@@ -0,0 +1,105 @@
+# ================================================================
+# File: tests/test_replay.py
+# Description:
+#   Tests for match recording and playback (game_logic/replay.py):
+#   the varint encoding, the byte format round trip, and that
+#   re-simulating a recorded match reproduces it exactly.
+# ================================================================
+
+import random
+
+import pytest
+
+from backend.game_logic.replay import (
+    OP_END, OP_STEP, ReplayRecorder, _read_varint, _write_varint, load_replay, play_replay,
+    verify_replay
+)
+from backend.game_logic.simulation import MatchSimulation
+
+PLAYERS = {"p1": "tom", "p2": "jerry"}
+
+
+# ================================================================
+# 1. HELPERS
+# ================================================================
+def record_match(seed, duration=20):
+    """
+    Play a match on the open arena with random inputs and step
+    sizes while recording it.
+    :return: (finished simulation, recorder)
+    """
+    rng = random.Random(seed)
+    simulation = MatchSimulation(seed, PLAYERS, duration=duration, verbose=False)
+    recorder = ReplayRecorder(simulation)
+    while not simulation.finished:
+        for player_id in PLAYERS:
+            if rng.random() < 0.2:
+                simulation.set_input(player_id, rng.randrange(9))
+        simulation.step(rng.choice((1, 1, 2, 3)))
+    recorder.close(simulation.tick)
+    return simulation, recorder
+
+
+# ================================================================
+# 2. VARINTS
+# ================================================================
+@pytest.mark.parametrize("value", [0, 1, 0x7F, 0x80, 300, 0x3FFF, 0x4000, 2 ** 32, 2 ** 63 - 1])
+def test_varint_round_trip(value):
+    buf = bytearray(b"\x00")
+    _write_varint(buf, value)
+    assert _read_varint(bytes(buf), 1) == (value, len(buf))
+
+
+# ================================================================
+# 3. FORMAT ROUND TRIP
+# ================================================================
+def test_load_replay_returns_header_and_records():
+    simulation, recorder = record_match(seed=7)
+    meta, records = load_replay(recorder.to_bytes())
+
+    assert meta == {'seed': 7, 'tick_rate': simulation.tick_rate, 'duration': 20,
+                    'map_name': "", 'players': list(PLAYERS.items())}
+    ticks = [tick for tick, _, _ in records]
+    assert ticks == sorted(ticks)
+    assert records[-1] == (simulation.tick, OP_END, None)
+    assert any(op == OP_STEP for _, op, _ in records)
+    for _, op, value in records[:-1]:
+        assert op == OP_STEP or (op in (0, 1) and 0 <= value <= 8)
+
+
+def test_load_replay_rejects_other_data():
+    with pytest.raises(ValueError):
+        load_replay(b"NOPE\x01")
+
+
+def test_recorder_ignores_input_after_close():
+    simulation, recorder = record_match(seed=3)
+    data = recorder.to_bytes()
+    simulation.set_input("p1", 5)
+    assert recorder.to_bytes() == data
+
+
+# ================================================================
+# 4. PLAYBACK
+# ================================================================
+@pytest.mark.parametrize("seed", range(4))
+def test_playback_reproduces_the_match(seed):
+    simulation, recorder = record_match(seed)
+    replayed = play_replay(recorder.to_bytes())
+
+    assert replayed.tick == simulation.tick
+    assert replayed.state['status'] == simulation.state['status']
+    assert replayed.state['winner'] == simulation.state['winner']
+    for player_id, player in simulation.state['players'].items():
+        again = replayed.state['players'][player_id]
+        assert (again['x'], again['y']) == (player['x'], player['y'])
+
+
+def test_verify_replay_checks_the_winner():
+    simulation, recorder = record_match(seed=11)
+    data = recorder.to_bytes()
+    winner = simulation.state['winner']
+    loser = "jerry" if winner == "tom" else "tom"
+
+    assert verify_replay(data, winner) is True
+    assert verify_replay(data, loser) is False
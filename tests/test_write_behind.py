@@ -0,0 +1,167 @@
+# ================================================================
+# File: tests/test_write_behind.py
+# Description:
+#   Tests for the write-behind result writer
+#   (database/write_behind.py): replaying the spool a crashed
+#   worker left behind, skipping results it had already
+#   committed, dropping bad records and retrying transient
+#   database errors.
+# ================================================================
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.database import write_behind
+from backend.database.write_behind import ResultWriter, _pid_alive
+from backend.models import Game, Player, PlayerStats, Score
+
+
+# ================================================================
+# 1. HELPERS
+# ================================================================
+@pytest.fixture
+def players(database):
+    """Tom and Jerry, with two active games between them."""
+    with database() as db:
+        tom = Player(username="tom", character="tom")
+        jerry = Player(username="jerry", character="jerry")
+        db.add_all([tom, jerry])
+        db.flush()
+        games = [Game(tom_id=tom.id, jerry_id=jerry.id, status="active", start_time=datetime.utcnow())
+                 for _ in range(2)]
+        db.add_all(games)
+        db.commit()
+        return tom.id, jerry.id, [game.id for game in games]
+
+
+def make_record(game_id, winner_id, points=10):
+    return {
+        "result_id": uuid.uuid4().hex,
+        "game_id": game_id,
+        "winner_id": winner_id,
+        "points": points,
+        "ended_at": datetime.utcnow().isoformat()
+    }
+
+
+def dead_pid():
+    """A PID no running process has."""
+    pid = 4_000_000
+    while _pid_alive(pid):
+        pid -= 1
+    return pid
+
+
+def write_spool(spool_dir, records, torn_tail=""):
+    path = spool_dir / f"results-{dead_pid()}.spool"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + torn_tail)
+    return path
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the writer"
+        time.sleep(0.01)
+
+
+def stats_of(database, player_id):
+    with database() as db:
+        stats = db.get(PlayerStats, player_id)
+        return stats.total_points, stats.games_played, stats.wins
+
+
+# ================================================================
+# 2. CRASH AND REPLAY
+# ================================================================
+def test_replay_commits_a_dead_workers_spool_up_to_a_torn_line(database, players, tmp_path):
+    tom_id, jerry_id, (game1, game2) = players
+    write_spool(tmp_path, [make_record(game1, tom_id, 10), make_record(game2, jerry_id, 7)],
+                torn_tail='{"result_id": "abc", "game_id": ')
+
+    writer = ResultWriter(spool_dir=str(tmp_path))
+    assert writer.replay_spool() == 2
+    assert writer.committed == 2
+    assert writer.dropped == 0
+
+    with database() as db:
+        assert db.query(Score).count() == 2
+        assert {game.status for game in db.query(Game)} == {"finished"}
+    assert stats_of(database, tom_id) == (10, 2, 1)
+    assert stats_of(database, jerry_id) == (7, 2, 1)
+    # The claimed spool is gone once everything is committed
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay_skips_results_committed_before_the_crash(database, players, tmp_path):
+    tom_id, jerry_id, (game1, game2) = players
+    first, second = make_record(game1, tom_id, 10), make_record(game2, tom_id, 5)
+    writer = ResultWriter(spool_dir=str(tmp_path))
+    writer._write_batch([first])      # committed, then the worker died before truncating
+    write_spool(tmp_path, [first, second])
+
+    assert writer.replay_spool() == 2
+    assert writer.committed == 2
+    with database() as db:
+        assert db.query(Score).count() == 2
+    assert stats_of(database, tom_id) == (15, 2, 2)
+
+
+def test_replay_ignores_spools_of_running_workers(database, players, tmp_path):
+    tom_id, _, (game1, _) = players
+    live = tmp_path / f"results-{os.getppid()}.spool"
+    live.write_text(json.dumps(make_record(game1, tom_id)) + "\n")
+
+    assert ResultWriter(spool_dir=str(tmp_path)).replay_spool() == 0
+    assert live.exists()
+
+
+def test_bad_record_is_dropped_without_losing_the_batch(database, players, tmp_path):
+    tom_id, jerry_id, (game1, game2) = players
+    write_spool(tmp_path, [make_record(game1, tom_id, 10), make_record(game2, jerry_id, "ten")])
+
+    writer = ResultWriter(spool_dir=str(tmp_path))
+    writer.replay_spool()
+    assert writer.committed == 1
+    assert writer.dropped == 1
+    with database() as db:
+        assert db.get(Game, game1).status == "finished"
+        assert db.get(Game, game2).status == "active"
+
+
+# ================================================================
+# 3. TRANSIENT ERRORS
+# ================================================================
+def test_transient_error_is_retried_and_spool_kept_until_commit(database, players, tmp_path, monkeypatch):
+    tom_id, _, (game1, _) = players
+    record_match_result = write_behind.record_match_result
+    calls = []
+
+    def locked_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE games", {}, Exception("database is locked"))
+        return record_match_result(*args, **kwargs)
+
+    monkeypatch.setattr(write_behind, "record_match_result", locked_once)
+    writer = ResultWriter(spool_dir=str(tmp_path), flush_ms=1, retry_ms=200)
+    writer.start()
+    result_id = writer.submit(game1, tom_id, 10)
+    assert result_id is not None
+
+    wait_for(lambda: writer.retried == 1)
+    # Not committed yet: the result must still be in the spool
+    assert result_id in open(writer.spool_path).read()
+
+    wait_for(lambda: writer.committed == 1 and writer.pending() == 0)
+    wait_for(lambda: os.path.getsize(writer.spool_path) == 0)
+    assert writer.dropped == 0
+    with database() as db:
+        assert db.query(Score).filter(Score.result_id == result_id).count() == 1
+    assert stats_of(database, tom_id) == (10, 1, 1)